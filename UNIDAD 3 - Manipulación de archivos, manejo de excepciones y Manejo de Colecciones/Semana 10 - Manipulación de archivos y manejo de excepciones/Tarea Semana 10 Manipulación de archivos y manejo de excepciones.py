@@ -1,3 +1,21 @@
+import argparse
+import mmap
+import os
+import re
+import struct
+import sys
+from collections.abc import Mapping
+from contextlib import contextmanager
+
+# Módulos compartidos de la unidad (carpeta superior): índice de trigramas para las búsquedas,
+# guardado atómico de archivos, almacenamiento en SQLite y listados por páginas
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from almacenamiento_sqlite import AlmacenProductos
+from indice_trigramas import IndiceTrigramas, normalizar
+from paginacion import EscritorSalida, mostrar_paginas, recorrer
+from persistencia import archivo_atomico
+
+
 class Producto:
     def __init__(self, id, nombre, cantidad, precio):
         """
@@ -81,39 +99,332 @@ class Producto:
         return f"Producto({self.id}, {self.nombre}, {self.cantidad}, {self.precio})"
 
 
+class BloqueMalformadoError(ValueError):
+    """
+    Error que indica que un bloque de producto de `inventario.txt` no se pudo interpretar.
+    Atributos:
+        offset (int): Posición en bytes, desde el inicio del archivo, donde empieza el bloque.
+        mensaje (str): Descripción del problema encontrado.
+    """
+    def __init__(self, offset, mensaje):
+        super().__init__(f"Bloque malformado en el byte {offset}: {mensaje}")
+        self.offset = offset
+        self.mensaje = mensaje
+
+
+# Separador de bloques y etiquetas de campo usadas por Producto.convertir_a_texto()
+SEPARADOR_BLOQUE = b"-----------------------------"
+CAMPOS_BLOQUE = {
+    b"ID del Producto:": 'id',
+    b"Nombre del Producto:": 'nombre',
+    b"Cantidad del Producto:": 'cantidad',
+    b"Precio del Producto $:": 'precio',
+}
+# Patrón para el caso habitual (los cuatro campos en el orden en que se escriben)
+PATRON_BLOQUE = re.compile(
+    rb"ID del Producto:[ \t]*\|([^\n]*)\n[ \t]*"
+    rb"Nombre del Producto:[ \t]*\|([^\n]*)\n[ \t]*"
+    rb"Cantidad del Producto:[ \t]*\|([^\n]*)\n[ \t]*"
+    rb"Precio del Producto \$:[ \t]*\|([^\n]*)"
+)
+
+
+def leer_productos(ruta, errores=None, tamaño_lectura=1024 * 1024):
+    """
+    Lee el archivo de inventario por trozos y genera los productos de uno en uno,
+    de modo que la memoria usada no depende del tamaño del archivo.
+    Parámetros:
+        ruta (str): Ruta del archivo de inventario.
+        errores (list, opcional): Si se indica, los bloques malformados se añaden a esta lista
+            como BloqueMalformadoError y la lectura continúa; si no, se lanza la excepción.
+        tamaño_lectura (int): Cantidad de bytes que se leen en cada llamada a read().
+    Retorno:
+        generator: Instancias de Producto en el orden del archivo.
+    Excepciones:
+        BloqueMalformadoError: Si un bloque está incompleto o tiene valores inválidos y no se pasó `errores`.
+    """
+    with open(ruta, 'rb') as file:
+        pendiente = b""   # Bytes leídos que todavía no forman un bloque completo
+        offset = 0        # Posición en el archivo del primer byte de `pendiente`
+        while True:
+            trozo = file.read(tamaño_lectura)
+            pendiente += trozo
+            if trozo:
+                fin = pendiente.rfind(SEPARADOR_BLOQUE)
+                if fin < 0:
+                    continue
+                completos, pendiente = pendiente[:fin], pendiente[fin + len(SEPARADOR_BLOQUE):]
+            else:
+                completos, pendiente = pendiente, b""  # Último bloque, aunque no tenga separador
+
+            for bloque in completos.split(SEPARADOR_BLOQUE):
+                inicio = offset + len(bloque) - len(bloque.lstrip())
+                offset += len(bloque) + len(SEPARADOR_BLOQUE)
+                if inicio == offset - len(SEPARADOR_BLOQUE):
+                    continue  # Bloque vacío (solo espacios o saltos de línea)
+                try:
+                    yield _producto_desde_bloque(bloque, inicio)
+                except BloqueMalformadoError as e:
+                    if errores is None:
+                        raise
+                    errores.append(e)
+
+            if not trozo:
+                return
+
+
+def _producto_desde_bloque(bloque, offset):
+    """
+    Interpreta un bloque de bytes con las líneas `Etiqueta: |valor` en una sola pasada.
+    Parámetros:
+        bloque (bytes): Contenido del bloque, sin el separador.
+        offset (int): Posición del bloque en el archivo, usada en los mensajes de error.
+    Retorno:
+        Producto: Instancia creada a partir de los campos del bloque.
+    """
+    coincidencia = PATRON_BLOQUE.search(bloque)
+    if coincidencia:
+        id, nombre, cantidad, precio = coincidencia.groups()
+        datos = {'id': id, 'nombre': nombre.strip(), 'cantidad': cantidad, 'precio': precio}
+    else:
+        # Campos en otro orden o incompletos: se revisa línea por línea
+        datos = {}
+        for linea in bloque.split(b"\n"):
+            posicion = linea.find(b"|")
+            if posicion >= 0:
+                campo = CAMPOS_BLOQUE.get(linea[:posicion].rstrip())
+                if campo:
+                    datos[campo] = linea[posicion + 1:].strip()
+
+    if len(datos) != len(CAMPOS_BLOQUE):
+        faltantes = ", ".join(c for c in CAMPOS_BLOQUE.values() if c not in datos)
+        raise BloqueMalformadoError(offset, f"faltan campos ({faltantes})")
+    try:
+        return Producto(int(datos['id']), datos['nombre'].decode('utf-8'),
+                        int(datos['cantidad']), float(datos['precio']))
+    except (ValueError, UnicodeDecodeError) as e:
+        raise BloqueMalformadoError(offset, str(e)) from None
+
+
+# Índice de posiciones de `inventario.txt` ('inventario.idx'), que se escribe al guardar el
+# inventario: una cabecera con el tamaño y la fecha de modificación del inventario que indexa y
+# la cantidad de productos, seguida de dos tablas de registros de ancho fijo (id, posición en
+# bytes del bloque): una en el orden del archivo y otra ordenada por id.
+FIRMA_POSICIONES = b"INVPOS01"
+CABECERA_POSICIONES = struct.Struct('<8sqqq')  # firma, tamaño, mtime_ns, cantidad
+REGISTRO_POSICION = struct.Struct('<qq')       # id, posición
+
+
+def ruta_posiciones(ruta):
+    """Archivo del índice de posiciones de un inventario de texto."""
+    return os.path.splitext(ruta)[0] + '.idx'
+
+
+def escribir_posiciones(ruta, posiciones):
+    """
+    Escribe el índice de posiciones del inventario `ruta` (que ya debe estar guardado).
+    Parámetros:
+        posiciones (list): Pares (id, posición en bytes del bloque), en el orden del archivo.
+    """
+    estado = os.stat(ruta)
+    with archivo_atomico(ruta_posiciones(ruta), 'wb', sincronizar=False) as archivo:
+        archivo.write(CABECERA_POSICIONES.pack(FIRMA_POSICIONES, estado.st_size, estado.st_mtime_ns, len(posiciones)))
+        for tabla in (posiciones, sorted(posiciones)):
+            archivo.write(b"".join(REGISTRO_POSICION.pack(id, posicion) for id, posicion in tabla))
+
+
+class ProductosMapeados(Mapping):
+    """
+    Diccionario de solo lectura {id: Producto} sobre `inventario.txt` mapeado en memoria.
+    Los bloques de texto no tienen ancho fijo, así que no se puede calcular dónde empieza un
+    producto: esa posición la da el índice 'inventario.idx' que Inventario escribe al guardar,
+    de registros de ancho fijo ordenados por id. Abrir solo valida su cabecera y cada
+    `productos[id]` es una búsqueda binaria en el índice más la interpretación de un único
+    bloque, sin recorrer el archivo. Si el índice falta o es de otra versión del inventario
+    (se editó a mano, por ejemplo), se reconstruye en una pasada localizando solo las líneas
+    "ID del Producto" y se guarda para la próxima vez.
+    """
+    PATRON_ID = re.compile(rb"ID del Producto:[ \t]*\|[ \t]*(-?\d+)")
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self._archivo = open(ruta, 'rb')
+        # mmap no admite archivos vacíos
+        if os.fstat(self._archivo.fileno()).st_size:
+            self._mapa = mmap.mmap(self._archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self._mapa = b""
+        self._indice = None       # {id: posición}, solo si hubo que reconstruir el índice
+        self._posiciones = None   # Índice de posiciones mapeado
+        self._cantidad = 0
+        self._abrir_posiciones()
+
+    def _abrir_posiciones(self):
+        """Mapea 'inventario.idx' si corresponde a este inventario; si no, lo deja para reconstruir."""
+        try:
+            with open(ruta_posiciones(self.ruta), 'rb') as archivo:
+                posiciones = mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):  # No existe, o está vacío
+            return
+        estado = os.fstat(self._archivo.fileno())
+        try:
+            firma, tamaño, modificado, cantidad = CABECERA_POSICIONES.unpack_from(posiciones)
+            valido = (firma == FIRMA_POSICIONES and (tamaño, modificado) == (estado.st_size, estado.st_mtime_ns)
+                      and len(posiciones) == CABECERA_POSICIONES.size + 2 * cantidad * REGISTRO_POSICION.size)
+        except struct.error:
+            valido = False
+        if valido:
+            self._posiciones, self._cantidad = posiciones, cantidad
+        else:
+            posiciones.close()
+
+    def _obtener_indice(self):
+        """
+        Reconstruye (una sola vez) el índice {id: posición del bloque en bytes} recorriendo el
+        archivo, y lo guarda en 'inventario.idx' si se puede.
+        """
+        if self._indice is None:
+            self._indice = {int(coincidencia.group(1)): coincidencia.start()
+                            for coincidencia in self.PATRON_ID.finditer(self._mapa)}
+            try:
+                escribir_posiciones(self.ruta, list(self._indice.items()))
+            except OSError:
+                pass  # Sin permiso de escritura: el índice queda solo en memoria
+        return self._indice
+
+    def _posicion(self, id):
+        """Posición en bytes del bloque del producto, o None si no existe."""
+        if self._posiciones is None:
+            return self._obtener_indice().get(id)
+        # Búsqueda binaria en la tabla ordenada por id
+        base = CABECERA_POSICIONES.size + self._cantidad * REGISTRO_POSICION.size
+        bajo, alto = 0, self._cantidad
+        while bajo < alto:
+            medio = (bajo + alto) // 2
+            clave, posicion = REGISTRO_POSICION.unpack_from(self._posiciones, base + medio * REGISTRO_POSICION.size)
+            if clave < id:
+                bajo = medio + 1
+            elif clave > id:
+                alto = medio
+            else:
+                return posicion
+        return None
+
+    def __getitem__(self, id):
+        inicio = self._posicion(id) if isinstance(id, int) else None
+        if inicio is None:
+            raise KeyError(id)
+        fin = self._mapa.find(SEPARADOR_BLOQUE, inicio)
+        return _producto_desde_bloque(self._mapa[inicio:fin if fin >= 0 else len(self._mapa)], inicio)
+
+    def __contains__(self, id):
+        return isinstance(id, int) and self._posicion(id) is not None
+
+    def __iter__(self):
+        if self._posiciones is None:
+            return iter(self._obtener_indice())
+        tabla = memoryview(self._posiciones)[CABECERA_POSICIONES.size:
+                                             CABECERA_POSICIONES.size + self._cantidad * REGISTRO_POSICION.size]
+        return (id for id, _ in REGISTRO_POSICION.iter_unpack(tabla))
+
+    def __len__(self):
+        return self._cantidad if self._posiciones is not None else len(self._obtener_indice())
+
+    def cerrar(self):
+        """Libera los mapeos y cierra el archivo."""
+        if isinstance(self._mapa, mmap.mmap):
+            self._mapa.close()
+        if self._posiciones is not None:
+            self._posiciones.close()
+        self._archivo.close()
+
+
+# Claves de orden de los listados (ver paginacion.py): deben ser únicas, por eso terminan en el ID
+ORDENES_PRODUCTOS = {
+    'id': lambda producto: producto.id,
+    'nombre': lambda producto: (normalizar(producto.nombre), producto.id),
+    'cantidad': lambda producto: (producto.cantidad, producto.id),
+    'precio': lambda producto: (producto.precio, producto.id),
+}
+POR_PAGINA = 20  # Productos por página en el listado del menú
+
+
 class Inventario:
     """
     Constructor de la clase Inventario.
     Inicializa la lista de productos y carga el inventario desde el archivo.
+    Parámetros:
+        archivo_inventario (str): Ruta del archivo de inventario (instantánea completa).
+        modo_diario (bool): Si es True, cada cambio se añade como un registro al final del
+            archivo de diario en lugar de reescribir todo el inventario.
+        umbral_compactacion (int): Tamaño en bytes del diario a partir del cual se vuelca
+            en una nueva instantánea y se vacía.
+        solo_lectura (bool): Si es True, el archivo se mapea en memoria y `productos` es un
+            ProductosMapeados que lee cada producto bajo demanda; no se permiten cambios.
+            Solo refleja la instantánea, por lo que no se combina con el modo diario.
+        almacenamiento (str): 'texto' (por defecto) o 'sqlite'. Con 'sqlite' los productos se
+            guardan en '<archivo_inventario sin extensión>.db' y cada cambio escribe solo las
+            filas afectadas (ver almacenamiento_sqlite.py); no se combina con los modos diario
+            ni solo lectura.
     """
-    def __init__(self):
-        self.productos = {}
-        self.archivo_inventario = 'inventario.txt'
+    def __init__(self, archivo_inventario='inventario.txt', modo_diario=False, umbral_compactacion=1024 * 1024,
+                 solo_lectura=False, almacenamiento='texto'):
+        if solo_lectura and modo_diario:
+            raise ValueError("El modo solo lectura no se puede combinar con el modo diario.")
+        if almacenamiento not in ('texto', 'sqlite'):
+            raise ValueError(f"Almacenamiento desconocido: {almacenamiento}")
+        if almacenamiento == 'sqlite' and (modo_diario or solo_lectura):
+            raise ValueError("El almacenamiento SQLite no se combina con los modos diario ni solo lectura.")
+        self.productos = {}  # id -> Producto, en el orden del archivo
+        self.solo_lectura = solo_lectura
+        self.archivo_inventario = archivo_inventario
+        self.archivo_log = 'inventario_log.txt'
+        self.archivo_diario = os.path.splitext(archivo_inventario)[0] + '_diario.txt'
+        self.modo_diario = modo_diario
+        self.umbral_compactacion = umbral_compactacion
+        self.errores_carga = []
+        self._indice_nombres = None  # Índice de trigramas, se construye en la primera búsqueda
+        self._lote = None            # Cambios pendientes de la transacción en curso
+        self._respaldo = None
+        self._deshacer = None
+        self._almacen = None
+        if almacenamiento == 'sqlite':
+            self.archivo_inventario = os.path.splitext(archivo_inventario)[0] + '.db'
+            self._almacen = AlmacenProductos(self.archivo_inventario)
         self.cargar_inventario()
+        if self.modo_diario:
+            self.reproducir_diario()
 
     def cargar_inventario(self):
         """
-        Carga los productos desde el archivo de inventario y los almacena en la lista `productos`.
+        Carga los productos desde el archivo de inventario y los almacena en el diccionario `productos`.
+        El archivo se procesa por trozos con `leer_productos`; los bloques malformados quedan
+        en `errores_carga` junto con su posición en bytes.
         Excepciones:
             FileNotFoundError: Si el archivo de inventario no existe.
             PermissionError: Si no hay permisos para acceder al archivo.
             Exception: Captura cualquier otro error inesperado.
         """
-        try:
-            with open(self.archivo_inventario, 'r', encoding='utf-8') as file:
-                contenido = file.read()
-                # Dividir por los separadores de productos
-                productos_texto = contenido.split("-----------------------------")
+        if self.solo_lectura:
+            try:
+                self.productos = ProductosMapeados(self.archivo_inventario)
+            except OSError as e:
+                print(f"\nError al abrir el archivo de inventario: {e}")
+            return
+        if self._almacen is not None:
+            self.productos = {id: Producto(id, nombre, cantidad, precio)
+                              for id, nombre, cantidad, precio in self._almacen.productos()}
+            print("\nInventario cargado exitosamente.")
+            return
 
-                for producto_texto in productos_texto:
-                    if producto_texto.strip():  # Ignorar espacios vacíos
-                        try:
-                            producto = Producto.crear_desde_texto(producto_texto)
-                            self.productos.append(producto)
-                        except (ValueError, IndexError) as e:
-                            print(f"\nError al procesar producto: {e}")
-
-                print("\nInventario cargado exitosamente.")
+        try:
+            errores = []
+            for producto in leer_productos(self.archivo_inventario, errores):
+                self.productos[producto.id] = producto
+            for error in errores:
+                print(f"\nError al procesar producto (byte {error.offset}): {error.mensaje}")
+            self.errores_carga = errores
+            print("\nInventario cargado exitosamente.")
 
         except FileNotFoundError:
             print("\nNo se encontró archivo de inventario. Se creará uno nuevo.")
@@ -125,19 +436,216 @@ class Inventario:
 
     def guardar_inventario(self):
         """
-        Guarda todos los productos de la lista `productos` en el archivo de inventario.
+        Guarda todos los productos del diccionario `productos` en el archivo de inventario.
+        Retorno:
+            bool: True si se guardó, False si hubo un error (el archivo anterior queda intacto).
         Excepciones:
             PermissionError: Si no hay permisos para escribir en el archivo.
             Exception: Captura cualquier otro error inesperado.
         """
+        if self.solo_lectura:
+            return False
+        if self._almacen is not None:
+            self._almacen.reemplazar([(p.id, p.nombre, p.cantidad, p.precio) for p in self.productos.values()])
+            return True
         try:
-            with open(self.archivo_inventario, 'w', encoding='utf-8') as file:
-                for producto in self.productos:
-                    file.write(producto.convertir_a_texto() + '\n')
+            # Se escribe en un archivo temporal que luego reemplaza al original (persistencia.py),
+            # así un fallo a mitad de la escritura no deja el inventario truncado. De paso se anota
+            # la posición en bytes de cada bloque, para el índice que usa el modo solo lectura.
+            posiciones = []
+            offset = 0
+            with archivo_atomico(self.archivo_inventario, newline='\n') as file:
+                for producto in self.productos.values():
+                    texto = producto.convertir_a_texto() + '\n'
+                    # Lo anterior a "ID del Producto" es ASCII: caracteres y bytes coinciden
+                    posiciones.append((producto.id, offset + texto.index("ID del Producto")))
+                    file.write(texto)
+                    offset += len(texto) if texto.isascii() else len(texto.encode('utf-8'))
+            escribir_posiciones(self.archivo_inventario, posiciones)
+            return True
         except PermissionError:
             print("\nError: No hay permisos para escribir en el archivo de inventario.")
         except Exception as e:
             print(f"\nError al guardar el inventario: {e}")
+        return False
+
+    def reproducir_diario(self):
+        """
+        Aplica sobre los productos cargados de la instantánea los registros del archivo de diario.
+        Los registros son idempotentes, por lo que volver a aplicar un diario que ya estaba
+        incluido en la instantánea (por ejemplo, tras una caída durante la compactación)
+        no altera el resultado. Una última línea incompleta se descarta y se recorta del archivo.
+        """
+        try:
+            with open(self.archivo_diario, 'rb') as file:
+                contenido = file.read()
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            print(f"\nError al leer el diario del inventario: {e}")
+            return
+
+        fin = contenido.rfind(b'\n') + 1  # Todo lo posterior al último salto de línea está incompleto
+        if fin < len(contenido):
+            print("\nAdvertencia: se descartó un registro incompleto al final del diario.")
+            with open(self.archivo_diario, 'r+b') as file:
+                file.truncate(fin)
+
+        lineas = contenido[:fin].decode('utf-8').splitlines()
+        for numero, linea in enumerate(lineas, start=1):
+            if not linea:
+                continue
+            try:
+                self._aplicar_registro(self.productos, linea)
+            except (ValueError, IndexError) as e:
+                print(f"\nError en la línea {numero} del diario: {e}")
+
+        if lineas:
+            print(f"\nDiario aplicado: {len(lineas)} registros.")
+        if self._tamaño_diario() >= self.umbral_compactacion:
+            self.compactar()
+
+    def _aplicar_registro(self, por_id, linea):
+        """
+        Aplica un registro del diario sobre el diccionario de productos indexado por ID.
+        Formatos de registro:
+            A|id|cantidad|precio|nombre   Producto añadido (el nombre va al final y puede contener '|').
+            E|id                          Producto eliminado.
+            U|id|cantidad|precio          Producto actualizado (campo vacío = sin cambio).
+        """
+        tipo, resto = linea.split('|', 1)
+        if tipo == 'A':
+            id, cantidad, precio, nombre = resto.split('|', 3)
+            por_id[int(id)] = Producto(int(id), nombre, int(cantidad), float(precio))
+        elif tipo == 'E':
+            por_id.pop(int(resto), None)
+        elif tipo == 'U':
+            id, cantidad, precio = resto.split('|')
+            producto = por_id.get(int(id))
+            if producto:
+                if cantidad:
+                    producto.cantidad = int(cantidad)
+                if precio:
+                    producto.precio = float(precio)
+        else:
+            raise ValueError(f"Tipo de registro desconocido: {tipo}")
+
+    def _persistir(self, registros):
+        """
+        Guarda uno o varios cambios en disco. En modo diario se añaden las líneas al final del
+        archivo de diario con una sola escritura; con SQLite se escriben solo las filas de los
+        productos afectados, en una transacción; en modo normal se reescribe el inventario completo.
+        Parámetros:
+            registros (list): Líneas del diario que describen los cambios.
+        """
+        if self._almacen is not None:
+            ids = {int(registro.split('|')[1]) for registro in registros}
+            try:
+                with self._almacen.transaccion():
+                    self._almacen.guardar([(p.id, p.nombre, p.cantidad, p.precio)
+                                           for p in (self.productos.get(id) for id in ids) if p is not None])
+                    self._almacen.eliminar([id for id in ids if id not in self.productos])
+            except Exception as e:
+                print(f"\nError al guardar el inventario: {e}")
+            return
+        if not self.modo_diario:
+            self.guardar_inventario()
+            return
+
+        try:
+            with open(self.archivo_diario, 'a', encoding='utf-8') as file:
+                file.write('\n'.join(registros) + '\n')
+        except PermissionError:
+            print("\nError: No hay permisos para escribir en el diario del inventario.")
+            return
+        except Exception as e:
+            print(f"\nError al escribir en el diario del inventario: {e}")
+            return
+
+        if self._tamaño_diario() >= self.umbral_compactacion:
+            self.compactar()
+
+    def _registrar(self, registro, mensaje):
+        """
+        Guarda un cambio y lo anota en el log. Dentro de una transacción solo se acumula
+        y se escribe todo junto al confirmarla.
+        Parámetros:
+            registro (str): Línea del diario que describe el cambio.
+            mensaje (str): Mensaje para el log, o None si no hay nada que anotar.
+        """
+        if self._lote is not None:
+            self._lote.append((registro, mensaje))
+            return
+        self._persistir([registro])
+        if mensaje:
+            self.registrar_cambio(mensaje)
+
+    @contextmanager
+    def transaccion(self):
+        """
+        Agrupa varios cambios en un lote: se aplican en memoria, al terminar el bloque se guardan
+        con una sola escritura (instantánea atómica o diario) y se anotan en el log con otra.
+        Si ocurre una excepción dentro del bloque se deshacen todos los cambios del lote y la
+        excepción se propaga. Una transacción dentro de otra forma parte de la exterior.
+        Uso:
+            with inventario.transaccion():
+                inventario.añadir_producto(...)
+                inventario.actualizar_producto(...)
+        """
+        if self._lote is not None:
+            yield self
+            return
+
+        self._lote = []
+        self._respaldo = dict(self.productos)  # Copia superficial: conserva el orden original
+        self._deshacer = []                     # (producto, cantidad, precio) antes de actualizar
+        try:
+            yield self
+        except BaseException:
+            lote, self._lote = self._lote, None
+            self.productos = self._respaldo
+            for producto, cantidad, precio in reversed(self._deshacer):
+                producto.cantidad = cantidad
+                producto.precio = precio
+            self._indice_nombres = None  # Se reconstruye en la próxima búsqueda
+            print(f"\nError: se deshicieron los {len(lote)} cambios del lote.")
+            raise
+        else:
+            lote, self._lote = self._lote, None
+            if lote:
+                self._persistir([registro for registro, _ in lote])
+                mensajes = [mensaje for _, mensaje in lote if mensaje]
+                if mensajes:
+                    self.registrar_cambio('\n'.join(mensajes))
+        finally:
+            self._respaldo = None
+            self._deshacer = None
+
+    def _tamaño_diario(self):
+        """
+        Retorno:
+            int: Tamaño en bytes del archivo de diario (0 si no existe).
+        """
+        try:
+            return os.path.getsize(self.archivo_diario)
+        except OSError:
+            return 0
+
+    def compactar(self):
+        """
+        Vuelca el estado actual en una nueva instantánea de `inventario.txt` y vacía el diario.
+        La instantánea se escribe antes de vaciar el diario; si el proceso se interrumpe entre
+        ambos pasos, el diario se vuelve a aplicar sin efectos duplicados. Si la instantánea no
+        se pudo guardar, el diario se conserva (sigue siendo la única copia de los cambios).
+        """
+        if not self.guardar_inventario():
+            print("\nEl diario no se vació: se volverá a intentar en la próxima compactación.")
+            return
+        try:
+            with open(self.archivo_diario, 'w', encoding='utf-8'):
+                pass
+        except Exception as e:
+            print(f"\nError al vaciar el diario del inventario: {e}")
 
     def añadir_producto(self, producto):
         """
@@ -147,16 +655,26 @@ class Inventario:
         Retorno:
         bool: True si el producto se añadió correctamente, False si ya existe un producto con el mismo ID.
         """
-        if any(p.id == producto.id for p in self.productos):
+        if self._rechazar_si_solo_lectura():
+            return False
+        if producto.id in self.productos:
             print(f"\nError: Ya existe un producto con el ID {producto.id}.")
             return False
 
-        self.productos.append(producto)
-        self.guardar_inventario()
-        self.registrar_cambio(f"Producto agregado: ID={producto.id}, Nombre={producto.nombre}")
+        self._añadir(producto)
         print("\nProducto añadido y guardado exitosamente.")
         return True
 
+    def _añadir(self, producto):
+        """
+        Añade un producto cuyo ID no existe todavía y registra el cambio.
+        """
+        self.productos[producto.id] = producto
+        if self._indice_nombres is not None:
+            self._indice_nombres.agregar(producto.id, producto.nombre, producto)
+        self._registrar(f"A|{producto.id}|{producto.cantidad}|{producto.precio}|{producto.nombre}",
+                        f"Producto agregado: ID={producto.id}, Nombre={producto.nombre}")
+
     def eliminar_producto(self, id):
         """
         Elimina un producto del inventario por su ID y guarda los cambios en el archivo.
@@ -165,16 +683,27 @@ class Inventario:
         Retorno:
         bool: True si el producto se eliminó correctamente, False si no se encontró el producto.
         """
-        producto = next((p for p in self.productos if p.id == id), None)
-        if producto:
-            self.productos.remove(producto)
-            self.guardar_inventario()
-            self.registrar_cambio(f"Producto eliminado: ID={id}")
+        if self._rechazar_si_solo_lectura():
+            return False
+        if self._eliminar(id):
             print("\nProducto eliminado y guardado exitosamente.")
             return True
         print("\nError: No se encontró un producto con ese ID.")
         return False
 
+    def _eliminar(self, id):
+        """
+        Quita un producto y registra el cambio.
+        Retorno:
+        bool: False si no existía un producto con ese ID.
+        """
+        if self.productos.pop(id, None) is None:
+            return False
+        if self._indice_nombres is not None:
+            self._indice_nombres.eliminar(id)
+        self._registrar(f"E|{id}", f"Producto eliminado: ID={id}")
+        return True
+
     def actualizar_producto(self, id, cantidad=None, precio=None):
         """
         Actualiza la cantidad y/o el precio de un producto por su ID y guarda los cambios en el archivo.
@@ -185,48 +714,179 @@ class Inventario:
         Retorno:
         bool: True si el producto se actualizó correctamente, False si no se encontró el producto.
         """
-        producto = next((p for p in self.productos if p.id == id), None)
-        if producto:
-            cambios = []
-            if cantidad is not None:
-                producto.cantidad = cantidad
-                cambios.append(f"Cantidad={cantidad}")
-            if precio is not None:
-                producto.precio = precio
-                cambios.append(f"Precio={precio}")
-
-            self.guardar_inventario()
-            if cambios:
-                self.registrar_cambio(f"Producto actualizado: ID={id}, " + ", ".join(cambios))
+        if self._rechazar_si_solo_lectura():
+            return False
+        if self._actualizar(id, cantidad, precio):
             print("\nProducto actualizado y guardado exitosamente.")
             return True
         print("\nError: No se encontró un producto con ese ID.")
         return False
 
+    def _actualizar(self, id, cantidad, precio):
+        """
+        Cambia la cantidad y/o el precio de un producto y registra el cambio.
+        Retorno:
+        bool: False si no existía un producto con ese ID.
+        """
+        producto = self.productos.get(id)
+        if not producto:
+            return False
+        if self._deshacer is not None:
+            self._deshacer.append((producto, producto.cantidad, producto.precio))
+        cambios = []
+        if cantidad is not None:
+            producto.cantidad = cantidad
+            cambios.append(f"Cantidad={cantidad}")
+        if precio is not None:
+            producto.precio = precio
+            cambios.append(f"Precio={precio}")
+
+        if self._indice_nombres is not None:
+            self._indice_nombres.actualizar(id, producto.nombre, producto)
+        self._registrar(f"U|{id}|{'' if cantidad is None else cantidad}|{'' if precio is None else precio}",
+                        f"Producto actualizado: ID={id}, " + ", ".join(cambios) if cambios else None)
+        return True
+
+    def añadir_productos(self, productos):
+        """
+        Añade varios productos en un solo lote: un único guardado y una única escritura en el log.
+        Si algún ID ya existe (o se repite en el lote) no se añade ninguno.
+        Parámetros:
+        productos (iterable): Instancias de Producto a añadir.
+        Retorno:
+        int: Cantidad de productos añadidos (0 si el lote se deshizo).
+        """
+        if self._rechazar_si_solo_lectura():
+            return 0
+        try:
+            with self.transaccion():
+                total = 0
+                for producto in productos:
+                    if producto.id in self.productos:
+                        raise ValueError(f"Ya existe un producto con el ID {producto.id}.")
+                    self._añadir(producto)
+                    total += 1
+        except ValueError as e:
+            print(f"\nError: {e} No se aplicó ningún cambio del lote.")
+            return 0
+        print(f"\n{total} productos añadidos y guardados exitosamente.")
+        return total
+
+    def actualizar_muchos(self, cambios):
+        """
+        Actualiza varios productos en un solo lote. Si algún ID no existe no se aplica ningún cambio.
+        Parámetros:
+        cambios (iterable): Tuplas (id, cantidad, precio); None deja el valor sin cambio.
+        Retorno:
+        int: Cantidad de productos actualizados (0 si el lote se deshizo).
+        """
+        if self._rechazar_si_solo_lectura():
+            return 0
+        try:
+            with self.transaccion():
+                total = 0
+                for id, cantidad, precio in cambios:
+                    if not self._actualizar(id, cantidad, precio):
+                        raise ValueError(f"No se encontró un producto con el ID {id}.")
+                    total += 1
+        except ValueError as e:
+            print(f"\nError: {e} No se aplicó ningún cambio del lote.")
+            return 0
+        print(f"\n{total} productos actualizados y guardados exitosamente.")
+        return total
+
+    def eliminar_productos(self, ids):
+        """
+        Elimina varios productos en un solo lote. Si algún ID no existe no se elimina ninguno.
+        Parámetros:
+        ids (iterable): IDs de los productos a eliminar.
+        Retorno:
+        int: Cantidad de productos eliminados (0 si el lote se deshizo).
+        """
+        if self._rechazar_si_solo_lectura():
+            return 0
+        try:
+            with self.transaccion():
+                total = 0
+                for id in ids:
+                    if not self._eliminar(id):
+                        raise ValueError(f"No se encontró un producto con el ID {id}.")
+                    total += 1
+        except ValueError as e:
+            print(f"\nError: {e} No se aplicó ningún cambio del lote.")
+            return 0
+        print(f"\n{total} productos eliminados y guardados exitosamente.")
+        return total
+
     def buscar_por_nombre(self, nombre):
         """
         Busca productos por nombre y muestra los resultados.
+        No distingue mayúsculas ni tildes. Usa el índice de trigramas, salvo en modo solo
+        lectura, donde construirlo obligaría a leer todos los productos del archivo.
         Parámetros:
         nombre (str): Nombre o parte del nombre del producto a buscar.
+        Retorno:
+        list: Productos encontrados.
         """
-        resultados = [p for p in self.productos if nombre.lower() in p.nombre.lower()]
+        if self.solo_lectura:
+            buscado = normalizar(nombre)
+            resultados = [p for p in self.productos.values() if buscado in normalizar(p.nombre)]
+        else:
+            resultados = self._obtener_indice_nombres().buscar(nombre)
         if resultados:
             print("\nProductos encontrados:")
             print("\n".join(str(p) for p in resultados))
         else:
             print("\nNo se encontraron productos con ese nombre.")
+        return resultados
 
-    def mostrar_todos(self):
+    def listar_productos(self, orden=None, despues_de=None, descendente=False):
         """
-        Muestra todos los productos en el inventario.
+        Genera los productos: sin `orden`, en el orden del inventario; con 'id', 'nombre',
+        'cantidad' o 'precio', paginados por clave a partir del cursor `despues_de` (ver
+        paginacion.recorrer).
+        """
+        if orden is None:
+            return iter(self.productos.values())
+        return recorrer(self.productos.values(), ORDENES_PRODUCTOS[orden], despues_de, descendente)
+
+    def mostrar_todos(self, orden=None, por_pagina=None):
+        """
+        Muestra todos los productos en el inventario, en el orden pedido (ver `listar_productos`).
+        Con `por_pagina`, muestra una página y pregunta si seguir.
         """
         if self.productos:
             print("\nStock del Inventario Actual:")
-            for producto in self.productos:
-                print(producto)
+            if por_pagina:
+                mostrar_paginas(self.listar_productos(orden), str, por_pagina)
+            else:
+                with EscritorSalida() as salida:
+                    for producto in self.listar_productos(orden):
+                        salida.escribir(str(producto))
         else:
             print("\nEl inventario está vacío.")
 
+    def _obtener_indice_nombres(self):
+        """
+        Retorno:
+            IndiceTrigramas: El índice de nombres, que se construye la primera vez que se pide
+            y desde entonces se mantiene al día en cada alta, baja o actualización.
+        """
+        if self._indice_nombres is None:
+            self._indice_nombres = IndiceTrigramas()
+            for producto in self.productos.values():
+                self._indice_nombres.agregar(producto.id, producto.nombre, producto)
+        return self._indice_nombres
+
+    def _rechazar_si_solo_lectura(self):
+        """
+        Indica (y avisa) si el inventario se abrió en modo solo lectura.
+        """
+        if self.solo_lectura:
+            print("\nError: El inventario está abierto en modo solo lectura.")
+            return True
+        return False
+
     def registrar_cambio(self, mensaje):
         """
         Registra un mensaje en el archivo de log (`inventario_log.txt`).
@@ -237,7 +897,7 @@ class Inventario:
         Exception: Captura cualquier otro error inesperado.
         """
         try:
-            with open('inventario_log.txt', 'a', encoding='utf-8') as file:
+            with open(self.archivo_log, 'a', encoding='utf-8') as file:
                 file.write(mensaje + '\n')
         except PermissionError:
             print("\nError: No hay permisos para escribir en el archivo de log.")
@@ -310,12 +970,17 @@ def obtener_string(mensaje):
         print("Error: El campo no puede estar vacío.")
 
 
-def main():
+def main(almacenamiento='texto'):
     """
     Función principal que ejecuta el sistema de gestión de inventarios.
     Muestra el menú, procesa las opciones del usuario y realiza las operaciones correspondientes.
+    Parámetros:
+    almacenamiento (str): 'texto' (inventario.txt con diario) o 'sqlite' (inventario.db).
     """
-    inventario = Inventario()
+    if almacenamiento == 'sqlite':
+        inventario = Inventario(almacenamiento='sqlite')
+    else:
+        inventario = Inventario(modo_diario=True)
 
     while True:
         try:
@@ -324,13 +989,17 @@ def main():
 
             if opcion == "1":
                 id = obtener_entero("Ingrese el ID del producto: ")
-                if any(p.id == id for p in inventario.productos):
+                if id in inventario.productos:
                     print(f"\nError: Ya existe un producto con el ID {id}.")
                     continue
 
                 nombre = obtener_string("Ingrese el nombre del producto: ")
                 cantidad = obtener_entero("Ingrese la cantidad del producto: ")
                 precio = obtener_float("Ingrese el precio del producto: ")
+                if precio is None:
+                    # Un precio vacío se anotaría en el diario como 'None' y se perdería al reproducirlo
+                    print("\nError: El precio es obligatorio.")
+                    continue
 
                 producto = Producto(id, nombre, cantidad, precio)
                 inventario.añadir_producto(producto)
@@ -338,7 +1007,6 @@ def main():
             elif opcion == "2":
                 id = obtener_entero("Ingrese el ID del producto a eliminar: ")
                 inventario.eliminar_producto(id)
-                inventario.guardar_inventario()
 
             elif opcion == "3":
                 id = obtener_entero("Ingrese el ID del producto a actualizar: ")
@@ -351,7 +1019,11 @@ def main():
                 inventario.buscar_por_nombre(nombre)
 
             elif opcion == "5":
-                inventario.mostrar_todos()
+                orden = input("Ordenar por (id, nombre, cantidad, precio; Enter: orden del inventario): ").strip().lower()
+                if orden and orden not in ORDENES_PRODUCTOS:
+                    print("\nOrden no válido.")
+                else:
+                    inventario.mostrar_todos(orden or None, por_pagina=POR_PAGINA)
 
             elif opcion == "6":
                 print("\nSaliendo del sistema...")
@@ -365,4 +1037,7 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Sistema de Gestión de Inventarios")
+    parser.add_argument("--almacenamiento", choices=("texto", "sqlite"), default="texto",
+                        help="texto: inventario.txt con diario de cambios; sqlite: inventario.db")
+    main(parser.parse_args().almacenamiento)
\ No newline at end of file
@@ -0,0 +1,99 @@
+"""
+Benchmark del parser de inventario.txt (Semana 10)
+
+Compara la carga anterior (file.read() + split por separador + Producto.crear_desde_texto)
+con el parser por trozos `leer_productos`, para archivos de 10k, 100k y 1M productos.
+
+Uso:
+    python benchmark_parser.py                 # tamaños por defecto
+    python benchmark_parser.py 10000 50000     # tamaños personalizados
+    python benchmark_parser.py --memoria       # además mide el pico de memoria con tracemalloc
+"""
+
+import glob
+import importlib.util
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+
+def cargar_tarea():
+    """Importa el script de la tarea de esta carpeta (su nombre contiene espacios)."""
+    carpeta = os.path.dirname(os.path.abspath(__file__))
+    ruta = glob.glob(os.path.join(carpeta, "Tarea*.py"))[0]
+    spec = importlib.util.spec_from_file_location("tarea_semana10", ruta)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+tarea = cargar_tarea()
+
+
+def generar_archivo(ruta, cantidad):
+    """Escribe un inventario.txt de prueba con `cantidad` productos."""
+    with open(ruta, 'w', encoding='utf-8') as file:
+        lote = []
+        for i in range(cantidad):
+            producto = tarea.Producto(i, f"Producto de prueba {i}", i % 500, (i % 1000) / 10)
+            lote.append(producto.convertir_a_texto() + '\n')
+            if len(lote) == 10000:
+                file.write(''.join(lote))
+                lote = []
+        file.write(''.join(lote))
+
+
+def carga_anterior(ruta):
+    """Reproduce el camino original de Inventario.cargar_inventario."""
+    productos = []
+    with open(ruta, 'r', encoding='utf-8') as file:
+        contenido = file.read()
+        for producto_texto in contenido.split("-----------------------------"):
+            if producto_texto.strip():
+                productos.append(tarea.Producto.crear_desde_texto(producto_texto))
+    return len(productos)
+
+
+def carga_por_trozos(ruta):
+    """Recorre el archivo con el generador sin acumular los productos."""
+    return sum(1 for _ in tarea.leer_productos(ruta))
+
+
+def medir(funcion, ruta, memoria):
+    """
+    Ejecuta `funcion(ruta)` y devuelve (segundos, pico de memoria en MB o None).
+    """
+    inicio = time.perf_counter()
+    total = funcion(ruta)
+    segundos = time.perf_counter() - inicio
+
+    pico = None
+    if memoria:
+        tracemalloc.start()
+        funcion(ruta)
+        pico = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        tracemalloc.stop()
+    return total, segundos, pico
+
+
+def main():
+    memoria = "--memoria" in sys.argv
+    tamaños = [int(arg) for arg in sys.argv[1:] if arg.isdigit()] or [10_000, 100_000, 1_000_000]
+
+    print(f"{'Productos':>10} | {'Método':<12} | {'Segundos':>9} | {'Prod/s':>11} | {'Pico MB':>8}")
+    print("-" * 62)
+    with tempfile.TemporaryDirectory() as carpeta:
+        for cantidad in tamaños:
+            ruta = os.path.join(carpeta, f"inventario_{cantidad}.txt")
+            generar_archivo(ruta, cantidad)
+            for nombre, funcion in (("anterior", carga_anterior), ("por trozos", carga_por_trozos)):
+                total, segundos, pico = medir(funcion, ruta, memoria)
+                assert total == cantidad, f"{nombre}: se leyeron {total} de {cantidad} productos"
+                pico_texto = f"{pico:8.1f}" if pico is not None else f"{'-':>8}"
+                print(f"{cantidad:>10} | {nombre:<12} | {segundos:9.3f} | {cantidad / segundos:11,.0f} | {pico_texto}")
+
+
+if __name__ == "__main__":
+    main()
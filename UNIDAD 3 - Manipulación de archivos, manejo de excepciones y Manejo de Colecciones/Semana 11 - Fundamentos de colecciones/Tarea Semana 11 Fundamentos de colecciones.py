@@ -1,4 +1,24 @@
+import argparse # Para la línea de comandos (conversión entre formatos, importación y exportación)
+import csv # Para importar y exportar productos en CSV
 import json # Se importa el módulo JSON para la manipulación de datos en archivos
+import math
+import mmap # Para leer el inventario binario sin cargarlo completo en memoria
+import os
+import struct # Para el formato binario de registros de ancho fijo
+import sys
+import time
+from array import array
+from collections.abc import Mapping
+from contextlib import contextmanager
+from itertools import islice
+
+# Módulos compartidos de la unidad (carpeta superior): índice de trigramas para las búsquedas,
+# guardado atómico de archivos, almacenamiento en SQLite y listados por páginas
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from almacenamiento_sqlite import AlmacenProductos
+from indice_trigramas import IndiceTrigramas, normalizar
+from paginacion import EscritorSalida, mostrar_paginas, recorrer
+from persistencia import DURABILIDADES, ArchivoDurable, archivo_atomico, respaldar_corrupto, serializar_json
 
 # Definición de la clase Producto, que representa un artículo en el inventario
 class Producto:
@@ -68,104 +88,532 @@ class Producto:
         """
         return f"Producto({self.id}, {self.nombre}, {self.cantidad}, {self.precio}, {self.estado})"
 
+# Formatos del archivo de inventario y la extensión de su nombre por defecto
+FORMATOS = {'json': 'json', 'binario': 'bin', 'sqlite': 'db'}
+
+# Formato binario del inventario
+# --------------------------------
+# Cabecera (16 bytes): firma b"INVB", versión (uint16), reservado (uint16),
+#                      número de registros (uint32), tamaño de la tabla de nombres (uint32).
+# Registros (32 bytes c/u): id (int64), cantidad (int64), precio (float64),
+#                      posición y longitud del nombre en la tabla de nombres (uint32, uint32).
+# Tabla de nombres: los nombres en UTF-8, cada uno terminado en un byte nulo. La posición
+#                      permite leer un nombre suelto; el terminador permite decodificar la
+#                      tabla completa de una sola vez al cargar todo el archivo.
+# El estado no se guarda: se deduce de la cantidad al crear cada Producto.
+FIRMA_BINARIA = b"INVB"
+VERSION_BINARIA = 1
+CABECERA_BINARIA = struct.Struct("<4sHHII")
+REGISTRO_BINARIO = struct.Struct("<qqdII")
+
+
+def serializar_binario(productos):
+    """
+    Convierte los productos al formato binario de registros de ancho fijo.
+    Parámetros:
+    productos (iterable): Instancias de Producto.
+    Retorno:
+    bytes: Contenido completo del archivo binario.
+    """
+    registros = []
+    nombres = []
+    posicion = 0
+    for producto in productos:
+        if "\x00" in producto.nombre:
+            raise ValueError(f"El nombre del producto {producto.id} contiene un carácter nulo.")
+        nombre = producto.nombre.encode('utf-8')
+        registros.append(REGISTRO_BINARIO.pack(producto.id, producto.cantidad, producto.precio,
+                                               posicion, len(nombre)))
+        nombres.append(nombre + b"\x00")
+        posicion += len(nombre) + 1
+
+    return b"".join([CABECERA_BINARIA.pack(FIRMA_BINARIA, VERSION_BINARIA, 0, len(registros), posicion),
+                     *registros, *nombres])
+
+
+def guardar_binario(productos, ruta):
+    """
+    Guarda los productos en un archivo con el formato binario de registros de ancho fijo.
+    Parámetros:
+    productos (iterable): Instancias de Producto a guardar.
+    ruta (str): Ruta del archivo binario.
+    """
+    with archivo_atomico(ruta, 'wb') as f:
+        f.write(serializar_binario(productos))
+
+
+def leer_cabecera_binaria(datos):
+    """
+    Valida la cabecera de un archivo binario de inventario.
+    Parámetros:
+    datos (bytes): Contenido del archivo (al menos la cabecera).
+    Retorno:
+    tuple: (número de registros, tamaño de la tabla de nombres).
+    Excepciones:
+    ValueError: Si la firma, la versión o el tamaño del archivo no son válidos.
+    """
+    if len(datos) < CABECERA_BINARIA.size:
+        raise ValueError("Archivo binario truncado: falta la cabecera.")
+    firma, version, _, cantidad, tamaño_nombres = CABECERA_BINARIA.unpack_from(datos)
+    if firma != FIRMA_BINARIA:
+        raise ValueError("El archivo no es un inventario binario.")
+    if version != VERSION_BINARIA:
+        raise ValueError(f"Versión de formato binario no soportada: {version}.")
+    if len(datos) < CABECERA_BINARIA.size + cantidad * REGISTRO_BINARIO.size + tamaño_nombres:
+        raise ValueError("Archivo binario truncado.")
+    return cantidad, tamaño_nombres
+
+
+def cargar_binario(ruta):
+    """
+    Carga los productos de un archivo binario de inventario.
+    Parámetros:
+    ruta (str): Ruta del archivo binario.
+    Retorno:
+    dict: Diccionario {id: Producto} en el orden del archivo.
+    Excepciones:
+    ValueError: Si el archivo no tiene un formato binario válido.
+    """
+    with open(ruta, 'rb') as f:
+        datos = f.read()
+    cantidad, _ = leer_cabecera_binaria(datos)
+
+    inicio = CABECERA_BINARIA.size
+    fin = inicio + cantidad * REGISTRO_BINARIO.size
+    nombres = datos[fin:].decode('utf-8').split("\x00")
+    productos = {}
+    for (id, cantidad, precio, _, _), nombre in zip(REGISTRO_BINARIO.iter_unpack(datos[inicio:fin]), nombres):
+        productos[id] = Producto(id, nombre, cantidad, precio)
+    return productos
+
+
+def json_a_binario(ruta_json, ruta_binaria):
+    """
+    Convierte un inventario JSON existente al formato binario.
+    Retorno:
+    int: Número de productos convertidos.
+    """
+    with open(ruta_json, 'r', encoding='utf-8') as f:
+        productos = [Producto.desde_diccionario(datos) for datos in json.load(f)]
+    guardar_binario(productos, ruta_binaria)
+    return len(productos)
+
+
+def binario_a_json(ruta_binaria, ruta_json):
+    """
+    Convierte un inventario binario al formato JSON (incluye el campo `estado`).
+    Retorno:
+    int: Número de productos convertidos.
+    """
+    productos = cargar_binario(ruta_binaria)
+    # Como los guardados del inventario: un fallo a mitad de la escritura no trunca el destino
+    with archivo_atomico(ruta_json, 'wb') as f:
+        f.write(serializar_json([producto.a_diccionario() for producto in productos.values()]))
+    return len(productos)
+
+
+# Importación y exportación masiva (CSV / JSON Lines)
+# ---------------------------------------------------
+# Los archivos se recorren con generadores, fila a fila, sin leerlos completos en memoria.
+# Columnas: id, nombre, cantidad, precio. Al exportar se añade `estado`; al importar se ignora,
+# porque se deduce de la cantidad.
+CAMPOS_INTERCAMBIO = ('id', 'nombre', 'cantidad', 'precio')
+EXTENSIONES_INTERCAMBIO = {'.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl'}
+MAXIMO_ENTERO = 2 ** 63 - 1 # Límite de los enteros del formato binario
+BLOQUE_IMPORTACION = 500 # Filas por executemany al importar en SQLite (y por consulta de IDs repetidos)
+
+
+def detectar_tipo(ruta, tipo=None):
+    """
+    Devuelve 'csv' o 'jsonl': el tipo indicado o, si no se indica, el que corresponde a la extensión.
+    Excepciones:
+    ValueError: Si la extensión no es conocida.
+    """
+    if tipo:
+        return tipo
+    extension = os.path.splitext(ruta)[1].lower()
+    if extension not in EXTENSIONES_INTERCAMBIO:
+        raise ValueError(f"No se reconoce el tipo de '{ruta}'. Use --tipo csv o --tipo jsonl.")
+    return EXTENSIONES_INTERCAMBIO[extension]
+
+
+def leer_filas_csv(archivo):
+    """
+    Generador de filas de un CSV con cabecera.
+    Retorno (por cada fila):
+    tuple: (número de línea, diccionario de la fila, mensaje de error o None).
+    """
+    lector = csv.DictReader(archivo)
+    for fila in lector:
+        if None in fila:
+            yield lector.line_num, fila, "La fila tiene más columnas que la cabecera."
+        else:
+            yield lector.line_num, fila, None
+
+
+def leer_filas_jsonl(archivo):
+    """
+    Generador de filas de un archivo JSON Lines (un objeto JSON por línea). Las líneas vacías se omiten.
+    Retorno (por cada fila):
+    tuple: (número de línea, diccionario de la fila, mensaje de error o None).
+    """
+    for numero, linea in enumerate(archivo, 1):
+        if not linea.strip():
+            continue
+        try:
+            fila = json.loads(linea)
+        except json.JSONDecodeError as e:
+            yield numero, linea.rstrip("\n"), f"JSON inválido: {e.msg}."
+            continue
+        if isinstance(fila, dict):
+            yield numero, fila, None
+        else:
+            yield numero, fila, "La línea no es un objeto JSON."
+
+
+def _entero(fila, campo):
+    """
+    Lee un campo entero no negativo de una fila (texto en CSV, número o texto en JSON).
+    """
+    valor = fila[campo]
+    if isinstance(valor, str):
+        valor = valor.strip()
+        if valor.lstrip('+').isdigit():
+            valor = int(valor)
+    elif isinstance(valor, float) and valor.is_integer():
+        valor = int(valor)
+    if isinstance(valor, bool) or not isinstance(valor, int):
+        raise ValueError(f"El campo '{campo}' debe ser un número entero.")
+    if not 0 <= valor <= MAXIMO_ENTERO:
+        raise ValueError(f"El campo '{campo}' está fuera de rango.")
+    return valor
+
+
+def producto_desde_fila(fila):
+    """
+    Valida una fila importada y crea el Producto correspondiente.
+    Parámetros:
+    fila (dict): Fila con las claves de CAMPOS_INTERCAMBIO.
+    Retorno:
+    Producto: El producto de la fila.
+    Excepciones:
+    ValueError: Con el motivo por el que la fila no es válida.
+    """
+    for campo in CAMPOS_INTERCAMBIO:
+        if fila.get(campo) in (None, ''):
+            raise ValueError(f"Falta el campo '{campo}'.")
+
+    nombre = fila['nombre']
+    if not isinstance(nombre, str) or not nombre.strip():
+        raise ValueError("El nombre no puede estar vacío.")
+    if "\x00" in nombre:
+        raise ValueError("El nombre contiene un carácter nulo.")
+
+    precio = fila['precio']
+    if isinstance(precio, str):
+        try:
+            precio = float(precio.strip())
+        except ValueError:
+            raise ValueError("El campo 'precio' debe ser un número.") from None
+    if isinstance(precio, bool) or not isinstance(precio, (int, float)):
+        raise ValueError("El campo 'precio' debe ser un número.")
+    if not math.isfinite(precio) or precio < 0:
+        raise ValueError("El precio debe ser un número no negativo.")
+
+    return Producto(_entero(fila, 'id'), nombre.strip(), _entero(fila, 'cantidad'), float(precio))
+
+
+def escribir_productos(productos, archivo, tipo):
+    """
+    Escribe los productos en un archivo abierto, uno por fila, a medida que se recorren.
+    Parámetros:
+    productos (iterable): Instancias de Producto.
+    archivo: Archivo de texto abierto para escritura.
+    tipo (str): 'csv' o 'jsonl'.
+    Retorno:
+    int: Número de productos escritos.
+    """
+    total = 0
+    if tipo == 'csv':
+        escritor = csv.writer(archivo)
+        escritor.writerow(CAMPOS_INTERCAMBIO + ('estado',))
+        for producto in productos:
+            escritor.writerow((producto.id, producto.nombre, producto.cantidad, producto.precio, producto.estado))
+            total += 1
+    else:
+        # Un solo codificador para todo el archivo: json.dumps con opciones crea uno por llamada
+        codificar = json.JSONEncoder(ensure_ascii=False).encode
+        for producto in productos:
+            archivo.write(codificar(producto.a_diccionario()) + "\n")
+            total += 1
+    return total
+
+
+def _resumen_velocidad(filas, segundos):
+    """Texto con la duración y las filas por segundo de una importación o exportación."""
+    return f"{segundos:.2f} s, {filas / segundos if segundos else 0:,.0f} filas/s"
+
+
+# Acceso de solo lectura al inventario binario mediante mmap
+class ProductosMapeados(Mapping):
+    """
+    Diccionario de solo lectura {id: Producto} respaldado por un archivo binario mapeado en memoria.
+    Al abrirlo solo se valida la cabecera; el índice id → registro se construye la primera vez
+    que se consulta un ID, leyendo únicamente la columna de IDs. Cada `productos[id]` crea un
+    Producto a partir de su registro, sin deserializar el resto del archivo.
+    """
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self._archivo = open(ruta, 'rb')
+        try:
+            self._mapa = mmap.mmap(self._archivo.fileno(), 0, access=mmap.ACCESS_READ)
+            self._cantidad, _ = leer_cabecera_binaria(self._mapa)
+        except Exception:
+            self._archivo.close()
+            raise
+        self._inicio_nombres = CABECERA_BINARIA.size + self._cantidad * REGISTRO_BINARIO.size
+        self._indice = None
+
+    def _obtener_indice(self):
+        """
+        Construye (una sola vez) el índice {id: posición del registro en bytes}.
+        Los IDs se leen como una columna de int64 tomando uno de cada cuatro valores
+        del bloque de registros (cada registro ocupa 32 bytes = 4 x 8 bytes).
+        """
+        if self._indice is None:
+            valores = array('q')
+            valores.frombytes(self._mapa[CABECERA_BINARIA.size:self._inicio_nombres])
+            if sys.byteorder == 'big':
+                valores.byteswap()
+            paso = REGISTRO_BINARIO.size
+            self._indice = dict(zip(valores[::paso // valores.itemsize],
+                                    range(CABECERA_BINARIA.size, self._inicio_nombres, paso)))
+        return self._indice
+
+    def __getitem__(self, id):
+        return self._producto_en(self._obtener_indice()[id])
+
+    def _producto_en(self, posicion):
+        """Crea el Producto del registro que empieza en `posicion` (en bytes)."""
+        id, cantidad, precio, inicio, longitud = REGISTRO_BINARIO.unpack_from(self._mapa, posicion)
+        inicio += self._inicio_nombres
+        return Producto(id, self._mapa[inicio:inicio + longitud].decode('utf-8'), cantidad, precio)
+
+    def values(self):
+        """
+        Recorre los productos en el orden del archivo leyendo los registros uno tras otro,
+        sin construir el índice de IDs (lo usan mostrar_todos y la exportación).
+        """
+        return (self._producto_en(posicion)
+                for posicion in range(CABECERA_BINARIA.size, self._inicio_nombres, REGISTRO_BINARIO.size))
+
+    def __contains__(self, id):
+        return id in self._obtener_indice()
+
+    def __iter__(self):
+        return iter(self._obtener_indice())
+
+    def __len__(self):
+        return self._cantidad
+
+    def cerrar(self):
+        """Libera el mapeo y cierra el archivo."""
+        self._mapa.close()
+        self._archivo.close()
+
+
+# Claves de orden de los listados (ver paginacion.py): deben ser únicas, por eso terminan en el ID
+ORDENES_PRODUCTOS = {
+    'id': lambda producto: producto.id,
+    'nombre': lambda producto: (normalizar(producto.nombre), producto.id),
+    'cantidad': lambda producto: (producto.cantidad, producto.id),
+    'precio': lambda producto: (producto.precio, producto.id),
+}
+POR_PAGINA = 20  # Productos por página en el listado del menú
+
+
 # Definición de la clase Inventario, encargada de gestionar los productos
 class Inventario:
     """
     Clase Inventario que maneja la lista de productos y la persistencia en archivo.
     """
-    def __init__(self):
+    def __init__(self, archivo_inventario=None, formato='json', solo_lectura=False, durabilidad='siempre',
+                 en_memoria=True):
+        """
+        Parámetros:
+        - archivo_inventario (str, opcional): Ruta del archivo. Por defecto 'inventario.json',
+          'inventario.bin' o 'inventario.db' según el formato.
+        - formato (str): 'json' (por defecto), 'binario' o 'sqlite'. Con 'sqlite' cada cambio
+          escribe solo las filas de los productos afectados (ver almacenamiento_sqlite.py).
+        - solo_lectura (bool): Solo con formato binario. Mapea el archivo en memoria y
+          `productos` lee cada producto bajo demanda; no se permiten modificaciones.
+        - durabilidad (str): 'siempre' (fsync en cada guardado), 'grupo' (un hilo escribe el
+          último estado cada pocos milisegundos) o 'ninguna' (sin fsync). Ver persistencia.py.
+        - en_memoria (bool): Solo con formato 'sqlite'. Si es False no se leen los productos al
+          abrir: `productos` queda vacío y solo tiene sentido `importar`, que escribe directamente
+          en la base (la línea de comandos lo usa así para importar archivos de cualquier tamaño).
+        """
+        if formato not in FORMATOS:
+            raise ValueError(f"Formato de inventario desconocido: {formato}")
+        if solo_lectura and formato != 'binario':
+            raise ValueError("El modo solo lectura requiere el formato binario.")
+        if not en_memoria and formato != 'sqlite':
+            raise ValueError("Solo el formato sqlite puede abrirse sin cargar los productos en memoria.")
         self.productos = {} # Diccionario donde se almacenarán los productos
-        self.archivo_inventario = 'inventario.json' # Nombre del archivo donde se guarda el inventario
+        self.formato = formato
+        self.solo_lectura = solo_lectura
+        self._indice_nombres = None # Índice de trigramas, se construye en la primera búsqueda
+        self._lote = None # Mensajes de log pendientes de la transacción en curso
+        self._respaldo = None
+        self._deshacer = None
+        self._cambiados = None # IDs modificados en la transacción en curso (para guardar solo esas filas)
+        # Nombre del archivo donde se guarda el inventario
+        self.archivo_inventario = archivo_inventario or 'inventario.' + FORMATOS[formato]
         self.archivo_log = 'inventario_log' # Archivo donde se registran los cambios
-        self.cargar_inventario()
+        self._archivo = ArchivoDurable(self.archivo_inventario, durabilidad)
+        self._almacen = AlmacenProductos(self.archivo_inventario, durabilidad) if formato == 'sqlite' else None
+        self.en_memoria = en_memoria
+        if en_memoria:
+            self.cargar_inventario()
 
     def cargar_inventario(self):
         """
         Carga los productos desde el archivo de inventario y los almacena en la lista `productos`.
         """
         try:
-            with open(self.archivo_inventario, 'r') as f:
-                datos = json.load(f)
-                # Convertir cada diccionario a objeto Producto
-                for producto_dict in datos:
-                    producto = Producto.desde_diccionario(producto_dict)
-                    self.productos[producto.id] = producto
-                print("\nInventario cargado exitosamente.")
+            if self.solo_lectura:
+                self.productos = ProductosMapeados(self.archivo_inventario)
+            elif self.formato == 'binario':
+                self.productos = cargar_binario(self.archivo_inventario)
+            elif self._almacen is not None:
+                self.productos = {id: Producto(id, nombre, cantidad, precio)
+                                  for id, nombre, cantidad, precio in self._almacen.productos()}
+            else:
+                with open(self.archivo_inventario, 'r') as f:
+                    datos = json.load(f)
+                    # Convertir cada diccionario a objeto Producto
+                    for producto_dict in datos:
+                        producto = Producto.desde_diccionario(producto_dict)
+                        self.productos[producto.id] = producto
+            print("\nInventario cargado exitosamente.")
         except FileNotFoundError:
+            if self.solo_lectura:
+                print("\nNo se encontró archivo de inventario.")
+                return
             print("\nNo se encontró archivo de inventario. Se creará uno nuevo.")
             self.guardar_inventario()
         except json.JSONDecodeError:
             print("\nError al leer el archivo de inventario. Formato JSON inválido.")
-            self.productos = {}
-            self.guardar_inventario()
+            self._respaldar_archivo_dañado()
+        except (ValueError, KeyError, TypeError, struct.error) as e:
+            if self.formato == 'binario':
+                print(f"\nError al leer el archivo de inventario binario: {e}")
+            else:
+                print(f"\nError al leer el archivo de inventario. Datos de producto no válidos: {e}")
+            if not self.solo_lectura:
+                self._respaldar_archivo_dañado()
         except Exception as e:
             print(f"\nError inesperado al cargar el inventario: {e}")
 
+    def _respaldar_archivo_dañado(self):
+        """
+        Aparta el archivo que no se pudo leer (ver persistencia.respaldar_corrupto) y deja el
+        inventario vacío, para que el próximo guardado no destruya los datos originales.
+        """
+        self.productos = {}
+        respaldo = respaldar_corrupto(self.archivo_inventario)
+        if respaldo:
+            print(f"Se guardó una copia del archivo dañado en {respaldo}. Se empieza con un inventario vacío.")
+
     def guardar_inventario(self):
         """
         Guarda todos los productos de la lista `productos` en el archivo de inventario.
+        El contenido se escribe en un archivo temporal que luego reemplaza al original, así un
+        fallo a mitad de la escritura no deja el inventario truncado (ver persistencia.py).
         """
+        if self.solo_lectura:
+            return
         try:
-            # Convertir los objetos Producto a diccionarios
-            productos_lista = [producto.a_diccionario() for producto in self.productos.values()]
-
-            with open(self.archivo_inventario, 'w') as f:
-                json.dump(productos_lista, f, indent=4)
+            if self._almacen is not None:
+                self._almacen.reemplazar([(p.id, p.nombre, p.cantidad, p.precio) for p in self.productos.values()])
+                print("\nInventario guardado exitosamente.")
+                return
+            if self.formato == 'binario':
+                datos = serializar_binario(self.productos.values())
+            else:
+                # Convertir los objetos Producto a diccionarios
+                productos_lista = [producto.a_diccionario() for producto in self.productos.values()]
+                datos = serializar_json(productos_lista)
+            self._archivo.guardar(datos)
 
             print("\nInventario guardado exitosamente.")
         except Exception as e:
             print(f"\nError al guardar el inventario: {e}")
 
+    def vaciar(self):
+        """
+        Con durabilidad 'grupo', escribe ya en disco el último guardado pendiente.
+        """
+        try:
+            self._archivo.vaciar()
+        except OSError as e:
+            print(f"\nError al guardar el inventario: {e}")
+
     def añadir_producto(self, producto):
         """
         Añade un nuevo producto al inventario.
         """
+        if self._rechazar_si_solo_lectura():
+            return False
         if producto.id in self.productos:
             print(f"\nError: Ya existe un producto con el ID {producto.id}.")
             return False
 
-        self.productos[producto.id] = producto
-        self.guardar_inventario()
-        self.registrar_cambio(f"Producto agregado: ID={producto.id}, Nombre={producto.nombre}")
+        self._añadir(producto)
         return True
 
+    def _añadir(self, producto):
+        """
+        Añade un producto cuyo ID no existe todavía, lo guarda y registra el cambio.
+        """
+        self.productos[producto.id] = producto
+        if self._indice_nombres is not None:
+            self._indice_nombres.agregar(producto.id, producto.nombre, producto)
+        self._guardar_y_registrar(f"Producto agregado: ID={producto.id}, Nombre={producto.nombre}", producto.id)
+
     def eliminar_producto(self, id):
         """
         Elimina un producto del inventario dado su ID.
         """
-        if id in self.productos:
-            nombre = self.productos[id].nombre
-            del self.productos[id]
-            self.guardar_inventario()
-            self.registrar_cambio(f"Producto eliminado: ID={id}, Nombre={nombre}")
+        if self._rechazar_si_solo_lectura():
+            return False
+        if self._eliminar(id):
             print("\nProducto eliminado exitosamente.")
             return True
 
         print("\nError: No se encontró un producto con ese ID.")
         return False
 
+    def _eliminar(self, id):
+        """
+        Quita un producto, guarda y registra el cambio. Devuelve False si el ID no existe.
+        """
+        producto = self.productos.pop(id, None)
+        if producto is None:
+            return False
+        if self._indice_nombres is not None:
+            self._indice_nombres.eliminar(id)
+        self._guardar_y_registrar(f"Producto eliminado: ID={id}, Nombre={producto.nombre}", id)
+        return True
+
     def actualizar_producto(self, id, cantidad=None, precio=None):
         """
         Actualiza la cantidad o el precio de un producto en el inventario.
         """
+        if self._rechazar_si_solo_lectura():
+            return False
         if id in self.productos:
-            producto = self.productos[id]
-            cambios = []
-
-            if cantidad is not None:
-                antigua_cantidad = producto.cantidad
-                producto.cantidad = cantidad
-                producto.estado = "Disponible" if cantidad > 0 else "Agotado"
-                cambios.append(f"Cantidad={antigua_cantidad} → {cantidad}")
-
-            if precio is not None:
-                antiguo_precio = producto.precio
-                producto.precio = precio
-                cambios.append(f"Precio= ${antiguo_precio:.2f} → $ {precio:.2f}")
-
-            if cambios:
-                self.guardar_inventario()
-                self.registrar_cambio(f"Producto actualizado: ID={id}, Nombre={producto.nombre}, " + ", ".join(cambios))
+            if self._actualizar(id, cantidad, precio):
                 print("\nProducto actualizado y guardado exitosamente.")
                 return True
             else:
@@ -175,12 +623,337 @@ class Inventario:
         print("\nError: No se encontró un producto con ese ID.")
         return False
 
+    def _actualizar(self, id, cantidad, precio):
+        """
+        Cambia la cantidad y/o el precio de un producto existente, guarda y registra el cambio.
+        Devuelve False si no había nada que cambiar.
+        """
+        producto = self.productos[id]
+        if self._deshacer is not None:
+            self._deshacer.append((producto, producto.cantidad, producto.precio, producto.estado))
+        cambios = []
+
+        if cantidad is not None:
+            antigua_cantidad = producto.cantidad
+            producto.cantidad = cantidad
+            producto.estado = "Disponible" if cantidad > 0 else "Agotado"
+            cambios.append(f"Cantidad={antigua_cantidad} → {cantidad}")
+
+        if precio is not None:
+            antiguo_precio = producto.precio
+            producto.precio = precio
+            cambios.append(f"Precio= ${antiguo_precio:.2f} → $ {precio:.2f}")
+
+        if not cambios:
+            return False
+        if self._indice_nombres is not None:
+            self._indice_nombres.actualizar(id, producto.nombre, producto)
+        self._guardar_y_registrar(f"Producto actualizado: ID={id}, Nombre={producto.nombre}, " + ", ".join(cambios), id)
+        return True
+
+    def _guardar_y_registrar(self, mensaje, id=None):
+        """
+        Guarda el inventario y anota el cambio en el log. Dentro de una transacción solo se
+        acumula el mensaje; el guardado se hace una vez al confirmarla.
+        Parámetros:
+        - id (int, opcional): Producto que cambió. En SQLite solo se escribe su fila.
+        """
+        if self._lote is not None:
+            self._lote.append(mensaje)
+            if id is not None:
+                self._cambiados.add(id)
+            return
+        self._guardar_cambios(None if id is None else {id})
+        self.registrar_cambio(mensaje)
+
+    def _guardar_cambios(self, ids):
+        """
+        Guarda los cambios de los productos con esos IDs. En SQLite escribe solo sus filas (los
+        que ya no están en `productos` se borran); en los demás formatos, o si `ids` es None,
+        guarda el inventario completo.
+        """
+        if self._almacen is None or ids is None:
+            self.guardar_inventario()
+            return
+        try:
+            with self._almacen.transaccion():
+                presentes = [self.productos[id] for id in ids if id in self.productos]
+                self._almacen.guardar([(p.id, p.nombre, p.cantidad, p.precio) for p in presentes])
+                self._almacen.eliminar([id for id in ids if id not in self.productos])
+            print("\nInventario guardado exitosamente.")
+        except Exception as e:
+            print(f"\nError al guardar el inventario: {e}")
+
+    @contextmanager
+    def transaccion(self):
+        """
+        Agrupa varios cambios en un lote que se guarda con una sola escritura del archivo
+        y una sola escritura en el log al terminar el bloque `with`.
+        Si ocurre una excepción dentro del bloque se deshacen todos los cambios del lote
+        y la excepción se propaga. Una transacción dentro de otra forma parte de la exterior.
+        """
+        if self._lote is not None:
+            yield self
+            return
+
+        self._lote = []
+        self._cambiados = set()
+        self._respaldo = dict(self.productos) # Copia superficial: conserva el orden original
+        self._deshacer = [] # (producto, cantidad, precio, estado) antes de cada actualización
+        try:
+            yield self
+        except BaseException:
+            lote, self._lote = self._lote, None
+            self.productos = self._respaldo
+            for producto, cantidad, precio, estado in reversed(self._deshacer):
+                producto.cantidad = cantidad
+                producto.precio = precio
+                producto.estado = estado
+            self._indice_nombres = None # Se reconstruye en la próxima búsqueda
+            print(f"\nError: se deshicieron los {len(lote)} cambios del lote.")
+            raise
+        else:
+            lote, self._lote = self._lote, None
+            if lote:
+                self._guardar_cambios(self._cambiados)
+                self.registrar_cambio('\n'.join(lote))
+        finally:
+            self._respaldo = None
+            self._deshacer = None
+            self._cambiados = None
+
+    def añadir_productos(self, productos):
+        """
+        Añade varios productos en un solo lote. Si algún ID ya existe (o se repite en el
+        lote) no se añade ninguno. Devuelve la cantidad de productos añadidos.
+        """
+        if self._rechazar_si_solo_lectura():
+            return 0
+        try:
+            with self.transaccion():
+                total = 0
+                for producto in productos:
+                    if producto.id in self.productos:
+                        raise ValueError(f"Ya existe un producto con el ID {producto.id}.")
+                    self._añadir(producto)
+                    total += 1
+        except ValueError as e:
+            print(f"\nError: {e} No se aplicó ningún cambio del lote.")
+            return 0
+        print(f"\n{total} productos añadidos exitosamente.")
+        return total
+
+    def actualizar_muchos(self, cambios):
+        """
+        Actualiza varios productos en un solo lote a partir de tuplas (id, cantidad, precio),
+        donde None deja el valor sin cambio. Si algún ID no existe no se aplica ningún cambio.
+        Devuelve la cantidad de productos actualizados.
+        """
+        if self._rechazar_si_solo_lectura():
+            return 0
+        try:
+            with self.transaccion():
+                total = 0
+                for id, cantidad, precio in cambios:
+                    if id not in self.productos:
+                        raise ValueError(f"No se encontró un producto con el ID {id}.")
+                    if self._actualizar(id, cantidad, precio):
+                        total += 1
+        except ValueError as e:
+            print(f"\nError: {e} No se aplicó ningún cambio del lote.")
+            return 0
+        print(f"\n{total} productos actualizados exitosamente.")
+        return total
+
+    def eliminar_productos(self, ids):
+        """
+        Elimina varios productos en un solo lote. Si algún ID no existe no se elimina ninguno.
+        Devuelve la cantidad de productos eliminados.
+        """
+        if self._rechazar_si_solo_lectura():
+            return 0
+        try:
+            with self.transaccion():
+                total = 0
+                for id in ids:
+                    if not self._eliminar(id):
+                        raise ValueError(f"No se encontró un producto con el ID {id}.")
+                    total += 1
+        except ValueError as e:
+            print(f"\nError: {e} No se aplicó ningún cambio del lote.")
+            return 0
+        print(f"\n{total} productos eliminados exitosamente.")
+        return total
+
+    def importar(self, ruta, tipo=None, archivo_rechazos=None):
+        """
+        Importa productos desde un archivo CSV o JSON Lines, fila a fila.
+        Cada fila se valida al leerla; las filas inválidas o con un ID que ya existe (en el
+        inventario o en una fila anterior) se rechazan y se anotan en el informe de rechazos,
+        sin detener la importación. Todas las filas válidas se añaden en una sola transacción:
+        se guardan con una única escritura y, si la lectura falla a mitad, no se añade ninguna.
+        Con formato 'sqlite' las filas van directamente a la base, por bloques (ver
+        `_importar_en_base`), así que el archivo puede ser más grande que la memoria. Con 'json'
+        y 'binario' no es posible: el inventario completo vive en `productos` y se reescribe
+        entero al guardar, de modo que todo lo importado tiene que caber en memoria.
+        Parámetros:
+        - ruta (str): Archivo a importar.
+        - tipo (str, opcional): 'csv' o 'jsonl'. Por defecto se deduce de la extensión.
+        - archivo_rechazos (str, opcional): Informe CSV de filas rechazadas (fila, motivo,
+          contenido). Por defecto '<ruta>.rechazos.csv'; solo se crea si hay rechazos.
+        Retorno:
+        tuple: (productos importados, filas rechazadas), o None en modo solo lectura.
+        """
+        if self._rechazar_si_solo_lectura():
+            return None
+        tipo = detectar_tipo(ruta, tipo)
+        archivo_rechazos = archivo_rechazos or ruta + '.rechazos.csv'
+        rechazados = 0
+        informe = escritor = None
+
+        def rechazar(numero, fila, error):
+            nonlocal informe, escritor, rechazados
+            if informe is None:
+                informe = open(archivo_rechazos, 'w', encoding='utf-8', newline='')
+                escritor = csv.writer(informe)
+                escritor.writerow(('fila', 'motivo', 'contenido'))
+            contenido = fila if isinstance(fila, str) else json.dumps(fila, ensure_ascii=False)
+            escritor.writerow((numero, error, contenido))
+            rechazados += 1
+
+        inicio = time.perf_counter()
+        with open(ruta, 'r', encoding='utf-8-sig', newline='') as entrada:
+            filas = leer_filas_csv(entrada) if tipo == 'csv' else leer_filas_jsonl(entrada)
+            try:
+                if self._almacen is not None:
+                    importados = self._importar_en_base(filas, rechazar)
+                else:
+                    importados = self._importar_en_memoria(filas, rechazar)
+            finally:
+                if informe is not None:
+                    informe.close()
+        if importados:
+            self.registrar_cambio(f"Importación desde {ruta}: {importados} productos agregados, "
+                                  f"{rechazados} filas rechazadas")
+
+        segundos = time.perf_counter() - inicio
+        print(f"\n{importados} productos importados, {rechazados} filas rechazadas "
+              f"({_resumen_velocidad(importados + rechazados, segundos)}).")
+        if rechazados:
+            print(f"Detalle de las filas rechazadas en {archivo_rechazos}.")
+        return importados, rechazados
+
+    def _importar_en_memoria(self, filas, rechazar):
+        """
+        Importación con formato 'json' o 'binario': añade los productos válidos a `productos`
+        dentro de `transaccion()` y guarda el inventario una vez al final. Devuelve cuántos añadió.
+        """
+        importados = 0
+        with self.transaccion():
+            for numero, fila, error in filas:
+                if error is None:
+                    try:
+                        producto = producto_desde_fila(fila)
+                        if producto.id in self.productos:
+                            error = f"Ya existe un producto con el ID {producto.id}."
+                    except ValueError as e:
+                        error = str(e)
+                if error is not None:
+                    rechazar(numero, fila, error)
+                    continue
+
+                self.productos[producto.id] = producto
+                if self._indice_nombres is not None:
+                    self._indice_nombres.agregar(producto.id, producto.nombre, producto)
+                importados += 1
+            if importados:
+                self._guardar_cambios(None)
+        return importados
+
+    def _importar_en_base(self, filas, rechazar):
+        """
+        Importación con formato 'sqlite': lee las filas en bloques de BLOQUE_IMPORTACION, busca
+        en la base cuáles de sus IDs ya existen (la base ya contiene los bloques anteriores) y
+        escribe las válidas con un executemany por bloque, todo dentro de una sola transacción
+        de SQLite. No pasa por `transaccion()`, que copia el diccionario completo: si algo falla,
+        SQLite deshace la importación. La memoria usada depende del bloque, no del archivo.
+        Si el inventario está en memoria, los productos importados se añaden también a
+        `productos`; si la importación falla, `productos` se vuelve a leer de la base.
+        Devuelve cuántos productos añadió.
+        """
+        importados = 0
+        try:
+            with self._almacen.transaccion():
+                while True:
+                    bloque = []
+                    for numero, fila, error in islice(filas, BLOQUE_IMPORTACION):
+                        producto = None
+                        if error is None:
+                            try:
+                                producto = producto_desde_fila(fila)
+                            except ValueError as e:
+                                error = str(e)
+                        bloque.append((numero, fila, producto, error))
+                    if not bloque:
+                        break
+                    vistos = self._almacen.existentes([producto.id for _, _, producto, _ in bloque if producto])
+                    nuevos = []
+                    for numero, fila, producto, error in bloque:
+                        if producto is not None and producto.id in vistos:
+                            error = f"Ya existe un producto con el ID {producto.id}."
+                        if error is not None:
+                            rechazar(numero, fila, error)
+                            continue
+                        vistos.add(producto.id)
+                        nuevos.append(producto)
+                    self._almacen.guardar([(p.id, p.nombre, p.cantidad, p.precio) for p in nuevos])
+                    importados += len(nuevos)
+                    if self.en_memoria:
+                        for producto in nuevos:
+                            self.productos[producto.id] = producto
+                            if self._indice_nombres is not None:
+                                self._indice_nombres.agregar(producto.id, producto.nombre, producto)
+        except BaseException:
+            if self.en_memoria and importados:
+                self._indice_nombres = None # Se reconstruye en la próxima búsqueda
+                self.productos = {}
+                self.cargar_inventario()
+            print("\nError: no se importó ningún producto.")
+            raise
+        if importados:
+            print("\nInventario guardado exitosamente.")
+        return importados
+
+    def exportar(self, ruta, tipo=None):
+        """
+        Exporta los productos a un archivo CSV o JSON Lines, escribiéndolos a medida que se recorren.
+        En modo solo lectura los productos se leen uno a uno del archivo binario mapeado, sin
+        cargar el inventario completo. Se escribe de forma atómica (ver persistencia.py).
+        Parámetros:
+        - ruta (str): Archivo de destino.
+        - tipo (str, opcional): 'csv' o 'jsonl'. Por defecto se deduce de la extensión.
+        Retorno:
+        int: Número de productos exportados.
+        """
+        tipo = detectar_tipo(ruta, tipo)
+        inicio = time.perf_counter()
+        with archivo_atomico(ruta, 'w', newline='') as salida:
+            total = escribir_productos(self.productos.values(), salida, tipo)
+        segundos = time.perf_counter() - inicio
+        print(f"\n{total} productos exportados a {ruta} ({_resumen_velocidad(total, segundos)}).")
+        return total
+
     def buscar_por_nombre(self, nombre):
         """
-        Busca productos en el inventario por nombre.
+        Busca productos en el inventario por nombre, sin distinguir mayúsculas ni tildes.
+        Usa el índice de trigramas, salvo en modo solo lectura, donde construirlo obligaría
+        a leer todos los productos del archivo.
         """
-        nombre = nombre.lower()
-        resultados = [p for p in self.productos.values() if nombre in p.nombre.lower()]
+        if self.solo_lectura:
+            buscado = normalizar(nombre)
+            resultados = [p for p in self.productos.values() if buscado in normalizar(p.nombre)]
+        else:
+            resultados = self._obtener_indice_nombres().buscar(nombre)
 
         if resultados:
             print("\nProductos encontrados:")
@@ -190,18 +963,53 @@ class Inventario:
 
         return resultados
 
-    def mostrar_todos(self):
+    def listar_productos(self, orden=None, despues_de=None, descendente=False):
         """
-        Muestra todos los productos en el inventario.
+        Genera los productos: sin `orden`, en el orden del inventario; con 'id', 'nombre',
+        'cantidad' o 'precio', paginados por clave a partir del cursor `despues_de` (ver
+        paginacion.recorrer).
+        """
+        if orden is None:
+            return iter(self.productos.values())
+        return recorrer(self.productos.values(), ORDENES_PRODUCTOS[orden], despues_de, descendente)
+
+    def mostrar_todos(self, orden=None, por_pagina=None):
+        """
+        Muestra todos los productos en el inventario, en el orden pedido (ver `listar_productos`).
+        Con `por_pagina`, muestra una página y pregunta si seguir.
         """
         if self.productos:
             print("\nStock del Inventario Actual:")
-            for producto in self.productos.values():
-                print(producto)
+            if por_pagina:
+                mostrar_paginas(self.listar_productos(orden), str, por_pagina)
+            else:
+                with EscritorSalida() as salida:
+                    for producto in self.listar_productos(orden):
+                        salida.escribir(str(producto))
             print(f"\nTotal de productos: {len(self.productos)}")
         else:
             print("\nEl inventario está vacío.")
 
+    def _obtener_indice_nombres(self):
+        """
+        Devuelve el índice de nombres. Se construye la primera vez que se pide y desde
+        entonces se mantiene al día en cada alta, baja o actualización.
+        """
+        if self._indice_nombres is None:
+            self._indice_nombres = IndiceTrigramas()
+            for producto in self.productos.values():
+                self._indice_nombres.agregar(producto.id, producto.nombre, producto)
+        return self._indice_nombres
+
+    def _rechazar_si_solo_lectura(self):
+        """
+        Indica (y avisa) si el inventario se abrió en modo solo lectura.
+        """
+        if self.solo_lectura:
+            print("\nError: El inventario está abierto en modo solo lectura.")
+            return True
+        return False
+
     def registrar_cambio(self, mensaje):
         try:
             with open(self.archivo_log, 'a', encoding='utf-8') as file:
@@ -259,12 +1067,12 @@ def obtener_string(mensaje):
             return entrada
         print("Error: El campo no puede estar vacío.")
 
-def main():
+def main(archivo_inventario=None, formato='json', solo_lectura=False, durabilidad='siempre'):
     """
     Función principal que ejecuta el sistema de gestión de inventarios.
     Muestra el menú, procesa las opciones del usuario y realiza las operaciones correspondientes.
     """
-    inventario = Inventario()
+    inventario = Inventario(archivo_inventario, formato, solo_lectura, durabilidad)
 
     while True:
         try:
@@ -306,11 +1114,17 @@ def main():
                 inventario.buscar_por_nombre(nombre)
 
             elif opcion == "5": # Mostrar todos
-                inventario.mostrar_todos()
+                orden = input("Ordenar por (id, nombre, cantidad, precio; Enter: orden del inventario): ").strip().lower()
+                if orden and orden not in ORDENES_PRODUCTOS:
+                    print("\nOrden no válido.")
+                else:
+                    inventario.mostrar_todos(orden or None, por_pagina=POR_PAGINA)
 
             elif opcion == "6": # Salir
                 print("\nGuardando inventario...", end="")
-                inventario.guardar_inventario()
+                if inventario.formato != 'sqlite': # En SQLite cada cambio ya quedó guardado
+                    inventario.guardar_inventario()
+                inventario.vaciar()
                 print("\n¡Gracias por usar el Sistema de Gestión de Inventarios!")
                 break
 
@@ -332,5 +1146,66 @@ def main():
             Esto evita que el programa se detenga debido a errores no previstos y muestra
             un mensaje de error con detalles sobre la excepción ocurrida.
             """
+def ejecutar_linea_de_comandos(argumentos=None):
+    """
+    Punto de entrada por línea de comandos.
+    Sin subcomando abre el menú interactivo; los subcomandos `a-binario` y `a-json`
+    convierten un inventario existente entre ambos formatos, e `importar` y `exportar`
+    cargan o vuelcan productos en CSV o JSON Lines sin pasar por el menú, por ejemplo:
+        python "Tarea Semana 11 Fundamentos de colecciones.py" --formato binario importar productos.csv
+    """
+    parser = argparse.ArgumentParser(description="Sistema de Gestión de Inventarios")
+    parser.add_argument("--formato", choices=tuple(FORMATOS), default="json",
+                        help="Formato del archivo de inventario para el menú interactivo")
+    parser.add_argument("--archivo", help="Ruta del archivo de inventario para el menú interactivo")
+    parser.add_argument("--solo-lectura", action="store_true",
+                        help="Abre el inventario binario mapeado en memoria, sin permitir cambios")
+    parser.add_argument("--durabilidad", choices=DURABILIDADES, default="siempre",
+                        help="siempre: fsync en cada guardado; grupo: agrupa los guardados cada pocos ms; "
+                             "ninguna: sin fsync")
+    subcomandos = parser.add_subparsers(dest="comando")
+
+    a_binario = subcomandos.add_parser("a-binario", help="Convierte un inventario JSON a binario")
+    a_binario.add_argument("origen")
+    a_binario.add_argument("destino")
+
+    a_json = subcomandos.add_parser("a-json", help="Convierte un inventario binario a JSON")
+    a_json.add_argument("origen")
+    a_json.add_argument("destino")
+
+    importar = subcomandos.add_parser("importar", help="Importa productos desde un archivo CSV o JSON Lines")
+    importar.add_argument("origen")
+    importar.add_argument("--tipo", choices=("csv", "jsonl"), help="Por defecto se deduce de la extensión")
+    importar.add_argument("--rechazos", help="Informe de filas rechazadas (por defecto <origen>.rechazos.csv)")
+
+    exportar = subcomandos.add_parser("exportar", help="Exporta los productos a un archivo CSV o JSON Lines")
+    exportar.add_argument("destino")
+    exportar.add_argument("--tipo", choices=("csv", "jsonl"), help="Por defecto se deduce de la extensión")
+
+    args = parser.parse_args(argumentos)
+    if args.solo_lectura and args.formato != "binario":
+        parser.error("--solo-lectura solo se puede usar con --formato binario")
+    if args.comando in ("importar", "exportar"):
+        try:
+            # Con SQLite, importar no necesita los productos en memoria (ver Inventario.importar)
+            en_memoria = not (args.comando == "importar" and args.formato == "sqlite")
+            inventario = Inventario(args.archivo, args.formato, args.solo_lectura, args.durabilidad, en_memoria)
+            if args.comando == "importar":
+                inventario.importar(args.origen, args.tipo, args.rechazos)
+                inventario.vaciar()
+            else:
+                inventario.exportar(args.destino, args.tipo)
+        except (OSError, ValueError, csv.Error) as e:
+            print(f"\nError: {e}")
+            return 1
+    elif args.comando == "a-binario":
+        total = json_a_binario(args.origen, args.destino)
+        print(f"{total} productos convertidos a binario en {args.destino}.")
+    elif args.comando == "a-json":
+        total = binario_a_json(args.origen, args.destino)
+        print(f"{total} productos convertidos a JSON en {args.destino}.")
+    else:
+        main(args.archivo, args.formato, args.solo_lectura, args.durabilidad)
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(ejecutar_linea_de_comandos())
\ No newline at end of file
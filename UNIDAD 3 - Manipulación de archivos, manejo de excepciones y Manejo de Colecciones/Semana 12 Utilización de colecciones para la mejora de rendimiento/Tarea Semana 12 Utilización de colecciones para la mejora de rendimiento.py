@@ -1,4 +1,25 @@
+import argparse
+import heapq
 import json
+import math
+import os
+import re
+import sys
+import threading
+import time
+from bisect import bisect_left, insort
+from contextlib import contextmanager, nullcontext
+from operator import itemgetter
+
+# Módulos compartidos de la unidad (carpeta superior): guardado atómico de archivos,
+# almacenamiento en SQLite, normalización de texto para los índices de búsqueda y listados por páginas
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from almacenamiento_sqlite import AlmacenBiblioteca
+from indice_trigramas import normalizar
+from paginacion import EscritorSalida, mostrar_paginas, recorrer
+from persistencia import ArchivoDurable, bloquear_archivo, cargar_json, escribir_atomico, serializar_json
+
+PATRON_PALABRA = re.compile(r"\w+")
 
 class Libro:
     """
@@ -8,14 +29,25 @@ class Libro:
         datos (tuple): Tupla inmutable que contiene (título, autor).
         categoria (str): Categoría del libro.
         prestado (bool): Indica si el libro está prestado o disponible.
+    Con __slots__ cada libro no lleva su propio diccionario de atributos, y la categoría y el
+    autor se internan (sys.intern) para que los libros que los repiten compartan una sola
+    cadena. Con un millón de libros la memoria por libro baja a menos de la mitad (ver
+    benchmark_memoria.py).
     """
+    __slots__ = ('isbn', '_titulo', '_autor', 'categoria', 'prestado')
+
     def __init__(self, isbn, titulo, autor, categoria, prestado=False):
-        # Usando tupla para título y autor como se solicitó
         self.isbn = isbn
-        self.datos = (titulo, autor)  # Tupla para título y autor (inmutables)
-        self.categoria = categoria
+        self._titulo = titulo
+        self._autor = sys.intern(autor)
+        self.categoria = sys.intern(categoria)
         self.prestado = prestado
 
+    @property
+    def datos(self):
+        """Tupla (título, autor): se arma al consultarla y no se puede reemplazar."""
+        return (self._titulo, self._autor)
+
     def to_dict(self):
         """
         Convierte el objeto Libro a un diccionario para su serialización.
@@ -24,8 +56,8 @@ class Libro:
         """
         return {
             "isbn": self.isbn,
-            "titulo": self.datos[0],  # Acceder al título desde la tupla
-            "autor": self.datos[1],   # Acceder al autor desde la tupla
+            "titulo": self._titulo,
+            "autor": self._autor,
             "categoria": self.categoria,
             "prestado": self.prestado
         }
@@ -33,7 +65,45 @@ class Libro:
     def __str__(self):
         """Define cómo se representa el libro como una cadena de texto."""
         estado = "Prestado" if self.prestado else "Disponible"
-        return f"Libro: {self.datos[0]} por {self.datos[1]} - {estado}"
+        return f"Libro: {self._titulo} por {self._autor} - {estado}"
+
+
+class LibrosPrestados:
+    """
+    ISBNs prestados a un usuario, en el orden del préstamo. Se usa como la lista que era antes
+    (append, remove, in, len, recorrido, comparación con listas), pero guarda los ISBN como
+    claves de un diccionario, que conserva el orden: `in` y `remove` no recorren la lista.
+    """
+    __slots__ = ('_isbns',)
+
+    def __init__(self, isbns=()):
+        self._isbns = dict.fromkeys(isbns)
+
+    def append(self, isbn):
+        self._isbns[isbn] = None
+
+    def remove(self, isbn):
+        try:
+            del self._isbns[isbn]
+        except KeyError:
+            raise ValueError(f"{isbn} no está en los libros prestados") from None
+
+    def __contains__(self, isbn):
+        return isbn in self._isbns
+
+    def __len__(self):
+        return len(self._isbns)
+
+    def __iter__(self):
+        return iter(self._isbns)
+
+    def __eq__(self, otro):
+        if isinstance(otro, (LibrosPrestados, list)):
+            return list(self._isbns) == list(otro)
+        return NotImplemented
+
+    def __repr__(self):
+        return repr(list(self._isbns))
 
 
 class Usuario:
@@ -43,14 +113,15 @@ class Usuario:
         archivo_json (str): Ruta del archivo para almacenar usuarios.
         id_usuario (str): Identificador único del usuario.
         nombre (str): Nombre del usuario.
-        libros_prestados (list): Lista de ISBNs de libros prestados al usuario.
+        libros_prestados (LibrosPrestados): ISBNs de los libros prestados al usuario.
     """
+    __slots__ = ('id_usuario', 'nombre', 'libros_prestados')
     archivo_json = 'usuarios.json'
 
     def __init__(self, id_usuario, nombre, libros_prestados=None):
         self.id_usuario = id_usuario
         self.nombre = nombre
-        self.libros_prestados = libros_prestados if libros_prestados else []
+        self.libros_prestados = LibrosPrestados(libros_prestados or ())
 
     def to_dict(self):
         """
@@ -61,180 +132,1330 @@ class Usuario:
         return {
             "id_usuario": self.id_usuario,
             "nombre": self.nombre,
-            "libros_prestados": self.libros_prestados
+            "libros_prestados": list(self.libros_prestados)
         }
 
 
 # Funciones independientes para manejar usuarios
-def cargar_usuarios():
-    """Carga los usuarios desde el archivo JSON y devuelve un diccionario."""
-    try:
-        with open(Usuario.archivo_json, 'r') as archivo:
-            datos_usuarios = json.load(archivo)
-            return {id_usuario: Usuario(**datos) for id_usuario, datos in datos_usuarios.items()}
-    except (FileNotFoundError, json.JSONDecodeError):
-        return {}
+def cargar_usuarios(archivo=None):
+    """
+    Carga los usuarios desde el archivo JSON y devuelve un diccionario.
+    Si el archivo está dañado se aparta una copia (ver persistencia.cargar_json) y se devuelve vacío.
+    Args:
+        archivo (ArchivoDurable, opcional): Si se indica, antes de leer se escribe lo que tenga
+            pendiente, para no leer una versión anterior del archivo.
+    """
+    if archivo is not None:
+        archivo.vaciar()
+    datos_usuarios = cargar_json(Usuario.archivo_json, {})
+    return {id_usuario: Usuario(**datos) for id_usuario, datos in datos_usuarios.items()}
 
 
-def guardar_usuarios(usuarios):
-    """Guarda los usuarios en el archivo JSON."""
-    with open(Usuario.archivo_json, 'w') as archivo:
-        json.dump({id_usuario: usuario.to_dict() for id_usuario, usuario in usuarios.items()}, archivo, indent=4)
+def guardar_usuarios(usuarios, archivo=None):
+    """
+    Guarda los usuarios en el archivo JSON de forma atómica.
+    Args:
+        usuarios (dict): Usuarios por ID.
+        archivo (ArchivoDurable, opcional): Archivo con el nivel de durabilidad elegido;
+            sin él se escribe con fsync en cada guardado.
+    """
+    datos = serializar_json({id_usuario: usuario.to_dict() for id_usuario, usuario in usuarios.items()})
+    if archivo is None:
+        escribir_atomico(Usuario.archivo_json, datos)
+    else:
+        archivo.guardar(datos)
 
 
-def mostrar_usuarios():
+def formatear_usuario(usuario):
+    """Línea con la que se muestra un usuario en los listados."""
+    return f"ID: {usuario.id_usuario}, Nombre: {usuario.nombre}, Libros prestados: {usuario.libros_prestados}"
+
+
+def mostrar_usuarios(archivo=None):
     """Muestra la lista de usuarios registrados."""
-    usuarios = cargar_usuarios()
+    usuarios = cargar_usuarios(archivo)
     if not usuarios:
         print("No hay usuarios registrados.")
         return
-    for usuario in usuarios.values():
-        print(f"ID: {usuario.id_usuario}, Nombre: {usuario.nombre}, Libros prestados: {usuario.libros_prestados}")
+    with EscritorSalida() as salida:
+        for usuario in usuarios.values():
+            salida.escribir(formatear_usuario(usuario))
 
 
-def eliminar_usuario(id_usuario):
+def eliminar_usuario(id_usuario, archivo=None):
     """Elimina un usuario por su ID si existe."""
-    usuarios = cargar_usuarios()
+    usuarios = cargar_usuarios(archivo)
     if id_usuario in usuarios:
         del usuarios[id_usuario]
-        guardar_usuarios(usuarios)
+        guardar_usuarios(usuarios, archivo)
         print(f"Usuario con ID {id_usuario} eliminado.")
     else:
         print("El usuario no existe.")
 
 
+class RegistroUsuarios:
+    """
+    Usuarios cargados en memoria, para no leer y reescribir `usuarios.json` en cada operación.
+    Los cambios solo marcan el registro como modificado; `sincronizar()` los escribe de una vez.
+    Antes de cada consulta se compara la fecha de modificación y el tamaño del archivo con los
+    de la última lectura o escritura: si otro programa lo cambió, se vuelve a cargar.
+    Además de los libros de cada usuario (usuario.libros_prestados) se mantiene el índice inverso
+    `poseedores` (ISBN -> ID del usuario que lo tiene), para saber quién tiene un libro sin
+    recorrer todos los usuarios. Los préstamos y devoluciones deben pasar por `prestar` y
+    `devolver`, que cambian las dos direcciones a la vez.
+    Args:
+        archivo (ArchivoDurable): Archivo de usuarios, con el nivel de durabilidad elegido.
+        almacen (AlmacenBiblioteca, opcional): Con SQLite los usuarios se leen de la base, cada
+            cambio ya lo escribe la Biblioteca fila a fila y `sincronizar()` no escribe nada.
+    """
+    def __init__(self, archivo, almacen=None):
+        self.archivo = archivo
+        self.almacen = almacen
+        self.usuarios = {}
+        self.poseedores = {}  # ISBN -> ID del usuario que lo tiene prestado
+        self.modificado = False
+        # (mtime en ns, tamaño) del archivo tal como lo conocemos; None si no existe y False si
+        # hay una escritura en modo 'grupo' que aún no terminó
+        self._firma = None
+        self.recargar()
+
+    def _firma_archivo(self):
+        if self.almacen is not None:
+            return self.almacen.version_datos()
+        try:
+            estado = os.stat(self.archivo.ruta)
+        except FileNotFoundError:
+            return None
+        return estado.st_mtime_ns, estado.st_size
+
+    def recargar(self):
+        """Vuelve a leer todos los usuarios del archivo, descartando los cambios sin guardar."""
+        if self.almacen is not None:
+            self.usuarios = {id_usuario: Usuario(id_usuario, nombre, prestados)
+                             for id_usuario, (nombre, prestados) in self.almacen.usuarios().items()}
+        else:
+            self.archivo.vaciar()
+            self.usuarios = cargar_usuarios()
+        self.poseedores = {}
+        for usuario in self.usuarios.values():
+            self._indexar(usuario)
+        self.modificado = False
+        self._firma = self._firma_archivo()
+
+    def _indexar(self, usuario):
+        for isbn in usuario.libros_prestados:
+            self.poseedores[isbn] = usuario.id_usuario
+
+    def _desindexar(self, usuario):
+        for isbn in usuario.libros_prestados:
+            if self.poseedores.get(isbn) == usuario.id_usuario:
+                del self.poseedores[isbn]
+
+    def comprobar_cambios_externos(self):
+        """
+        Recarga el archivo si cambió desde la última lectura o escritura. Cuesta un `os.stat`.
+        Si además hay cambios en memoria sin guardar, se conservan los de memoria y se avisa,
+        porque el próximo `sincronizar()` sobrescribirá el archivo.
+        """
+        if not self.cambio_externo():
+            return
+        if self._firma is False:
+            # Último guardado en modo 'grupo': la firma se toma cuando la escritura termina
+            self.archivo.vaciar()
+            self._firma = self._firma_archivo()
+            return
+        if self.modificado:
+            print(f"Advertencia: {self.archivo.ruta} cambió fuera del programa; se conservan los cambios en memoria.")
+            self._firma = self._firma_archivo()
+        else:
+            self.recargar()
+
+    def cambio_externo(self):
+        """Indica, sin recargar, si el archivo pudo cambiar desde la última lectura o escritura."""
+        return self._firma is False or self._firma_archivo() != self._firma
+
+    def obtener(self, id_usuario, comprobar=True):
+        """
+        Devuelve el usuario con ese ID, o None si no está registrado. Con `comprobar=False` no se
+        mira el archivo (quien llama ya lo hizo y no puede permitir una recarga en ese momento).
+        Con `comprobar=True` puede recargar: si otros hilos usan el registro, quien llama debe
+        tenerlo en exclusiva (la Biblioteca usa `_comprobar_usuarios` y después comprobar=False).
+        """
+        if comprobar:
+            self.comprobar_cambios_externos()
+        return self.usuarios.get(id_usuario)
+
+    def todos(self):
+        """Devuelve los usuarios registrados, por ID."""
+        self.comprobar_cambios_externos()
+        return self.usuarios
+
+    def agregar(self, usuario):
+        """Registra (o reemplaza) un usuario."""
+        self.comprobar_cambios_externos()
+        anterior = self.usuarios.get(usuario.id_usuario)
+        if anterior is not None:
+            self._desindexar(anterior)
+        self.usuarios[usuario.id_usuario] = usuario
+        self._indexar(usuario)
+        self.modificado = True
+
+    def eliminar(self, id_usuario):
+        """Elimina un usuario. Devuelve False si no existía."""
+        self.comprobar_cambios_externos()
+        usuario = self.usuarios.pop(id_usuario, None)
+        if usuario is None:
+            return False
+        self._desindexar(usuario)
+        self.modificado = True
+        return True
+
+    def poseedor(self, isbn, comprobar=True):
+        """Devuelve el usuario que tiene prestado el libro, o None si nadie lo tiene (ver `obtener`)."""
+        if comprobar:
+            self.comprobar_cambios_externos()
+        id_usuario = self.poseedores.get(isbn)
+        return None if id_usuario is None else self.usuarios.get(id_usuario)
+
+    def prestar(self, usuario, isbn):
+        """Anota el libro entre los préstamos del usuario y en el índice inverso."""
+        usuario.libros_prestados.append(isbn)
+        self.poseedores[isbn] = usuario.id_usuario
+        self.modificado = True
+
+    def devolver(self, usuario, isbn):
+        """Quita el libro de los préstamos del usuario y del índice inverso."""
+        usuario.libros_prestados.remove(isbn)
+        if self.poseedores.get(isbn) == usuario.id_usuario:
+            del self.poseedores[isbn]
+        self.modificado = True
+
+    def marcar_modificado(self):
+        """Indica que se cambió algún usuario obtenido con `obtener`."""
+        self.modificado = True
+
+    def sincronizar(self):
+        """Escribe los usuarios en el archivo si hubo cambios desde la última escritura."""
+        if not self.modificado or self.almacen is not None:
+            self.modificado = False
+            return
+        guardar_usuarios(self.usuarios, self.archivo)
+        self.modificado = False
+        self._firma = False if self.archivo.durabilidad == 'grupo' else self._firma_archivo()
+
+
+def tokens(texto):
+    """Palabras de un texto, en minúsculas y sin tildes ("El Señor de los Anillos" -> el, senor, ...)."""
+    return PATRON_PALABRA.findall(normalizar(texto))
+
+
+def ruta_categoria(categoria):
+    """
+    Normaliza una categoría con subcategorías separadas por '/':
+    "Ciencia / Divulgación  científica" -> ('ciencia', 'divulgacion cientifica').
+    """
+    return tuple(' '.join(tokens(parte)) for parte in categoria.split('/') if tokens(parte))
+
+
+class IndiceLibros:
+    """
+    Índices secundarios de la biblioteca, actualizados en cada alta y baja de libros:
+        - palabra del título -> ISBNs, y palabra del autor -> ISBNs;
+        - categoría -> ISBNs, donde cada libro figura en su categoría y en todas las superiores
+          ("Ciencia / Física" cuenta también para "Ciencia").
+    Las búsquedas devuelven conjuntos de ISBNs, que se combinan por intersección.
+    """
+    def __init__(self):
+        self._titulo = {}         # palabra -> conjunto de ISBNs
+        self._autor = {}          # palabra -> conjunto de ISBNs
+        self._categoria = {}      # ruta de categoría (tupla) -> conjunto de ISBNs
+        self._rutas_por_nombre = {}  # nombre de una (sub)categoría -> rutas que terminan en él
+        self._orden = {}          # ISBN -> número de orden, para devolver resultados estables
+        self._contador = 0
+        # Palabras ordenadas de cada índice, para buscar por prefijo con bisect
+        self._vocabulario = {'titulo': [], 'autor': []}
+
+    @staticmethod
+    def _añadir_a(indice, clave, isbn):
+        conjunto = indice.get(clave)
+        if conjunto is None:
+            indice[clave] = {isbn}
+            return True
+        conjunto.add(isbn)
+        return False
+
+    @staticmethod
+    def _quitar_de(indice, clave, isbn):
+        conjunto = indice.get(clave)
+        if conjunto is None:
+            return False
+        conjunto.discard(isbn)
+        if conjunto:
+            return False
+        del indice[clave]
+        return True
+
+    def _campos(self, libro):
+        """Pares (nombre del índice de palabras, palabras del libro) para título y autor."""
+        return (('titulo', self._titulo, set(tokens(libro.datos[0]))),
+                ('autor', self._autor, set(tokens(libro.datos[1]))))
+
+    def agregar(self, libro):
+        """Indexa un libro."""
+        if libro.isbn not in self._orden:
+            self._orden[libro.isbn] = self._contador
+            self._contador += 1
+        for nombre, indice, palabras in self._campos(libro):
+            for palabra in palabras:
+                if self._añadir_a(indice, palabra, libro.isbn):
+                    insort(self._vocabulario[nombre], palabra)
+        ruta = ruta_categoria(libro.categoria)
+        for fin in range(1, len(ruta) + 1):
+            if self._añadir_a(self._categoria, ruta[:fin], libro.isbn):
+                self._rutas_por_nombre.setdefault(ruta[fin - 1], set()).add(ruta[:fin])
+
+    def eliminar(self, libro, conservar_orden=False):
+        """
+        Quita un libro de los índices (debe tener los mismos datos con los que se indexó).
+        Con `conservar_orden`, el ISBN mantiene su posición si se vuelve a agregar.
+        """
+        if not conservar_orden:
+            self._orden.pop(libro.isbn, None)
+        for nombre, indice, palabras in self._campos(libro):
+            for palabra in palabras:
+                if self._quitar_de(indice, palabra, libro.isbn):
+                    vocabulario = self._vocabulario[nombre]
+                    del vocabulario[bisect_left(vocabulario, palabra)]
+        ruta = ruta_categoria(libro.categoria)
+        for fin in range(1, len(ruta) + 1):
+            if self._quitar_de(self._categoria, ruta[:fin], libro.isbn):
+                self._quitar_de(self._rutas_por_nombre, ruta[fin - 1], ruta[:fin])
+
+    def ordenar(self, isbns):
+        """Los ISBNs dados, en el orden en que se indexaron."""
+        return sorted(isbns, key=self._orden.__getitem__)
+
+    def _buscar_palabras(self, nombre, indice, consulta):
+        """
+        ISBNs cuyo campo contiene todas las palabras de la consulta. Cada palabra de la consulta
+        coincide con las palabras que empiezan por ella ("quij" encuentra "Quijote").
+        """
+        resultado = None
+        vocabulario = self._vocabulario[nombre]
+        for palabra in sorted(set(tokens(consulta)), key=len, reverse=True):
+            coincidencias = set()
+            posicion = bisect_left(vocabulario, palabra)
+            while posicion < len(vocabulario) and vocabulario[posicion].startswith(palabra):
+                coincidencias |= indice[vocabulario[posicion]]
+                posicion += 1
+            resultado = coincidencias if resultado is None else resultado & coincidencias
+            if not resultado:
+                return set()
+        return resultado if resultado is not None else set()
+
+    def por_titulo(self, consulta):
+        return self._buscar_palabras('titulo', self._titulo, consulta)
+
+    def por_autor(self, consulta):
+        return self._buscar_palabras('autor', self._autor, consulta)
+
+    def por_categoria(self, consulta):
+        """
+        ISBNs de una categoría y de todas sus subcategorías. Una ruta completa ("Ciencia / Física")
+        se busca desde la raíz; un solo nombre ("Física") coincide también con las subcategorías
+        que se llaman así, estén donde estén.
+        """
+        ruta = ruta_categoria(consulta)
+        if not ruta:
+            return set()
+        resultado = set(self._categoria.get(ruta, ()))
+        if len(ruta) == 1:
+            for ruta_completa in self._rutas_por_nombre.get(ruta[0], ()):
+                resultado |= self._categoria[ruta_completa]
+        return resultado
+
+
+class MotorBusqueda:
+    """
+    Búsqueda por relevancia (BM25) sobre el título, el autor y la categoría de los libros.
+    Cada libro es un "documento" con las palabras normalizadas de sus tres campos; las palabras
+    del título pesan más que las del autor y las de la categoría. Una consulta puntúa solo los
+    libros que contienen alguna de sus palabras y devuelve los k mejores con un heap.
+    El índice se puede guardar junto a biblioteca.json para no reconstruirlo en cada inicio.
+    """
+    VERSION = 1
+    PESOS = {'titulo': 2.0, 'autor': 1.5, 'categoria': 1.0}
+    K1 = 1.2   # Saturación de la frecuencia de cada palabra
+    B = 0.75   # Cuánto se penalizan los documentos largos
+
+    def __init__(self):
+        self._publicaciones = {}  # palabra -> {ISBN: frecuencia ponderada}
+        self._longitudes = {}     # ISBN -> longitud ponderada del documento
+        self._longitud_total = 0.0
+
+    def __len__(self):
+        return len(self._longitudes)
+
+    def _frecuencias(self, libro):
+        frecuencias = {}
+        for campo, texto in (('titulo', libro.datos[0]), ('autor', libro.datos[1]),
+                             ('categoria', libro.categoria)):
+            peso = self.PESOS[campo]
+            for palabra in tokens(texto):
+                frecuencias[palabra] = frecuencias.get(palabra, 0.0) + peso
+        return frecuencias
+
+    def agregar(self, libro):
+        """Indexa un libro (si el ISBN ya estaba indexado, lo reemplaza)."""
+        self.eliminar(libro.isbn)
+        frecuencias = self._frecuencias(libro)
+        for palabra, frecuencia in frecuencias.items():
+            self._publicaciones.setdefault(palabra, {})[libro.isbn] = frecuencia
+        longitud = sum(frecuencias.values())
+        self._longitudes[libro.isbn] = longitud
+        self._longitud_total += longitud
+
+    def eliminar(self, isbn, libro=None):
+        """
+        Quita un ISBN del índice. Con el libro se recorren solo sus palabras; sin él se buscan
+        en todo el vocabulario, lo que solo ocurre al reemplazar un libro ya indexado.
+        """
+        longitud = self._longitudes.pop(isbn, None)
+        if longitud is None:
+            return
+        self._longitud_total -= longitud
+        palabras = self._frecuencias(libro) if libro is not None else list(self._publicaciones)
+        for palabra in palabras:
+            publicacion = self._publicaciones.get(palabra)
+            if publicacion is not None and publicacion.pop(isbn, None) is not None and not publicacion:
+                del self._publicaciones[palabra]
+
+    def buscar(self, consulta, k=10):
+        """
+        Devuelve los k libros más relevantes para la consulta.
+        Returns:
+            list: Pares (ISBN, puntuación), de mayor a menor puntuación.
+        """
+        total = len(self._longitudes)
+        if not total:
+            return []
+        promedio = self._longitud_total / total
+        puntuaciones = {}
+        for palabra in set(tokens(consulta)):
+            publicacion = self._publicaciones.get(palabra)
+            if not publicacion:
+                continue
+            idf = math.log((total - len(publicacion) + 0.5) / (len(publicacion) + 0.5) + 1)
+            for isbn, frecuencia in publicacion.items():
+                normalizada = 1 - self.B + self.B * self._longitudes[isbn] / promedio
+                puntuacion = idf * frecuencia * (self.K1 + 1) / (frecuencia + self.K1 * normalizada)
+                puntuaciones[isbn] = puntuaciones.get(isbn, 0.0) + puntuacion
+        return heapq.nlargest(k, puntuaciones.items(), key=itemgetter(1))
+
+    def guardar(self, ruta, firma):
+        """
+        Guarda el índice en `ruta` junto con la firma del archivo de libros del que se construyó.
+        """
+        datos = {'version': self.VERSION, 'firma': firma, 'pesos': self.PESOS,
+                 'longitudes': self._longitudes, 'publicaciones': self._publicaciones}
+        escribir_atomico(ruta, json.dumps(datos, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+
+    @classmethod
+    def cargar(cls, ruta, firma):
+        """
+        Carga un índice guardado si corresponde a la versión actual del archivo de libros
+        (misma firma, misma versión y mismos pesos).
+        Returns:
+            MotorBusqueda: El índice cargado, o None si no existe, está dañado o quedó desactualizado.
+        """
+        try:
+            with open(ruta, 'r', encoding='utf-8') as archivo:
+                datos = json.load(archivo)
+        except (OSError, ValueError):
+            return None
+        if (not isinstance(datos, dict) or datos.get('version') != cls.VERSION
+                or datos.get('firma') != firma or datos.get('pesos') != cls.PESOS):
+            return None
+        motor = cls()
+        motor._longitudes = datos['longitudes']
+        motor._publicaciones = datos['publicaciones']
+        motor._longitud_total = sum(motor._longitudes.values())
+        return motor
+
+
+def formatear_fecha(segundos):
+    """Fecha y hora local legible a partir de segundos desde la época."""
+    return time.strftime('%Y-%m-%d %H:%M', time.localtime(segundos))
+
+
+class Prestamo:
+    """
+    Un préstamo del historial.
+    Attributes:
+        isbn (str): Libro prestado.
+        id_usuario (str): Usuario que lo recibió.
+        fecha_prestamo (float): Momento del préstamo, en segundos desde la época.
+        fecha_vencimiento (float): Momento en que debe devolverse.
+        fecha_devolucion (float): Momento de la devolución, o None si sigue prestado.
+    """
+    def __init__(self, isbn, id_usuario, fecha_prestamo, fecha_vencimiento, fecha_devolucion=None):
+        self.isbn = isbn
+        self.id_usuario = id_usuario
+        self.fecha_prestamo = fecha_prestamo
+        self.fecha_vencimiento = fecha_vencimiento
+        self.fecha_devolucion = fecha_devolucion
+
+    def __str__(self):
+        devolucion = formatear_fecha(self.fecha_devolucion) if self.fecha_devolucion is not None else "pendiente"
+        return (f"ISBN {self.isbn} - usuario {self.id_usuario}: prestado {formatear_fecha(self.fecha_prestamo)}, "
+                f"vence {formatear_fecha(self.fecha_vencimiento)}, devuelto {devolucion}")
+
+
+class RegistroPrestamos:
+    """
+    Historial de préstamos en un archivo JSON Lines al que solo se añaden líneas: una por
+    préstamo ({"evento": "prestamo", ...}) y una por devolución ({"evento": "devolucion", ...}).
+    Al iniciar se lee completo y se arma en memoria:
+        - la lista de préstamos en orden de llegada,
+        - el historial de cada libro y de cada usuario (posiciones en esa lista),
+        - el préstamo activo de cada libro,
+        - un heap mínimo por fecha de vencimiento, para obtener los vencidos sin recorrer todo.
+    Las devoluciones no se quitan del heap al momento: se descartan cuando llegan a la cima y,
+    si llegan a ser la mitad del heap, se reconstruye solo con los préstamos activos.
+    Args:
+        ruta (str): Archivo del historial.
+        durabilidad (str): Con 'siempre' cada línea se fuerza al disco (fsync) antes de seguir;
+            con 'grupo' o 'ninguna' solo se vacía el búfer y `vaciar()` hace el fsync.
+    """
+    def __init__(self, ruta, durabilidad='siempre'):
+        self.ruta = ruta
+        self.durabilidad = durabilidad
+        self.prestamos = []
+        self._por_libro = {}      # ISBN -> [posición en self.prestamos, ...]
+        self._por_usuario = {}    # ID de usuario -> [posición, ...]
+        self._activos = {}        # ISBN -> posición del préstamo sin devolver
+        self._vencimientos = []   # heap de (fecha de vencimiento, posición)
+        self._devueltos_en_heap = 0
+        self._leido = 0           # Bytes del archivo ya incorporados a memoria
+        self._cerrojo = threading.Lock()
+        self._archivo = None
+        self.comprobar_cambios_externos()
+
+    def _aplicar(self, evento):
+        """Incorpora a memoria un evento del historial."""
+        isbn, id_usuario = evento['isbn'], evento['usuario']
+        if evento['evento'] == 'prestamo':
+            posicion = len(self.prestamos)
+            self.prestamos.append(Prestamo(isbn, id_usuario, evento['fecha'], evento['vence']))
+            self._por_libro.setdefault(isbn, []).append(posicion)
+            self._por_usuario.setdefault(id_usuario, []).append(posicion)
+            anterior = self._activos.get(isbn)
+            # El nuevo préstamo pasa a ser el activo antes de cerrar el anterior: si al cerrarlo
+            # se reconstruye el heap, se arma con los activos y el anterior no debe estar entre ellos
+            self._activos[isbn] = posicion
+            heapq.heappush(self._vencimientos, (evento['vence'], posicion))
+            if anterior is not None:
+                # Préstamo sin devolución registrada (por ejemplo, un cierre inesperado)
+                self._cerrar(anterior, evento['fecha'])
+        elif evento['evento'] == 'devolucion':
+            posicion = self._activos.get(isbn)
+            if posicion is not None and self.prestamos[posicion].id_usuario == id_usuario:
+                del self._activos[isbn]
+                self._cerrar(posicion, evento['fecha'])
+
+    def _cerrar(self, posicion, fecha):
+        """Marca un préstamo como devuelto; su entrada del heap queda para descartarla después."""
+        self.prestamos[posicion].fecha_devolucion = fecha
+        self._devueltos_en_heap += 1
+        if self._devueltos_en_heap > len(self._vencimientos) // 2:
+            self._vencimientos = [(self.prestamos[p].fecha_vencimiento, p) for p in self._activos.values()]
+            heapq.heapify(self._vencimientos)
+            self._devueltos_en_heap = 0
+
+    def comprobar_cambios_externos(self):
+        """
+        Lee las líneas que se añadieron al archivo desde la última lectura (otro proceso, o el
+        archivo completo la primera vez). Una última línea incompleta, de una escritura
+        interrumpida, se recorta para que la siguiente no quede pegada a ella.
+        """
+        with self._cerrojo:
+            try:
+                if os.path.getsize(self.ruta) == self._leido:
+                    return
+                with open(self.ruta, 'rb') as archivo:
+                    archivo.seek(self._leido)
+                    nuevos = archivo.read()
+            except FileNotFoundError:
+                return
+            completos = nuevos.rfind(b'\n') + 1
+            if completos < len(nuevos):
+                print(f"Advertencia: se descartó una línea incompleta al final de {self.ruta}.")
+                os.truncate(self.ruta, self._leido + completos)
+            for numero, linea in enumerate(nuevos[:completos].splitlines(), 1):
+                try:
+                    self._aplicar(json.loads(linea))
+                except (ValueError, KeyError, TypeError):
+                    print(f"Advertencia: se ignoró una línea dañada de {self.ruta}.")
+            self._leido += completos
+
+    def _anotar(self, evento):
+        """Añade un evento al final del archivo y lo incorpora a memoria (con el cerrojo tomado)."""
+        linea = (json.dumps(evento, ensure_ascii=False) + '\n').encode('utf-8')
+        if self._archivo is None:
+            self._archivo = open(self.ruta, 'ab')
+        self._archivo.write(linea)
+        self._archivo.flush()
+        if self.durabilidad == 'siempre':
+            os.fsync(self._archivo.fileno())
+        self._leido += len(linea)
+        self._aplicar(evento)
+
+    def prestar(self, isbn, id_usuario, dias, ahora=None):
+        """Registra un préstamo que vence en `dias` días y lo devuelve."""
+        ahora = time.time() if ahora is None else ahora
+        with self._cerrojo:
+            self._anotar({'evento': 'prestamo', 'isbn': isbn, 'usuario': id_usuario,
+                          'fecha': round(ahora, 3), 'vence': round(ahora + dias * 86400, 3)})
+            return self.prestamos[-1]
+
+    def devolver(self, isbn, id_usuario, ahora=None):
+        """Registra la devolución del préstamo activo del libro y lo devuelve (None si no había)."""
+        ahora = time.time() if ahora is None else ahora
+        with self._cerrojo:
+            posicion = self._activos.get(isbn)
+            if posicion is None or self.prestamos[posicion].id_usuario != id_usuario:
+                return None
+            self._anotar({'evento': 'devolucion', 'isbn': isbn, 'usuario': id_usuario, 'fecha': round(ahora, 3)})
+            return self.prestamos[posicion]
+
+    def activo(self, isbn):
+        """Préstamo sin devolver del libro, o None."""
+        posicion = self._activos.get(isbn)
+        return self.prestamos[posicion] if posicion is not None else None
+
+    def activos(self):
+        """Préstamos sin devolver, por ISBN."""
+        with self._cerrojo:
+            return {isbn: self.prestamos[p] for isbn, p in self._activos.items()}
+
+    def historial_libro(self, isbn):
+        """Préstamos de un libro, del más reciente al más antiguo."""
+        with self._cerrojo:
+            return [self.prestamos[p] for p in reversed(self._por_libro.get(isbn, []))]
+
+    def historial_usuario(self, id_usuario):
+        """Préstamos de un usuario, del más reciente al más antiguo."""
+        with self._cerrojo:
+            return [self.prestamos[p] for p in reversed(self._por_usuario.get(id_usuario, []))]
+
+    def vencidos(self, ahora=None):
+        """
+        Préstamos sin devolver cuya fecha de vencimiento ya pasó, del más atrasado al menos.
+        Recorre el heap como un árbol sin modificarlo: solo baja por los nodos vencidos, porque
+        los hijos de un nodo que aún no vence tampoco vencen. Cuesta O(k log k) para k vencidos,
+        en lugar de revisar todos los préstamos.
+        """
+        ahora = time.time() if ahora is None else ahora
+        with self._cerrojo:
+            heap = self._vencimientos
+            while heap and self.prestamos[heap[0][1]].fecha_devolucion is not None:
+                heapq.heappop(heap)
+                self._devueltos_en_heap -= 1
+            resultado = []
+            frontera = [(heap[0], 0)] if heap and heap[0][0] <= ahora else []
+            while frontera:
+                (_, posicion), nodo = heapq.heappop(frontera)
+                if self.prestamos[posicion].fecha_devolucion is None:
+                    resultado.append(self.prestamos[posicion])
+                for hijo in (2 * nodo + 1, 2 * nodo + 2):
+                    if hijo < len(heap) and heap[hijo][0] <= ahora:
+                        heapq.heappush(frontera, (heap[hijo], hijo))
+            return resultado
+
+    def vaciar(self):
+        """Fuerza al disco las líneas escritas (útil con durabilidad 'grupo' o 'ninguna')."""
+        with self._cerrojo:
+            if self._archivo is not None:
+                self._archivo.flush()
+                os.fsync(self._archivo.fileno())
+
+
+class CerrojoCompartido:
+    """
+    Cerrojo de lectores y escritor: muchas operaciones a la vez en modo compartido, o una sola en
+    modo exclusivo. Mientras un hilo espera el modo exclusivo no entran nuevos lectores, para que
+    no espere indefinidamente.
+    """
+    def __init__(self):
+        self._condicion = threading.Condition()
+        self._lectores = 0
+        self._escribiendo = False
+        self._esperando = 0  # Hilos que esperan el modo exclusivo
+
+    @contextmanager
+    def compartido(self):
+        with self._condicion:
+            while self._escribiendo or self._esperando:
+                self._condicion.wait()
+            self._lectores += 1
+        try:
+            yield
+        finally:
+            with self._condicion:
+                self._lectores -= 1
+                if not self._lectores:
+                    self._condicion.notify_all()
+
+    @contextmanager
+    def exclusivo(self):
+        with self._condicion:
+            self._esperando += 1
+            while self._escribiendo or self._lectores:
+                self._condicion.wait()
+            self._esperando -= 1
+            self._escribiendo = True
+        try:
+            yield
+        finally:
+            with self._condicion:
+                self._escribiendo = False
+                self._condicion.notify_all()
+
+
+class CerrojosPorClave:
+    """
+    Un cerrojo por clave (por ejemplo ('libro', isbn) o ('usuario', id)), creado la primera vez
+    que se pide. `tomar` adquiere varios a la vez siempre en orden de clave, así dos operaciones
+    que necesitan los mismos cerrojos nunca se bloquean mutuamente.
+    """
+    def __init__(self):
+        self._cerrojos = {}
+        self._cerrojo = threading.Lock()  # Protege la creación de cerrojos
+
+    @contextmanager
+    def tomar(self, *claves):
+        with self._cerrojo:
+            cerrojos = [self._cerrojos.setdefault(clave, threading.Lock()) for clave in sorted(set(claves))]
+        tomados = []
+        try:
+            for cerrojo in cerrojos:
+                cerrojo.acquire()
+                tomados.append(cerrojo)
+            yield
+        finally:
+            for cerrojo in reversed(tomados):
+                cerrojo.release()
+
+
+# Claves de orden de los listados (ver paginacion.py): deben ser únicas, por eso las de texto
+# terminan en el ISBN o el ID
+ORDENES_LIBROS = {
+    'isbn': lambda libro: libro.isbn,
+    'titulo': lambda libro: (normalizar(libro.datos[0]), libro.isbn),
+    'autor': lambda libro: (normalizar(libro.datos[1]), libro.isbn),
+    'categoria': lambda libro: (normalizar(libro.categoria), libro.isbn),
+}
+ORDENES_USUARIOS = {
+    'id': lambda usuario: usuario.id_usuario,
+    'nombre': lambda usuario: (normalizar(usuario.nombre), usuario.id_usuario),
+}
+POR_PAGINA = 20  # Elementos por página en los listados del menú
+INTERVALO_SINCRONIZACION = 30  # Segundos entre escrituras de los préstamos en el menú (ver sincronizar_cada)
+
+
 class Biblioteca:
-    def __init__(self, archivo_json='biblioteca.json'):
+    """
+    Biblioteca con sus libros por ISBN y el registro de usuarios en memoria.
+    Los préstamos y devoluciones solo cambian los datos en memoria; `sincronizar()` escribe
+    los libros y los usuarios modificados. Con JSON eso reescribe biblioteca.json y usuarios.json
+    completos, así que el menú no lo hace en cada opción sino cada INTERVALO_SINCRONIZACION
+    segundos y al salir (ver `sincronizar_cada`). Cada préstamo y devolución queda igualmente al
+    momento en el historial, y al iniciar se rehacen desde él los que no llegaron a guardarse.
+
+    Concurrencia: varios hilos pueden prestar y devolver a la vez. Cada préstamo toma el cerrojo
+    de su ISBN y el de su usuario (ver CerrojosPorClave) y hace la comprobación y el cambio dentro
+    de ellos; las operaciones que recorren o reemplazan los datos completos (sincronizar, recargar,
+    añadir o quitar libros y usuarios) usan el modo exclusivo de `_estado`. Con `multiproceso`,
+    además, cada operación se hace con los archivos bloqueados entre procesos: se recargan si otro
+    proceso los cambió y se guardan antes de soltarlos. Orden de los cerrojos: archivo de libros,
+    archivo de usuarios, `_estado`, cerrojos por clave.
+    Args:
+        archivo_json (str): Archivo donde se guardan los libros.
+        durabilidad (str): 'siempre' (fsync en cada guardado), 'grupo' (un hilo escribe el último
+            estado cada pocos milisegundos) o 'ninguna' (sin fsync). Ver persistencia.py.
+        multiproceso (bool): Si otros procesos usan los mismos archivos a la vez. No se puede
+            combinar con la durabilidad 'grupo', que retrasa las escrituras.
+        dias_prestamo (int): Plazo de devolución de cada préstamo.
+        almacenamiento (str): 'json' (biblioteca.json y usuarios.json) o 'sqlite' (libros,
+            usuarios y préstamos en curso en '<archivo sin extensión>.db'). Con SQLite cada
+            operación escribe solo sus filas, dentro de una transacción que en modo multiproceso
+            hace además de cerrojo entre procesos (ver almacenamiento_sqlite.py).
+    Cada préstamo y devolución queda además en el historial '<archivo>.prestamos.jsonl'
+    (ver RegistroPrestamos), con su fecha y su vencimiento.
+    """
+    def __init__(self, archivo_json='biblioteca.json', durabilidad='siempre', multiproceso=False,
+                 dias_prestamo=14, almacenamiento='json'):
+        if almacenamiento not in ('json', 'sqlite'):
+            raise ValueError(f"Almacenamiento desconocido: {almacenamiento}")
+        if multiproceso and durabilidad == 'grupo' and almacenamiento == 'json':
+            raise ValueError("El modo multiproceso no se puede combinar con la durabilidad 'grupo'.")
         self.archivo_json = archivo_json
+        self._almacen = None
+        if almacenamiento == 'sqlite':
+            self._almacen = AlmacenBiblioteca(os.path.splitext(archivo_json)[0] + '.db', durabilidad)
+        self.multiproceso = multiproceso
+        self._estado = CerrojoCompartido()
+        self._cerrojos = CerrojosPorClave()
+        self._archivo_libros = ArchivoDurable(archivo_json, durabilidad)
+        self._archivo_usuarios = ArchivoDurable(Usuario.archivo_json, durabilidad)
         self.libros = self.cargar_libros()
+        self._libros_modificados = False
+        self._firma_libros_leida = self._firma_libros()
+        self.indice = IndiceLibros()
+        for libro in self.libros.values():
+            self.indice.agregar(libro)
+        # Índice de relevancia, guardado junto a biblioteca.json ('biblioteca.indice.json')
+        self.archivo_indice = os.path.splitext(archivo_json)[0] + '.indice.json'
+        self.motor = MotorBusqueda.cargar(self.archivo_indice, self._firma_libros())
+        if self.motor is None or len(self.motor) != len(self.libros):
+            self.motor = MotorBusqueda()
+            for libro in self.libros.values():
+                self.motor.agregar(libro)
+            self.guardar_indice()
+        self.usuarios = RegistroUsuarios(self._archivo_usuarios, self._almacen)
+        self.dias_prestamo = dias_prestamo
+        self.archivo_prestamos = os.path.splitext(archivo_json)[0] + '.prestamos.jsonl'
+        self.prestamos = RegistroPrestamos(self.archivo_prestamos, durabilidad)
+        self._en_lote = False
+        self._ultima_sincronizacion = time.monotonic()
+        if self._almacen is None and not multiproceso:
+            self._rehacer_desde_historial()
         self.usuarios_registrados = set()  # Conjunto para IDs de usuario únicos
 
     def cargar_libros(self):
-        """Carga los libros desde el archivo JSON."""
-        try:
-            with open(self.archivo_json, 'r') as archivo:
-                datos_libros = json.load(archivo)
-                return {isbn: Libro(**datos) for isbn, datos in datos_libros.items()}
-        except (FileNotFoundError, json.JSONDecodeError):
-            return {}
+        """Carga los libros desde el archivo JSON; si está dañado se aparta una copia y se empieza vacío."""
+        if self._almacen is not None:
+            return {fila[0]: Libro(*fila) for fila in self._almacen.libros()}
+        datos_libros = cargar_json(self.archivo_json, {})
+        # La clave es el propio libro.isbn: json.load crea otra cadena igual para la clave del archivo
+        libros = (Libro(**datos) for datos in datos_libros.values())
+        return {libro.isbn: libro for libro in libros}
 
     def guardar_libros(self):
-        """Guarda los libros en el archivo JSON."""
-        with open(self.archivo_json, 'w') as archivo:
-            json.dump({isbn: libro.to_dict() for isbn, libro in self.libros.items()}, archivo, indent=4)
+        """Guarda los libros en el archivo JSON de forma atómica, con la durabilidad elegida."""
+        if self._almacen is not None:
+            # Con SQLite cada operación ya escribió su fila
+            self._libros_modificados = False
+            return
+        self._archivo_libros.guardar(
+            serializar_json({isbn: libro.to_dict() for isbn, libro in self.libros.items()}, ensure_ascii=False))
+        self._libros_modificados = False
+        if self._archivo_libros.durabilidad != 'grupo':
+            self._firma_libros_leida = self._firma_libros()
 
-    def añadir_libro(self, libro):
-        """Añade un libro a la biblioteca."""
-        self.libros[libro.isbn] = libro
-        self.guardar_libros()
-        print(f"El libro '{libro}' se guardó correctamente.")  # Aquí se usa __str__
+    def sincronizar(self):
+        """Escribe los libros y los usuarios que cambiaron desde la última escritura."""
+        with self._estado.exclusivo():
+            if self._libros_modificados:
+                self.guardar_libros()
+            self.usuarios.sincronizar()
+            self._ultima_sincronizacion = time.monotonic()
 
-    def quitar_libros(self, isbn):
-        """Elimina un libro de la biblioteca por su ISBN."""
-        if isbn in self.libros:
-            libro = self.libros[isbn]
-            del self.libros[isbn]
-            self.guardar_libros()
-            print(f"Libro '{libro}' eliminado de la biblioteca.")
-        else:
-            print(f"No se encontró ningún libro con ISBN {isbn}")
+    def sincronizar_cada(self, segundos=INTERVALO_SINCRONIZACION):
+        """
+        Sincroniza solo si pasaron `segundos` desde la última vez. El menú lo llama después de cada
+        opción: con muchos usuarios, reescribir usuarios.json tras cada préstamo limitaba el menú
+        a una operación por segundo. Lo que se pierda por un cierre inesperado está en el
+        historial de préstamos y se rehace al iniciar (ver `_rehacer_desde_historial`).
+        """
+        if time.monotonic() - self._ultima_sincronizacion >= segundos:
+            self.sincronizar()
 
-    def prestar_libro(self, isbn, id_usuario):
-        """Presta un libro a un usuario."""
-        usuarios = cargar_usuarios()  # Usar la función independiente
+    def _rehacer_desde_historial(self):
+        """
+        Con JSON, al iniciar: aplica a los usuarios y los libros los préstamos y devoluciones del
+        historial que no llegaron a biblioteca.json y usuarios.json (el programa terminó antes de
+        sincronizar) y, si hubo alguno, sincroniza. Solo se quitan préstamos que el historial da
+        por cerrados; los que no aparecen en él (anteriores al historial) se conservan.
+        En modo multiproceso no se usa: cada operación guarda antes de soltar los archivos, y el
+        historial puede ir por delante de ellos solo porque otro proceso está a mitad de una.
+        """
+        cambios = 0
+        activos = self.prestamos.activos()
+        for usuario in self.usuarios.usuarios.values():
+            for isbn in list(usuario.libros_prestados):
+                prestamo = activos.get(isbn)
+                if prestamo is not None and prestamo.id_usuario == usuario.id_usuario:
+                    continue
+                if any(p.id_usuario == usuario.id_usuario for p in self.prestamos.historial_libro(isbn)):
+                    self.usuarios.devolver(usuario, isbn)
+                    if isbn in self.libros and prestamo is None:
+                        self.libros[isbn].prestado = False
+                    cambios += 1
+        for isbn, prestamo in activos.items():
+            usuario = self.usuarios.obtener(prestamo.id_usuario, comprobar=False)
+            libro = self.libros.get(isbn)
+            if usuario is None or libro is None or isbn in usuario.libros_prestados:
+                continue
+            anterior = self.usuarios.poseedor(isbn, comprobar=False)
+            if anterior is not None:
+                self.usuarios.devolver(anterior, isbn)
+            libro.prestado = True
+            self.usuarios.prestar(usuario, isbn)
+            cambios += 1
+        if cambios:
+            self._libros_modificados = True
+            print(f"Se recuperaron {cambios} préstamo(s) y devolución(es) del historial que no estaban guardados.")
+            self.sincronizar()
 
-        if id_usuario not in usuarios:
-            print("El usuario no está registrado.")
+    @contextmanager
+    def lote(self):
+        """
+        Agrupa varias operaciones de un mismo hilo: las altas y bajas de libros y usuarios no
+        guardan cada una, sino que `sincronizar()` escribe todo una vez al terminar el bloque.
+        Con SQLite el lote es una sola transacción. Un lote dentro de otro forma parte del exterior.
+        """
+        if self._en_lote:
+            yield self
             return
+        self._en_lote = True
+        try:
+            with self._almacen.transaccion() if self._almacen is not None else nullcontext():
+                yield self
+        finally:
+            self._en_lote = False
+            self.sincronizar()
 
-        usuario = usuarios[id_usuario]
+    def _recargar_cambios_externos(self):
+        """
+        Modo multiproceso: incorpora lo que otro proceso haya escrito. Los usuarios se recargan
+        completos; de los libros solo se actualizan los que cambiaron, para no reconstruir los índices.
+        """
+        with self._estado.exclusivo():
+            self.usuarios.comprobar_cambios_externos()
+            self.prestamos.comprobar_cambios_externos()
+            if self._firma_libros() == self._firma_libros_leida:
+                return
+            nuevos = self.cargar_libros()
+            for isbn in [isbn for isbn in self.libros if isbn not in nuevos]:
+                libro = self.libros.pop(isbn)
+                self.indice.eliminar(libro)
+                self.motor.eliminar(isbn, libro)
+            for isbn, libro in nuevos.items():
+                actual = self.libros.get(isbn)
+                if actual is not None and (actual.datos, actual.categoria) == (libro.datos, libro.categoria):
+                    actual.prestado = libro.prestado
+                    continue
+                if actual is not None:
+                    self.indice.eliminar(actual, conservar_orden=True)
+                    self.motor.eliminar(isbn, actual)
+                self.libros[isbn] = libro
+                self.indice.agregar(libro)
+                self.motor.agregar(libro)
+            self._firma_libros_leida = self._firma_libros()
 
-        if len(usuario.libros_prestados) >= 3:
-            print("El usuario ya tiene el máximo de libros prestados (3).")
+    @contextmanager
+    def _operacion(self):
+        """
+        Envuelve cada operación que cambia datos. En modo multiproceso bloquea los dos archivos
+        (siempre en el mismo orden), incorpora los cambios de otros procesos y, al terminar,
+        guarda antes de soltar los cerrojos. Fuera de ese modo solo recarga los usuarios si el
+        archivo se editó desde fuera.
+        Con SQLite la operación es una transacción, que hace también de cerrojo entre procesos.
+        Se abre antes de tomar los cerrojos en memoria para que todos los hilos los tomen en el
+        mismo orden (primero la base, después `_estado` y los de cada clave).
+        """
+        if self._almacen is not None:
+            with self._almacen.transaccion():
+                if self.multiproceso:
+                    self._recargar_cambios_externos()
+                else:
+                    self._comprobar_usuarios()
+                yield
+                # Dentro de la transacción la versión solo pudo cambiar por esta operación
+                self._firma_libros_leida = self._firma_libros()
+                self.usuarios.sincronizar()
             return
+        if not self.multiproceso:
+            self._comprobar_usuarios()
+            yield
+            return
+        with bloquear_archivo(self.archivo_json), bloquear_archivo(self._archivo_usuarios.ruta):
+            self._recargar_cambios_externos()
+            yield
+            self.sincronizar()
 
-        libro = self.libros.get(isbn)
-        if libro and not libro.prestado:
-            libro.prestado = True
-            usuario.libros_prestados.append(isbn)
-            self.guardar_libros()
-            guardar_usuarios(usuarios)
-            print(f"Libro '{libro}' prestado a {usuario.nombre} con éxito.")
-        else:
-            print("Libro no disponible para préstamo.")
+    def _comprobar_usuarios(self):
+        """
+        Recarga los usuarios si su archivo cambió desde fuera. La recarga reemplaza el diccionario
+        y el índice inverso, así que se hace con `_estado` exclusivo, para no cruzarse con un
+        préstamo de otro hilo; si no cambió, solo cuesta un `os.stat` y no toma el cerrojo.
+        Las consultas lo llaman antes de `usuarios.obtener(..., comprobar=False)`.
+        """
+        if self.usuarios.cambio_externo():
+            with self._estado.exclusivo():
+                self.usuarios.comprobar_cambios_externos()
 
-    def devolver_libro(self, isbn, id_usuario):
-        """Devuelve un libro prestado por un usuario."""
-        usuarios = cargar_usuarios()  # Usar la función independiente
+    def vaciar(self):
+        """
+        Sincroniza, escribe ya en disco los guardados pendientes (durabilidad 'grupo') y guarda
+        el índice de relevancia con la firma del archivo de libros resultante.
+        """
+        self.sincronizar()
+        self._archivo_libros.vaciar()
+        self._archivo_usuarios.vaciar()
+        self.prestamos.vaciar()
+        self.guardar_indice()
 
-        if id_usuario not in usuarios:
-            print("El usuario no está registrado.")
+    def _firma_libros(self):
+        """(mtime en ns, tamaño) de biblioteca.json, o None si no existe; con SQLite, la versión de los libros."""
+        if self._almacen is not None:
+            return ['sqlite', self._almacen.version_libros()]
+        try:
+            estado = os.stat(self.archivo_json)
+        except FileNotFoundError:
+            return None
+        return [estado.st_mtime_ns, estado.st_size]
+
+    def guardar_indice(self):
+        """
+        Guarda el índice de relevancia. Si biblioteca.json cambia después (o el programa termina
+        sin llamar a `vaciar`), la firma ya no coincide y el índice se reconstruye al iniciar.
+        """
+        try:
+            self.motor.guardar(self.archivo_indice, self._firma_libros())
+        except OSError as e:
+            print(f"No se pudo guardar el índice de búsqueda: {e}")
+
+    def registrar_usuario(self, id_usuario, nombre):
+        """
+        Registra un usuario nuevo (o reemplaza el nombre si el ID ya existía) y lo guarda.
+        Returns:
+            bool: True si el usuario es nuevo.
+        """
+        with self._operacion():
+            with self._estado.exclusivo():
+                usuario = self.usuarios.obtener(id_usuario, comprobar=False)
+                if usuario:
+                    usuario.nombre = nombre
+                    self.usuarios.marcar_modificado()
+                else:
+                    self.usuarios.agregar(Usuario(id_usuario, nombre))
+                if self._almacen is not None:
+                    self._almacen.guardar_usuario(id_usuario, nombre)
+            if not self._en_lote:
+                self.sincronizar()
+        print(f"Usuario {nombre} registrado con éxito.")
+        return usuario is None
+
+    def listar_usuarios(self, orden=None, despues_de=None, descendente=False):
+        """
+        Genera los usuarios: sin `orden`, en el orden en que se registraron; con 'id' o 'nombre',
+        paginados por clave a partir del cursor `despues_de` (ver paginacion.recorrer).
+        """
+        self._comprobar_usuarios()
+        if orden is None:
+            return iter(self._copia(self.usuarios.usuarios))
+        return recorrer(lambda: self._copia(self.usuarios.usuarios), ORDENES_USUARIOS[orden], despues_de, descendente)
+
+    def mostrar_usuarios(self, orden=None, por_pagina=None):
+        """
+        Muestra los usuarios registrados, en el orden pedido (ver `listar_usuarios`). Con
+        `por_pagina`, muestra una página y pregunta si seguir.
+        """
+        self._comprobar_usuarios()
+        if not self.usuarios.usuarios:
+            print("No hay usuarios registrados.")
             return
+        self._mostrar(self.listar_usuarios(orden), formatear_usuario, por_pagina)
 
-        usuario = usuarios[id_usuario]
+    def _copia(self, diccionario):
+        """Los valores de `diccionario`, copiados con `_estado` compartido para recorrerlos sin cerrojos."""
+        with self._estado.compartido():
+            return list(diccionario.values())
 
-        if isbn not in usuario.libros_prestados:
-            print("El usuario no tiene este libro prestado.")
+    @staticmethod
+    def _mostrar(elementos, formatear, por_pagina):
+        if por_pagina:
+            mostrar_paginas(elementos, formatear, por_pagina)
             return
+        with EscritorSalida() as salida:
+            for elemento in elementos:
+                salida.escribir(formatear(elemento))
+
+    def eliminar_usuario(self, id_usuario, forzar=False):
+        """
+        Elimina un usuario por su ID si existe y guarda el cambio. Si tiene libros prestados no se
+        elimina, salvo con `forzar`: entonces sus libros se dan por devueltos antes de eliminarlo.
+        Returns:
+            bool: True si se eliminó el usuario.
+        """
+        with self._operacion():
+            with self._estado.exclusivo():
+                self.usuarios.comprobar_cambios_externos()
+                usuario = self.usuarios.obtener(id_usuario, comprobar=False)
+                eliminado = False
+                if usuario is None:
+                    mensaje = "El usuario no existe."
+                elif usuario.libros_prestados and not forzar:
+                    mensaje = (f"El usuario {usuario.nombre} tiene {len(usuario.libros_prestados)} libro(s) "
+                               f"prestado(s); deben devolverse antes de eliminarlo.")
+                else:
+                    for isbn in list(usuario.libros_prestados):
+                        self._liberar(usuario, isbn)
+                    eliminado = self.usuarios.eliminar(id_usuario)
+                    if self._almacen is not None:
+                        self._almacen.eliminar_usuario(id_usuario)
+                    mensaje = f"Usuario con ID {id_usuario} eliminado."
+            if not self._en_lote:
+                self.sincronizar()
+        print(mensaje)
+        return eliminado
 
+    def _liberar(self, usuario, isbn):
+        """
+        Da por devuelto un libro del usuario al quitar el libro o el usuario: lo quita de sus
+        préstamos y del índice inverso, lo marca disponible y cierra el préstamo en el historial.
+        Se llama con `_estado` en modo exclusivo.
+        """
+        self.usuarios.devolver(usuario, isbn)
         libro = self.libros.get(isbn)
-        if libro and libro.prestado:
+        if libro is not None:
             libro.prestado = False
-            usuario.libros_prestados.remove(isbn)
-            self.guardar_libros()
-            guardar_usuarios(usuarios)
-            print(f"Libro '{libro}' devuelto por {usuario.nombre} con éxito.")
+        self.prestamos.devolver(isbn, usuario.id_usuario)
+        if self._almacen is not None:
+            self._almacen.devolver(isbn, usuario.id_usuario)
         else:
-            print("Error en la devolución del libro.")
+            self._libros_modificados = True
+
+    def añadir_libro(self, libro):
+        """Añade un libro a la biblioteca (si el ISBN ya existía, lo reemplaza)."""
+        with self._operacion(), self._estado.exclusivo():
+            anterior = self.libros.get(libro.isbn)
+            if anterior is not None:
+                self.indice.eliminar(anterior, conservar_orden=True)
+                self.motor.eliminar(anterior.isbn, anterior)
+            self.libros[libro.isbn] = libro
+            self.indice.agregar(libro)
+            self.motor.agregar(libro)
+            if self._almacen is not None:
+                self._almacen.guardar_libro(libro.isbn, *libro.datos, libro.categoria, libro.prestado)
+            else:
+                self._libros_modificados = True
+                if not self._en_lote:
+                    self.guardar_libros()
+        print(f"El libro '{libro}' se guardó correctamente.")  # Aquí se usa __str__
+
+    def quitar_libros(self, isbn, forzar=False):
+        """
+        Elimina un libro de la biblioteca por su ISBN. Si está prestado no se elimina, salvo con
+        `forzar`: entonces se da por devuelto (se quita de los préstamos de quien lo tiene).
+        Returns:
+            bool: True si se eliminó el libro.
+        """
+        with self._operacion():
+            with self._estado.exclusivo():
+                libro = self.libros.get(isbn)
+                poseedor = self.usuarios.poseedor(isbn) if libro is not None else None
+                quitado = False
+                if libro is None:
+                    mensaje = f"No se encontró ningún libro con ISBN {isbn}"
+                elif poseedor is not None and not forzar:
+                    mensaje = f"El libro '{libro}' está prestado a {poseedor.nombre}; debe devolverse antes de quitarlo."
+                else:
+                    if poseedor is not None:
+                        self._liberar(poseedor, isbn)
+                    del self.libros[isbn]
+                    self.indice.eliminar(libro)
+                    self.motor.eliminar(isbn, libro)
+                    if self._almacen is not None:
+                        self._almacen.eliminar_libro(isbn)
+                    else:
+                        self._libros_modificados = True
+                    quitado = True
+                    mensaje = f"Libro '{libro}' eliminado de la biblioteca."  # Aquí se usa __str__
+            if not self._en_lote:
+                self.sincronizar()
+        print(mensaje)
+        return quitado
+
+    def prestar_libro(self, isbn, id_usuario):
+        """
+        Presta un libro a un usuario. La comprobación (libro disponible, menos de 3 préstamos) y
+        el cambio se hacen con los cerrojos del ISBN y del usuario tomados.
+        Returns:
+            bool: True si se prestó el libro.
+        """
+        with self._operacion():
+            with self._estado.compartido(), self._cerrojos.tomar(('libro', isbn), ('usuario', id_usuario)):
+                usuario = self.usuarios.obtener(id_usuario, comprobar=False)
+                if usuario is None:
+                    mensaje, prestado = "El usuario no está registrado.", False
+                elif len(usuario.libros_prestados) >= 3:
+                    mensaje, prestado = "El usuario ya tiene el máximo de libros prestados (3).", False
+                else:
+                    libro = self.libros.get(isbn)
+                    prestado = bool(libro) and not libro.prestado
+                    if prestado:
+                        libro.prestado = True
+                        self.usuarios.prestar(usuario, isbn)
+                        if self._almacen is not None:
+                            self._almacen.prestar(isbn, id_usuario)
+                        else:
+                            self._libros_modificados = True
+                        prestamo = self.prestamos.prestar(isbn, id_usuario, self.dias_prestamo)
+                        mensaje = (f"Libro '{libro}' prestado a {usuario.nombre} con éxito. "
+                                   f"Debe devolverse antes del {formatear_fecha(prestamo.fecha_vencimiento)}.")
+                    else:
+                        mensaje = "Libro no disponible para préstamo."
+        print(mensaje)
+        return prestado
 
-    def mostrar_libros(self):
-        """Muestra todos los libros en la biblioteca."""
+    def devolver_libro(self, isbn, id_usuario):
+        """
+        Devuelve un libro prestado por un usuario, con los cerrojos del ISBN y del usuario tomados.
+        Returns:
+            bool: True si se registró la devolución.
+        """
+        with self._operacion():
+            with self._estado.compartido(), self._cerrojos.tomar(('libro', isbn), ('usuario', id_usuario)):
+                usuario = self.usuarios.obtener(id_usuario, comprobar=False)
+                devuelto = False
+                if usuario is None:
+                    mensaje = "El usuario no está registrado."
+                elif isbn not in usuario.libros_prestados:
+                    mensaje = "El usuario no tiene este libro prestado."
+                else:
+                    libro = self.libros.get(isbn)
+                    if libro and libro.prestado:
+                        libro.prestado = False
+                        self.usuarios.devolver(usuario, isbn)
+                        if self._almacen is not None:
+                            self._almacen.devolver(isbn, id_usuario)
+                        else:
+                            self._libros_modificados = True
+                        devuelto = True
+                        mensaje = f"Libro '{libro}' devuelto por {usuario.nombre} con éxito."
+                        prestamo = self.prestamos.devolver(isbn, id_usuario)
+                        if prestamo and prestamo.fecha_devolucion > prestamo.fecha_vencimiento:
+                            dias = math.ceil((prestamo.fecha_devolucion - prestamo.fecha_vencimiento) / 86400)
+                            mensaje += f" Se devolvió con {dias} día(s) de retraso."
+                    else:
+                        mensaje = "Error en la devolución del libro."
+        print(mensaje)
+        return devuelto
+
+    def listar_libros(self, orden=None, despues_de=None, descendente=False):
+        """
+        Genera los libros: sin `orden`, en el orden en que se añadieron; con 'isbn', 'titulo',
+        'autor' o 'categoria', paginados por clave a partir del cursor `despues_de` (ver
+        paginacion.recorrer). Las copias se toman con `_estado` compartido, así otros hilos
+        pueden seguir prestando mientras se recorre.
+        """
+        if orden is None:
+            return iter(self._copia(self.libros))
+        return recorrer(lambda: self._copia(self.libros), ORDENES_LIBROS[orden], despues_de, descendente)
+
+    def mostrar_libros(self, orden=None, por_pagina=None):
+        """
+        Muestra los libros de la biblioteca, en el orden pedido (ver `listar_libros`). Con
+        `por_pagina`, muestra una página y pregunta si seguir.
+        """
         if not self.libros:
             print("No hay libros en la biblioteca.")
             return
+        self._mostrar(self.listar_libros(orden), str, por_pagina)  # Aquí se usa __str__
 
-        for libro in self.libros.values():
-            print(libro)  # Aquí se usa __str__
+    def _libros_de(self, isbns):
+        """Los libros de un conjunto de ISBNs, en el orden en que se añadieron a la biblioteca."""
+        return [self.libros[isbn] for isbn in self.indice.ordenar(isbns)]
 
     def buscar_por_titulo(self, titulo):
-        """Busca libros por título."""
-        resultados = [libro for libro in self.libros.values() if titulo.lower() in libro.datos[0].lower()]
+        """Busca libros cuyo título contiene todas las palabras buscadas (sin distinguir mayúsculas ni tildes)."""
+        with self._estado.compartido():
+            resultados = self._libros_de(self.indice.por_titulo(titulo))
         if resultados:
             print(f"Resultados de búsqueda para '{titulo}':")
             for libro in resultados:
                 print(libro)  # Aquí se usa __str__
         else:
             print(f"No se encontraron libros con el título '{titulo}'.")
+        return resultados
 
     def buscar_por_autor(self, autor):
-        """Busca libros por autor."""
-        resultados = [libro for libro in self.libros.values() if autor.lower() in libro.datos[1].lower()]
+        """Busca libros cuyo autor contiene todas las palabras buscadas."""
+        with self._estado.compartido():
+            resultados = self._libros_de(self.indice.por_autor(autor))
         if resultados:
             print(f"Resultados de búsqueda para '{autor}':")
             for libro in resultados:
                 print(libro)  # Aquí se usa __str__
         else:
             print(f"No se encontraron libros del autor '{autor}'.")
+        return resultados
 
     def buscar_por_categoria(self, categoria):
-        """Busca libros por categoría."""
-        resultados = [libro for libro in self.libros.values() if categoria.lower() in libro.categoria.lower()]
+        """Busca libros de una categoría, incluidas sus subcategorías (ver IndiceLibros.por_categoria)."""
+        with self._estado.compartido():
+            resultados = self._libros_de(self.indice.por_categoria(categoria))
         if resultados:
             print(f"Resultados de búsqueda para '{categoria}':")
             for libro in resultados:
                 print(libro)  # Aquí se usa __str__
         else:
             print(f"No se encontraron libros en la categoría '{categoria}'.")
+        return resultados
+
+    def buscar(self, titulo=None, autor=None, categoria=None):
+        """
+        Búsqueda combinada: libros que cumplen todos los criterios indicados. Cada criterio se
+        resuelve en su índice y los conjuntos de ISBNs se intersectan empezando por el más pequeño.
+        Returns:
+            list: Libros encontrados, en el orden en que se añadieron.
+        """
+        conjuntos = []
+        with self._estado.compartido():
+            if titulo:
+                conjuntos.append(self.indice.por_titulo(titulo))
+            if autor:
+                conjuntos.append(self.indice.por_autor(autor))
+            if categoria:
+                conjuntos.append(self.indice.por_categoria(categoria))
+            if not conjuntos:
+                return []
+            conjuntos.sort(key=len)
+            resultados = self._libros_de(conjuntos[0].intersection(*conjuntos[1:]))
+        if resultados:
+            print("Resultados de la búsqueda combinada:")
+            for libro in resultados:
+                print(libro)  # Aquí se usa __str__
+        else:
+            print("No se encontraron libros que cumplan todos los criterios.")
+        return resultados
+
+    def buscar_relevantes(self, consulta, k=10):
+        """
+        Búsqueda por relevancia en título, autor y categoría (ver MotorBusqueda).
+        Returns:
+            list: Los k libros más relevantes, del más al menos relevante.
+        """
+        with self._estado.compartido():
+            resultados = [self.libros[isbn] for isbn, _ in self.motor.buscar(consulta, k)]
+        if resultados:
+            print(f"Los {len(resultados)} libros más relevantes para '{consulta}':")
+            for posicion, libro in enumerate(resultados, 1):
+                print(f"{posicion}. {libro}")  # Aquí se usa __str__
+        else:
+            print(f"No se encontraron libros para '{consulta}'.")
+        return resultados
 
     def listar_libros_prestados(self, id_usuario):
         """Lista los libros prestados a un usuario."""
-        usuarios = cargar_usuarios()  # Usar la función independiente
+        usuario = self.obtener_usuario(id_usuario)
 
-        if id_usuario not in usuarios:
+        if usuario is None:
             print("El usuario no está registrado.")
             return
-
-        usuario = usuarios[id_usuario]
         if not usuario.libros_prestados:
             print(f"El usuario {usuario.nombre} no tiene libros prestados.")
             return
@@ -243,11 +1464,134 @@ class Biblioteca:
         for isbn in usuario.libros_prestados:
             libro = self.libros.get(isbn)
             if libro:
-                print(libro)  # Aquí se usa __str__
+                prestamo = self.prestamos.activo(isbn)
+                vence = f" (vence el {formatear_fecha(prestamo.fecha_vencimiento)})" if prestamo else ""
+                print(f"{libro}{vence}")  # Aquí se usa __str__
+
+    def obtener_usuario(self, id_usuario):
+        """Usuario con ese ID, o None si no está registrado (ver `_comprobar_usuarios`)."""
+        self._comprobar_usuarios()
+        return self.usuarios.obtener(id_usuario, comprobar=False)
+
+    def poseedor(self, isbn):
+        """Usuario que tiene prestado el libro, o None (índice inverso, sin recorrer los usuarios)."""
+        self._comprobar_usuarios()
+        return self.usuarios.poseedor(isbn, comprobar=False)
+
+    def prestados_a(self, id_usuario):
+        """ISBN de los libros que tiene prestados un usuario (lista vacía si no está registrado)."""
+        usuario = self.obtener_usuario(id_usuario)
+        return list(usuario.libros_prestados) if usuario is not None else []
+
+    def mostrar_poseedor(self, isbn):
+        """Muestra quién tiene prestado un libro y cuándo vence el préstamo."""
+        libro = self.libros.get(isbn)
+        usuario = self.poseedor(isbn)
+        if libro is None:
+            print(f"No se encontró ningún libro con ISBN {isbn}")
+        elif usuario is None:
+            print(f"El libro '{libro}' no está prestado.")
+        else:
+            prestamo = self.prestamos.activo(isbn)
+            vence = f" (vence el {formatear_fecha(prestamo.fecha_vencimiento)})" if prestamo else ""
+            print(f"El libro '{libro}' lo tiene {usuario.nombre} (ID {usuario.id_usuario}){vence}.")
+        return usuario
 
+    def historial_libro(self, isbn):
+        """
+        Muestra los préstamos de un libro, del más reciente al más antiguo.
+        Returns:
+            list: Los préstamos (Prestamo) mostrados.
+        """
+        historial = self.prestamos.historial_libro(isbn)
+        if not historial:
+            print(f"No hay préstamos registrados del libro con ISBN {isbn}.")
+        for prestamo in historial:
+            print(prestamo)
+        return historial
 
-def menu():
-    biblioteca = Biblioteca()
+    def historial_usuario(self, id_usuario):
+        """
+        Muestra los préstamos de un usuario, del más reciente al más antiguo.
+        Returns:
+            list: Los préstamos (Prestamo) mostrados.
+        """
+        historial = self.prestamos.historial_usuario(id_usuario)
+        if not historial:
+            print(f"No hay préstamos registrados del usuario {id_usuario}.")
+        for prestamo in historial:
+            print(prestamo)
+        return historial
+
+    def mostrar_vencidos(self):
+        """
+        Muestra los préstamos sin devolver cuyo plazo ya venció, del más atrasado al menos.
+        Returns:
+            list: Los préstamos (Prestamo) vencidos.
+        """
+        vencidos = self.prestamos.vencidos()
+        if not vencidos:
+            print("No hay préstamos vencidos.")
+        self._comprobar_usuarios()
+        for prestamo in vencidos:
+            libro = self.libros.get(prestamo.isbn)
+            usuario = self.usuarios.obtener(prestamo.id_usuario, comprobar=False)
+            nombre = usuario.nombre if usuario else prestamo.id_usuario
+            print(f"{libro or prestamo.isbn} - {nombre}: venció el {formatear_fecha(prestamo.fecha_vencimiento)}")
+        return vencidos
+
+    def verificar_integridad(self):
+        """
+        Comprueba en una pasada por los usuarios, otra por los libros y otra por los préstamos
+        activos del historial que todos digan lo mismo: cada libro prestado existe, está marcado
+        como prestado y lo tiene un solo usuario; ningún usuario tiene más de 3; el índice inverso
+        coincide con los préstamos de cada usuario y el historial tiene abierto el mismo préstamo.
+        Returns:
+            list: Descripción de cada inconsistencia encontrada (vacía si no hay ninguna).
+        """
+        errores = []
+        # Como una operación más: en modo multiproceso, con los cambios de otros procesos incorporados
+        with self._operacion(), self._estado.exclusivo():
+            poseedores = {}  # ISBN -> ID, según los préstamos de cada usuario
+            for id_usuario, usuario in self.usuarios.usuarios.items():
+                if len(usuario.libros_prestados) > 3:
+                    errores.append(f"El usuario {id_usuario} tiene {len(usuario.libros_prestados)} libros prestados (máximo 3).")
+                for isbn in usuario.libros_prestados:
+                    libro = self.libros.get(isbn)
+                    if libro is None:
+                        errores.append(f"El usuario {id_usuario} tiene prestado {isbn}, que no está en la biblioteca.")
+                    elif not libro.prestado:
+                        errores.append(f"El usuario {id_usuario} tiene {isbn}, pero el libro figura como disponible.")
+                    if isbn in poseedores:
+                        errores.append(f"El libro {isbn} lo tienen a la vez {poseedores[isbn]} y {id_usuario}.")
+                    else:
+                        poseedores[isbn] = id_usuario
+            for isbn, id_usuario in poseedores.items():
+                if self.usuarios.poseedores.get(isbn) != id_usuario:
+                    errores.append(f"Índice inverso: {isbn} debería estar a nombre de {id_usuario}.")
+            for isbn, id_usuario in self.usuarios.poseedores.items():
+                if isbn not in poseedores:
+                    errores.append(f"Índice inverso: {isbn} figura a nombre de {id_usuario}, que no lo tiene.")
+            for isbn, libro in self.libros.items():
+                if libro.prestado and isbn not in poseedores:
+                    errores.append(f"El libro {isbn} figura como prestado, pero ningún usuario lo tiene.")
+            activos = self.prestamos.activos()
+            for isbn, id_usuario in poseedores.items():
+                prestamo = activos.get(isbn)
+                if prestamo is None or prestamo.id_usuario != id_usuario:
+                    errores.append(f"Historial: no hay un préstamo abierto de {isbn} a {id_usuario}.")
+            for isbn, prestamo in activos.items():
+                if isbn not in poseedores:
+                    errores.append(f"Historial: el préstamo de {isbn} a {prestamo.id_usuario} sigue abierto, "
+                                   f"pero nadie tiene el libro.")
+        return errores
+
+
+def menu(almacenamiento='json', multiproceso=False):
+    # multiproceso (--multiproceso): para abrir el menú en varias terminales sobre los mismos
+    # archivos. Con JSON cada préstamo reescribe entonces los dos archivos completos; sin él se
+    # guardan cada INTERVALO_SINCRONIZACION segundos (sincronizar_cada) y al salir
+    biblioteca = Biblioteca(multiproceso=multiproceso, almacenamiento=almacenamiento)
 
     while True:
         try:
@@ -264,7 +1608,14 @@ def menu():
             print("10. Buscar Libro por Autor")
             print("11. Buscar Libro por Categoría")
             print("12. Listar Libros Prestados de un Usuario")
-            print("13. Salir")
+            print("13. Búsqueda Combinada (Título, Autor y Categoría)")
+            print("14. Búsqueda por Relevancia")
+            print("15. Historial de Préstamos de un Libro")
+            print("16. Historial de Préstamos de un Usuario")
+            print("17. Préstamos Vencidos")
+            print("18. ¿Quién Tiene un Libro?")
+            print("19. Verificar Integridad de los Datos")
+            print("20. Salir")
 
             opcion = input("Seleccione una opción: ")
 
@@ -276,7 +1627,11 @@ def menu():
                 libro = Libro(isbn, titulo, autor, categoria)
                 biblioteca.añadir_libro(libro)
             elif opcion == '2':
-                biblioteca.mostrar_libros()
+                orden = input("Ordenar por (isbn, titulo, autor, categoria; Enter: orden de alta): ").strip().lower()
+                if orden and orden not in ORDENES_LIBROS:
+                    print("Orden no válido.")
+                else:
+                    biblioteca.mostrar_libros(orden or None, por_pagina=POR_PAGINA)
             elif opcion == '3':
                 isbn = input("ISBN del libro a prestar: ")
                 id_usuario = input("ID del usuario que lo solicita: ")
@@ -287,19 +1642,33 @@ def menu():
                 biblioteca.devolver_libro(isbn, id_usuario)
             elif opcion == '5':
                 isbn = input("ISBN del libro a quitar: ")
-                biblioteca.quitar_libros(isbn)
+                usuario = biblioteca.poseedor(isbn)
+                if usuario is None:
+                    biblioteca.quitar_libros(isbn)
+                elif input(f"El libro lo tiene {usuario.nombre}. ¿Darlo por devuelto y quitarlo? (s/n): ").strip().lower() == 's':
+                    biblioteca.quitar_libros(isbn, forzar=True)
+                else:
+                    print("No se quitó el libro.")
             elif opcion == '6':
                 nombre = input("Nombre del usuario: ")
                 id_usuario = input("ID Usuario: ")
-                usuarios = cargar_usuarios()
-                usuarios[id_usuario] = Usuario(id_usuario, nombre)
-                guardar_usuarios(usuarios)
-                print(f"Usuario {nombre} registrado con éxito.")
+                biblioteca.registrar_usuario(id_usuario, nombre)
             elif opcion == '7':
-                mostrar_usuarios()
+                orden = input("Ordenar por (id, nombre; Enter: orden de registro): ").strip().lower()
+                if orden and orden not in ORDENES_USUARIOS:
+                    print("Orden no válido.")
+                else:
+                    biblioteca.mostrar_usuarios(orden or None, por_pagina=POR_PAGINA)
             elif opcion == '8':
                 id_usuario = input("ID del usuario a eliminar: ")
-                eliminar_usuario(id_usuario)
+                prestados = biblioteca.prestados_a(id_usuario)
+                if not prestados:
+                    biblioteca.eliminar_usuario(id_usuario)
+                elif input(f"El usuario tiene {len(prestados)} libro(s) prestado(s). "
+                           f"¿Darlos por devueltos y eliminarlo? (s/n): ").strip().lower() == 's':
+                    biblioteca.eliminar_usuario(id_usuario, forzar=True)
+                else:
+                    print("No se eliminó el usuario.")
             elif opcion == '9':
                 titulo = input("Título a buscar: ")
                 biblioteca.buscar_por_titulo(titulo)
@@ -313,16 +1682,54 @@ def menu():
                 id_usuario = input("ID del usuario: ")
                 biblioteca.listar_libros_prestados(id_usuario)
             elif opcion == '13':
+                print("Deje vacío cualquier criterio que no quiera usar.")
+                titulo = input("Título: ").strip()
+                autor = input("Autor: ").strip()
+                categoria = input("Categoría (por ejemplo, Ciencia / Física): ").strip()
+                if titulo or autor or categoria:
+                    biblioteca.buscar(titulo, autor, categoria)
+                else:
+                    print("Indique al menos un criterio de búsqueda.")
+            elif opcion == '14':
+                consulta = input("Palabras a buscar (título, autor o categoría): ")
+                biblioteca.buscar_relevantes(consulta)
+            elif opcion == '15':
+                isbn = input("ISBN del libro: ")
+                biblioteca.historial_libro(isbn)
+            elif opcion == '16':
+                id_usuario = input("ID del usuario: ")
+                biblioteca.historial_usuario(id_usuario)
+            elif opcion == '17':
+                biblioteca.mostrar_vencidos()
+            elif opcion == '18':
+                isbn = input("ISBN del libro: ")
+                biblioteca.mostrar_poseedor(isbn)
+            elif opcion == '19':
+                errores = biblioteca.verificar_integridad()
+                for error in errores:
+                    print(error)
+                print(f"{len(errores)} inconsistencia(s) encontrada(s)." if errores else "Los datos son consistentes.")
+            elif opcion == '20':
                 print("Saliendo del sistema...")
+                biblioteca.vaciar()
                 break
             else:
                 print("Opción no válida. Intente de nuevo.")
+            biblioteca.sincronizar_cada()  # Guarda los préstamos y devoluciones cada cierto tiempo
         except KeyboardInterrupt:
             print("\nInterrupción detectada. Saliendo del programa...")
+            biblioteca.vaciar()
             break
         except Exception as e:
             print(f"Error inesperado: {e}")
 
 
 if __name__ == "__main__":
-    menu()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Sistema de Gestión de Biblioteca Digital")
+    parser.add_argument("--almacenamiento", choices=("json", "sqlite"), default="json",
+                        help="json: biblioteca.json y usuarios.json; sqlite: biblioteca.db")
+    parser.add_argument("--multiproceso", action="store_true",
+                        help="permite abrir el menú en varias terminales sobre los mismos archivos "
+                             "(con json, más lento: guarda todo después de cada préstamo)")
+    argumentos = parser.parse_args()
+    menu(argumentos.almacenamiento, argumentos.multiproceso)
\ No newline at end of file
@@ -0,0 +1,124 @@
+"""
+Benchmark de memoria de la Semana 12: Libro y Usuario con __slots__ vs. la representación anterior
+
+Antes cada Libro tenía su diccionario de atributos, una tupla (título, autor) propia y sus propias
+copias del autor, la categoría y el ISBN de la clave (json.load crea una cadena nueva por cada
+valor que lee), y los préstamos de cada Usuario eran una lista que `in` y `remove` recorrían.
+Ahora Libro y Usuario usan __slots__, el autor y la categoría se internan, `cargar_libros` usa
+libro.isbn como clave y los préstamos están en un LibrosPrestados.
+
+Se cargan 1M de libros desde JSON y se mide con tracemalloc la memoria que queda asignada por
+libro, en total y sin contar el ISBN y el título, que son cadenas distintas en cada libro y ocupan
+lo mismo en las dos versiones. Se mide también el tiempo de `isbn in libros_prestados` con
+3 préstamos (el máximo) y con 1.000.
+
+Uso:
+    python benchmark_memoria.py              # 1M de libros
+    python benchmark_memoria.py 200000       # otra cantidad
+"""
+
+import gc
+import glob
+import importlib.util
+import json
+import os
+import sys
+import timeit
+import tracemalloc
+
+CATEGORIAS = ["Novela", "Ciencia / Física", "Ciencia / Biología", "Historia", "Poesía", "Infantil / Cuentos"]
+BLOQUE = 10_000  # Libros que se leen de cada texto JSON
+
+
+def cargar_tarea():
+    """Importa el script de la tarea de esta carpeta (su nombre contiene espacios)."""
+    carpeta = os.path.dirname(os.path.abspath(__file__))
+    ruta = glob.glob(os.path.join(carpeta, "Tarea*.py"))[0]
+    spec = importlib.util.spec_from_file_location("tarea_semana12", ruta)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+tarea = cargar_tarea()
+
+
+class LibroAnterior:
+    """Libro como era antes: atributos en un diccionario y tupla (título, autor) propia."""
+    def __init__(self, isbn, titulo, autor, categoria, prestado=False):
+        self.isbn = isbn
+        self.datos = (titulo, autor)
+        self.categoria = categoria
+        self.prestado = prestado
+
+
+def textos_json(cantidad):
+    """Textos JSON con BLOQUE libros cada uno, como los de biblioteca.json."""
+    for inicio in range(0, cantidad, BLOQUE):
+        yield json.dumps({f"978-{i:09d}": {"isbn": f"978-{i:09d}", "titulo": f"Título del libro {i}",
+                                           "autor": f"Autor {i % 5000}", "categoria": CATEGORIAS[i % len(CATEGORIAS)],
+                                           "prestado": False}
+                          for i in range(inicio, min(inicio + BLOQUE, cantidad))})
+
+
+def cargar_anterior(datos_libros):
+    """`cargar_libros` como era antes."""
+    return {isbn: LibroAnterior(**datos) for isbn, datos in datos_libros.items()}
+
+
+def cargar_actual(datos_libros):
+    """`cargar_libros` como es ahora."""
+    libros = (tarea.Libro(**datos) for datos in datos_libros.values())
+    return {libro.isbn: libro for libro in libros}
+
+
+def medir_libros(cargar, cantidad):
+    """
+    Carga `cantidad` libros con `cargar` y devuelve los bytes asignados por libro:
+    (total, sin las cadenas del ISBN y del título).
+    """
+    textos = list(textos_json(cantidad))  # Se generan antes de medir
+    gc.collect()
+    tracemalloc.start()
+    antes = tracemalloc.get_traced_memory()[0]
+    libros = {}
+    for texto in textos:
+        libros.update(cargar(json.loads(texto)))
+    gc.collect()
+    total = tracemalloc.get_traced_memory()[0] - antes
+    tracemalloc.stop()
+    propias = sum(sys.getsizeof(libro.isbn) + sys.getsizeof(libro.datos[0]) for libro in libros.values())
+    return total / cantidad, (total - propias) / cantidad
+
+
+def medir_pertenencia(prestamos, isbn):
+    """Microsegundos por consulta `isbn in prestamos`."""
+    repeticiones = 200_000
+    return timeit.timeit(lambda: isbn in prestamos, number=repeticiones) / repeticiones * 1e6
+
+
+def main():
+    cantidad = next((int(arg) for arg in sys.argv[1:] if arg.isdigit()), 1_000_000)
+
+    print(f"{cantidad:,} libros leídos de JSON (memoria medida con tracemalloc)")
+    print(f"{'Representación':<22} | {'Bytes por libro':>15} | {'Sin ISBN ni título':>18}")
+    print("-" * 62)
+    anterior = medir_libros(cargar_anterior, cantidad)
+    actual = medir_libros(cargar_actual, cantidad)
+    for nombre, (total, estructura) in (("anterior (__dict__)", anterior), ("__slots__ + intern", actual)):
+        print(f"{nombre:<22} | {total:>15,.0f} | {estructura:>18,.0f}")
+    print(f"Reducción: {1 - actual[0] / anterior[0]:.0%} del total, "
+          f"{1 - actual[1] / anterior[1]:.0%} sin el ISBN ni el título")
+
+    print()
+    print(f"{'isbn in libros_prestados':<26} | {'lista (µs)':>10} | {'LibrosPrestados (µs)':>20}")
+    print("-" * 63)
+    for prestados in (3, 1_000):
+        isbns = [f"978-{i:09d}" for i in range(prestados)]
+        buscado = f"978-{prestados - 1:09d}"  # El último: el peor caso para la lista
+        print(f"{f'{prestados:,} préstamos':<26} | {medir_pertenencia(isbns, buscado):>10.3f} | "
+              f"{medir_pertenencia(tarea.LibrosPrestados(isbns), buscado):>20.3f}")
+
+
+if __name__ == "__main__":
+    main()
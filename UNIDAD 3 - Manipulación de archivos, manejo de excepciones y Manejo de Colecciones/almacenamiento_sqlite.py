@@ -0,0 +1,266 @@
+"""
+Almacenamiento en SQLite para los inventarios (Semanas 10 y 11) y la biblioteca (Semana 12).
+
+Con los archivos de texto o JSON, cada cambio reescribe el archivo completo. Aquí cada producto,
+libro o usuario es una fila, así que un cambio puntual escribe solo esa fila.
+
+    - Modo WAL: las lecturas no bloquean a la escritura ni al revés, y cada confirmación añade
+      las páginas cambiadas al final del registro en lugar de reescribir la base.
+    - La durabilidad de persistencia.py se traduce a PRAGMA synchronous:
+          'siempre' -> FULL (fsync en cada confirmación), 'grupo' -> NORMAL (fsync en cada
+          punto de control; un corte de luz puede perder las últimas confirmaciones),
+          'ninguna' -> OFF.
+    - Las consultas usan siempre el mismo texto SQL con parámetros, y el módulo sqlite3 reutiliza
+      la sentencia ya preparada de su caché en cada ejecución.
+    - Índices: la clave primaria (id del producto, ISBN del libro, id del usuario) y además el
+      nombre del producto, el título y el autor del libro y el usuario de cada préstamo.
+
+Las clases de las semanas siguen teniendo los datos en memoria (diccionarios e índices); este
+módulo solo reemplaza cómo se guardan y se cargan.
+"""
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+SINCRONIZACION = {'siempre': 'FULL', 'grupo': 'NORMAL', 'ninguna': 'OFF'}
+
+
+def conectar(ruta, durabilidad='siempre'):
+    """
+    Abre (o crea) una base SQLite en modo WAL con el nivel de durabilidad elegido.
+    La conexión queda en modo de confirmación automática: cada sentencia fuera de
+    `transaccion()` se confirma sola.
+    """
+    if durabilidad not in SINCRONIZACION:
+        raise ValueError(f"Durabilidad desconocida: {durabilidad}. Use una de {', '.join(SINCRONIZACION)}.")
+    conexion = sqlite3.connect(ruta, timeout=30, isolation_level=None, check_same_thread=False)
+    conexion.execute("PRAGMA journal_mode=WAL")
+    conexion.execute(f"PRAGMA synchronous={SINCRONIZACION[durabilidad]}")
+    return conexion
+
+
+class BaseSQLite:
+    """
+    Conexión compartida por los almacenes. Un cerrojo reentrante hace que una transacción de un
+    hilo no reciba sentencias de otro (todas usan la misma conexión).
+    Args:
+        ruta (str): Archivo de la base de datos.
+        durabilidad (str): 'siempre', 'grupo' o 'ninguna'.
+    """
+    ESQUEMA = ""
+
+    def __init__(self, ruta, durabilidad='siempre'):
+        self.ruta = ruta
+        self.conexion = conectar(ruta, durabilidad)
+        self._cerrojo = threading.RLock()
+        self._profundidad = 0
+        self.conexion.executescript(self.ESQUEMA)
+
+    @contextmanager
+    def transaccion(self):
+        """
+        Agrupa las sentencias del bloque en una transacción que se confirma al salir (o se
+        deshace si hay una excepción). Empieza con BEGIN IMMEDIATE: toma el permiso de escritura
+        de la base al comenzar, así sirve también de cerrojo entre procesos. Una transacción
+        dentro de otra forma parte de la exterior.
+        """
+        with self._cerrojo:
+            if self._profundidad:
+                self._profundidad += 1
+                try:
+                    yield self
+                finally:
+                    self._profundidad -= 1
+                return
+            self.conexion.execute("BEGIN IMMEDIATE")
+            self._profundidad = 1
+            try:
+                yield self
+            except BaseException:
+                self.conexion.execute("ROLLBACK")
+                raise
+            else:
+                self.conexion.execute("COMMIT")
+            finally:
+                self._profundidad = 0
+
+    def _ejecutar(self, sql, parametros=()):
+        with self._cerrojo:
+            return self.conexion.execute(sql, parametros)
+
+    def _ejecutar_varios(self, sql, filas):
+        with self.transaccion():
+            self.conexion.executemany(sql, filas)
+
+    def version_datos(self):
+        """
+        Número que cambia cada vez que otra conexión (otro proceso) confirma cambios en la base;
+        no cambia con los de esta conexión. Sirve para saber si hay que recargar.
+        """
+        with self._cerrojo:
+            return self.conexion.execute("PRAGMA data_version").fetchone()[0]
+
+    def cerrar(self):
+        with self._cerrojo:
+            self.conexion.close()
+
+
+class AlmacenProductos(BaseSQLite):
+    """Productos de un inventario: una fila por producto."""
+    ESQUEMA = """
+        CREATE TABLE IF NOT EXISTS productos (
+            id INTEGER PRIMARY KEY,
+            nombre TEXT NOT NULL,
+            cantidad INTEGER NOT NULL,
+            precio REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS productos_nombre ON productos (nombre);
+    """
+    GUARDAR = ("INSERT INTO productos (id, nombre, cantidad, precio) VALUES (?, ?, ?, ?) "
+               "ON CONFLICT (id) DO UPDATE SET nombre = excluded.nombre, cantidad = excluded.cantidad, "
+               "precio = excluded.precio")
+    ELIMINAR = "DELETE FROM productos WHERE id = ?"
+
+    def productos(self):
+        """Filas (id, nombre, cantidad, precio) de todos los productos, por ID."""
+        return self._ejecutar("SELECT id, nombre, cantidad, precio FROM productos ORDER BY id").fetchall()
+
+    def existentes(self, ids):
+        """IDs de la lista `ids` (como mucho unos cientos) que ya están en la base."""
+        if not ids:
+            return set()
+        marcas = ", ".join("?" * len(ids))
+        return {id for (id,) in self._ejecutar(f"SELECT id FROM productos WHERE id IN ({marcas})", ids)}
+
+    def guardar(self, filas):
+        """Inserta o actualiza productos a partir de filas (id, nombre, cantidad, precio)."""
+        self._ejecutar_varios(self.GUARDAR, filas)
+
+    def eliminar(self, ids):
+        """Elimina los productos con esos IDs (los que no existan se ignoran)."""
+        self._ejecutar_varios(self.ELIMINAR, [(id,) for id in ids])
+
+    def reemplazar(self, filas):
+        """Reemplaza todos los productos por los de `filas`, en una sola transacción."""
+        with self.transaccion():
+            self.conexion.execute("DELETE FROM productos")
+            self.conexion.executemany(self.GUARDAR, filas)
+
+
+class AlmacenBiblioteca(BaseSQLite):
+    """
+    Libros, usuarios y préstamos en curso de la biblioteca. Los préstamos en curso son la
+    lista `libros_prestados` de cada usuario (en el orden en que se prestaron); el historial
+    completo sigue en el registro de préstamos de la Semana 12.
+    La tabla `contadores` lleva un número de versión de los libros, que la biblioteca usa como
+    firma para saber si su índice de búsqueda guardado sigue al día.
+    """
+    ESQUEMA = """
+        CREATE TABLE IF NOT EXISTS libros (
+            isbn TEXT PRIMARY KEY,
+            titulo TEXT NOT NULL,
+            autor TEXT NOT NULL,
+            categoria TEXT NOT NULL,
+            prestado INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE INDEX IF NOT EXISTS libros_titulo ON libros (titulo);
+        CREATE INDEX IF NOT EXISTS libros_autor ON libros (autor);
+        CREATE TABLE IF NOT EXISTS usuarios (
+            id_usuario TEXT PRIMARY KEY,
+            nombre TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS libros_prestados (
+            isbn TEXT PRIMARY KEY,
+            id_usuario TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS libros_prestados_usuario ON libros_prestados (id_usuario);
+        CREATE TABLE IF NOT EXISTS contadores (
+            nombre TEXT PRIMARY KEY,
+            valor INTEGER NOT NULL
+        );
+        INSERT OR IGNORE INTO contadores (nombre, valor) VALUES ('libros', 0);
+    """
+    # Las filas conservan su rowid al actualizarse (ON CONFLICT ... DO UPDATE, no REPLACE),
+    # por eso ordenar por rowid devuelve los libros en el orden en que se añadieron.
+    GUARDAR_LIBRO = ("INSERT INTO libros (isbn, titulo, autor, categoria, prestado) VALUES (?, ?, ?, ?, ?) "
+                     "ON CONFLICT (isbn) DO UPDATE SET titulo = excluded.titulo, autor = excluded.autor, "
+                     "categoria = excluded.categoria, prestado = excluded.prestado")
+    GUARDAR_USUARIO = ("INSERT INTO usuarios (id_usuario, nombre) VALUES (?, ?) "
+                       "ON CONFLICT (id_usuario) DO UPDATE SET nombre = excluded.nombre")
+    CONTAR_CAMBIO = "UPDATE contadores SET valor = valor + 1 WHERE nombre = 'libros'"
+
+    def libros(self):
+        """Filas (isbn, titulo, autor, categoria, prestado) en el orden en que se añadieron."""
+        return [(isbn, titulo, autor, categoria, bool(prestado)) for isbn, titulo, autor, categoria, prestado
+                in self._ejecutar("SELECT isbn, titulo, autor, categoria, prestado FROM libros ORDER BY rowid").fetchall()]
+
+    def usuarios(self):
+        """
+        Returns:
+            dict: {id_usuario: (nombre, [ISBN de cada libro prestado, en orden de préstamo])}.
+        """
+        with self._cerrojo:
+            usuarios = {id_usuario: (nombre, []) for id_usuario, nombre
+                        in self.conexion.execute("SELECT id_usuario, nombre FROM usuarios ORDER BY rowid")}
+            for isbn, id_usuario in self.conexion.execute(
+                    "SELECT isbn, id_usuario FROM libros_prestados ORDER BY rowid"):
+                if id_usuario in usuarios:
+                    usuarios[id_usuario][1].append(isbn)
+        return usuarios
+
+    def version_libros(self):
+        """Versión de la tabla de libros: aumenta con cada cambio, de cualquier proceso."""
+        return self._ejecutar("SELECT valor FROM contadores WHERE nombre = 'libros'").fetchone()[0]
+
+    def guardar_libro(self, isbn, titulo, autor, categoria, prestado=False):
+        with self.transaccion():
+            self.conexion.execute(self.GUARDAR_LIBRO, (isbn, titulo, autor, categoria, int(prestado)))
+            self.conexion.execute(self.CONTAR_CAMBIO)
+
+    def eliminar_libro(self, isbn):
+        with self.transaccion():
+            self.conexion.execute("DELETE FROM libros WHERE isbn = ?", (isbn,))
+            self.conexion.execute(self.CONTAR_CAMBIO)
+
+    def guardar_usuario(self, id_usuario, nombre):
+        self._ejecutar(self.GUARDAR_USUARIO, (id_usuario, nombre))
+
+    def eliminar_usuario(self, id_usuario):
+        """Elimina el usuario y su lista de préstamos en curso (como al quitarlo de usuarios.json)."""
+        with self.transaccion():
+            self.conexion.execute("DELETE FROM usuarios WHERE id_usuario = ?", (id_usuario,))
+            self.conexion.execute("DELETE FROM libros_prestados WHERE id_usuario = ?", (id_usuario,))
+
+    def prestar(self, isbn, id_usuario):
+        """Marca el libro como prestado y lo añade a los préstamos en curso del usuario."""
+        with self.transaccion():
+            self.conexion.execute("UPDATE libros SET prestado = 1 WHERE isbn = ?", (isbn,))
+            self.conexion.execute("INSERT OR REPLACE INTO libros_prestados (isbn, id_usuario) VALUES (?, ?)",
+                                  (isbn, id_usuario))
+            self.conexion.execute(self.CONTAR_CAMBIO)
+
+    def devolver(self, isbn, id_usuario):
+        """Marca el libro como disponible y lo quita de los préstamos en curso del usuario."""
+        with self.transaccion():
+            self.conexion.execute("UPDATE libros SET prestado = 0 WHERE isbn = ?", (isbn,))
+            self.conexion.execute("DELETE FROM libros_prestados WHERE isbn = ? AND id_usuario = ?", (isbn, id_usuario))
+            self.conexion.execute(self.CONTAR_CAMBIO)
+
+    def reemplazar(self, libros, usuarios):
+        """
+        Reemplaza todo el contenido, en una sola transacción.
+        Args:
+            libros (iterable): Filas (isbn, titulo, autor, categoria, prestado).
+            usuarios (iterable): Tuplas (id_usuario, nombre, [ISBN prestados]).
+        """
+        with self.transaccion():
+            for tabla in ('libros', 'usuarios', 'libros_prestados'):
+                self.conexion.execute(f"DELETE FROM {tabla}")
+            self.conexion.executemany(self.GUARDAR_LIBRO, ((isbn, titulo, autor, categoria, int(prestado))
+                                                           for isbn, titulo, autor, categoria, prestado in libros))
+            for id_usuario, nombre, prestados in usuarios:
+                self.conexion.execute(self.GUARDAR_USUARIO, (id_usuario, nombre))
+                self.conexion.executemany("INSERT OR REPLACE INTO libros_prestados (isbn, id_usuario) VALUES (?, ?)",
+                                          [(isbn, id_usuario) for isbn in prestados])
+            self.conexion.execute(self.CONTAR_CAMBIO)
@@ -0,0 +1,84 @@
+"""
+Benchmark de buscar_por_nombre: recorrido lineal vs. índice de trigramas
+
+Compara la lista por comprensión original de las Semanas 9-11
+    [p for p in productos if consulta.lower() in p.nombre.lower()]
+con IndiceTrigramas.buscar, para inventarios de 10k, 100k y 1M productos.
+
+Uso:
+    python benchmark_busqueda.py              # tamaños por defecto
+    python benchmark_busqueda.py 50000        # tamaños personalizados
+"""
+
+import random
+import sys
+import time
+
+from indice_trigramas import IndiceTrigramas
+
+TIPOS = ["Teclado mecánico", "Mouse óptico", "Monitor", "Cámara web", "Batería", "Licencia Office",
+         "Disco SSD", "Memoria RAM", "Impresora", "Router", "Cable HDMI", "Auriculares"]
+MARCAS = ["Logitech", "Samsung", "Kingston", "HP", "Lenovo", "Asus", "Epson", "TP-Link"]
+CONSULTAS = ["mecanico", "CÁMARA", "kingston ssd", "hdmi lo", "no existe"]
+REPETICIONES = 5
+
+
+class Producto:
+    """Producto mínimo con los mismos atributos que usan los inventarios."""
+    def __init__(self, id, nombre):
+        self.id = id
+        self.nombre = nombre
+
+
+def generar_productos(cantidad):
+    """Genera productos con nombres del tipo 'Monitor Samsung SA-001234'."""
+    aleatorio = random.Random(cantidad)
+    productos = []
+    for i in range(cantidad):
+        marca = aleatorio.choice(MARCAS)
+        nombre = f"{aleatorio.choice(TIPOS)} {marca} {marca[:2].upper()}-{i:06d}"
+        productos.append(Producto(i, nombre))
+    return productos
+
+
+def buscar_lineal(productos, consulta):
+    """La búsqueda original de buscar_por_nombre."""
+    return [p for p in productos if consulta.lower() in p.nombre.lower()]
+
+
+def milisegundos(funcion, *argumentos):
+    """Devuelve (resultado, mejor tiempo en ms de REPETICIONES ejecuciones)."""
+    mejor = float("inf")
+    for _ in range(REPETICIONES):
+        inicio = time.perf_counter()
+        resultado = funcion(*argumentos)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return resultado, mejor * 1000
+
+
+def main():
+    tamaños = [int(arg) for arg in sys.argv[1:] if arg.isdigit()] or [10_000, 100_000, 1_000_000]
+
+    for cantidad in tamaños:
+        productos = generar_productos(cantidad)
+        inicio = time.perf_counter()
+        indice = IndiceTrigramas()
+        for producto in productos:
+            indice.agregar(producto.id, producto.nombre, producto)
+        construccion = time.perf_counter() - inicio
+
+        print(f"\n{cantidad:,} productos (índice construido en {construccion:.2f} s)")
+        print(f"{'Consulta':<16} | {'Resultados':>10} | {'Lineal ms':>10} | {'Índice ms':>10}")
+        print("-" * 56)
+        # Código de modelo de un producto concreto: la consulta más selectiva
+        codigo = productos[cantidad // 2].nombre.rsplit(" ", 1)[1].lower()
+        for consulta in CONSULTAS + [codigo]:
+            lineales, ms_lineal = milisegundos(buscar_lineal, productos, consulta)
+            indexados, ms_indice = milisegundos(indice.buscar, consulta)
+            # El índice además ignora las tildes, así que puede encontrar más resultados
+            assert {p.id for p in lineales} <= {p.id for p in indexados}
+            print(f"{consulta:<16} | {len(indexados):>10} | {ms_lineal:>10.2f} | {ms_indice:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""
+Generador de carga para servicio_http.py
+
+Abre varias conexiones persistentes y envía desde cada una una mezcla de peticiones:
+    50 % búsquedas (relevancia de libros y productos por nombre)
+    30 % préstamos y devoluciones
+    20 % actualizaciones de productos
+Mide la latencia de cada petición HTTP y muestra peticiones por segundo, p50, p99 y máximo.
+Con --lote N cada petición es un POST /lote con N operaciones.
+
+Antes de medir crea (con /lote) los usuarios, libros y productos que usa la mezcla.
+
+Uso:
+    python generador_carga.py --local                  # arranca el servicio en una carpeta temporal
+    python generador_carga.py --puerto 8080            # contra un servicio ya en marcha
+    python generador_carga.py --local --conexiones 64 --peticiones 500 --lote 20
+    python generador_carga.py --local --sqlite         # servicio con almacenamiento SQLite
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+LIBROS = 2_000
+USUARIOS = 300
+PRODUCTOS = 2_000
+PALABRAS = ["historia", "ciencia", "viaje", "noche", "mar", "ciudad", "tiempo", "guerra", "amor", "jardín"]
+CATEGORIAS = ["Novela", "Ciencia / Física", "Ciencia / Biología", "Historia", "Poesía"]
+MARCAS = ["Logitech", "Samsung", "Kingston", "HP", "Lenovo"]
+
+
+class Conexion:
+    """Cliente HTTP/1.1 mínimo sobre una conexión persistente."""
+    def __init__(self, host, puerto):
+        self.host = host
+        self.puerto = puerto
+        self._lector = None
+        self._escritor = None
+
+    async def abrir(self):
+        self._lector, self._escritor = await asyncio.open_connection(self.host, self.puerto)
+
+    async def peticion(self, metodo, ruta, datos=None):
+        """Envía una petición y devuelve (estado, cuerpo JSON)."""
+        contenido = json.dumps(datos).encode('utf-8') if datos is not None else b''
+        self._escritor.write(f"{metodo} {ruta} HTTP/1.1\r\nHost: {self.host}\r\n"
+                             f"Content-Type: application/json\r\nContent-Length: {len(contenido)}\r\n\r\n"
+                             .encode('latin-1') + contenido)
+        cabecera = await self._lector.readuntil(b'\r\n\r\n')
+        lineas = cabecera.decode('latin-1').split('\r\n')
+        estado = int(lineas[0].split(' ')[1])
+        longitud = next(int(l.split(':', 1)[1]) for l in lineas if l.lower().startswith('content-length:'))
+        return estado, json.loads(await self._lector.readexactly(longitud))
+
+    async def cerrar(self):
+        self._escritor.close()
+        await self._escritor.wait_closed()
+
+
+def datos_iniciales():
+    """Operaciones /lote que crean los usuarios, libros y productos de prueba."""
+    aleatorio = random.Random(0)
+    operaciones = [{'metodo': 'POST', 'ruta': '/usuarios', 'cuerpo': {'id_usuario': f"u{i}", 'nombre': f"Usuario {i}"}}
+                   for i in range(USUARIOS)]
+    for i in range(LIBROS):
+        titulo = " ".join(aleatorio.sample(PALABRAS, 3)).capitalize()
+        operaciones.append({'metodo': 'POST', 'ruta': '/libros', 'cuerpo': {
+            'isbn': f"isbn-{i}", 'titulo': f"{titulo} {i}", 'autor': f"Autor {i % 150}",
+            'categoria': aleatorio.choice(CATEGORIAS)}})
+    for i in range(PRODUCTOS):
+        operaciones.append({'metodo': 'POST', 'ruta': '/productos', 'cuerpo': {
+            'id': i, 'nombre': f"Producto {aleatorio.choice(MARCAS)} {i}", 'cantidad': 10, 'precio': 9.99}})
+    return operaciones
+
+
+async def preparar(host, puerto):
+    conexion = Conexion(host, puerto)
+    await conexion.abrir()
+    operaciones = datos_iniciales()
+    for inicio in range(0, len(operaciones), 500):
+        estado, _ = await conexion.peticion('POST', '/lote', operaciones[inicio:inicio + 500])
+        if estado != 200:
+            raise RuntimeError(f"No se pudieron crear los datos de prueba (estado {estado}).")
+    await conexion.cerrar()
+
+
+def operacion_aleatoria(aleatorio):
+    """(método, ruta, cuerpo) de una operación de la mezcla."""
+    tirada = aleatorio.random()
+    if tirada < 0.25:
+        return 'GET', f"/libros/relevantes?q={aleatorio.choice(PALABRAS)}&k=10", None
+    if tirada < 0.5:
+        return 'GET', f"/productos?nombre={aleatorio.choice(MARCAS)}%20{aleatorio.randrange(100)}", None
+    if tirada < 0.8:
+        ruta = '/prestamos' if aleatorio.random() < 0.55 else '/devoluciones'
+        return 'POST', ruta, {'isbn': f"isbn-{aleatorio.randrange(LIBROS)}", 'id_usuario': f"u{aleatorio.randrange(USUARIOS)}"}
+    return 'PATCH', f"/productos/{aleatorio.randrange(PRODUCTOS)}", {'cantidad': aleatorio.randrange(50)}
+
+
+async def cliente(host, puerto, peticiones, lote, semilla, latencias, estados):
+    """Una conexión persistente que envía `peticiones` peticiones seguidas."""
+    aleatorio = random.Random(semilla)
+    conexion = Conexion(host, puerto)
+    await conexion.abrir()
+    for _ in range(peticiones):
+        if lote:
+            operaciones = [operacion_aleatoria(aleatorio) for _ in range(lote)]
+            peticion = ('POST', '/lote', [{'metodo': m, 'ruta': r, 'cuerpo': c} for m, r, c in operaciones])
+        else:
+            peticion = operacion_aleatoria(aleatorio)
+        inicio = time.perf_counter()
+        estado, cuerpo = await conexion.peticion(*peticion)
+        latencias.append(time.perf_counter() - inicio)
+        for estado in ([r['estado'] for r in cuerpo['resultados']] if lote else [estado]):
+            estados[estado] = estados.get(estado, 0) + 1
+    await conexion.cerrar()
+
+
+def percentil(valores_ordenados, fraccion):
+    return valores_ordenados[min(len(valores_ordenados) - 1, int(fraccion * len(valores_ordenados)))]
+
+
+async def medir(opciones):
+    await preparar(opciones.host, opciones.puerto)
+    latencias, estados = [], {}
+    inicio = time.perf_counter()
+    await asyncio.gather(*(cliente(opciones.host, opciones.puerto, opciones.peticiones, opciones.lote, semilla,
+                                   latencias, estados) for semilla in range(opciones.conexiones)))
+    segundos = time.perf_counter() - inicio
+
+    latencias.sort()
+    operaciones = len(latencias) * (opciones.lote or 1)
+    print(f"{opciones.conexiones} conexiones x {opciones.peticiones} peticiones"
+          + (f" (lotes de {opciones.lote} operaciones)" if opciones.lote else ""))
+    print(f"Peticiones/s: {len(latencias) / segundos:,.0f}   Operaciones/s: {operaciones / segundos:,.0f}")
+    print(f"Latencia p50: {percentil(latencias, 0.50) * 1000:.2f} ms   p99: {percentil(latencias, 0.99) * 1000:.2f} ms"
+          f"   máx: {latencias[-1] * 1000:.2f} ms")
+    print("Respuestas: " + ", ".join(f"{estado}: {cantidad}" for estado, cantidad in sorted(estados.items())))
+    return 0 if all(estado < 500 for estado in estados) else 1
+
+
+def puerto_libre():
+    with socket.socket() as conector:
+        conector.bind(('127.0.0.1', 0))
+        return conector.getsockname()[1]
+
+
+def esperar_puerto(host, puerto, proceso, segundos=30):
+    limite = time.monotonic() + segundos
+    while time.monotonic() < limite:
+        if proceso.poll() is not None:
+            raise RuntimeError("El servicio terminó al arrancar.")
+        try:
+            socket.create_connection((host, puerto), timeout=0.2).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError("El servicio no empezó a escuchar a tiempo.")
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Generador de carga para servicio_http.py.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--puerto', type=int, default=8080)
+    parser.add_argument('--conexiones', type=int, default=32)
+    parser.add_argument('--peticiones', type=int, default=200, help="Peticiones por conexión.")
+    parser.add_argument('--lote', type=int, default=0, help="Operaciones por petición POST /lote (0: sin lotes).")
+    parser.add_argument('--local', action='store_true',
+                        help="Arranca el servicio en una carpeta temporal y lo detiene al terminar.")
+    parser.add_argument('--durabilidad', default='siempre', help="Con --local, durabilidad del servicio.")
+    parser.add_argument('--sqlite', action='store_true', help="Con --local, el servicio guarda en SQLite.")
+    opciones = parser.parse_args(argumentos)
+
+    if not opciones.local:
+        return asyncio.run(medir(opciones))
+    opciones.puerto = puerto_libre()
+    servicio = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'servicio_http.py')
+    with tempfile.TemporaryDirectory() as carpeta:
+        proceso = subprocess.Popen([sys.executable, servicio, '--host', opciones.host, '--puerto', str(opciones.puerto),
+                                    '--durabilidad', opciones.durabilidad] + (['--sqlite'] if opciones.sqlite else []),
+                                   cwd=carpeta, stdout=subprocess.DEVNULL)
+        try:
+            esperar_puerto(opciones.host, opciones.puerto, proceso)
+            return asyncio.run(medir(opciones))
+        finally:
+            proceso.terminate()
+            proceso.wait()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+"""
+Índice invertido de trigramas para búsquedas de texto por subcadena.
+
+Lo usan los inventarios de las Semanas 9, 10 y 11 en `buscar_por_nombre`. Cada nombre se
+normaliza (minúsculas y sin tildes) y se descompone en trigramas; para cada trigrama se guarda
+el conjunto de claves (IDs de producto) que lo contienen. Una consulta intersecta los conjuntos
+de sus trigramas, empezando por el más pequeño, y luego verifica la subcadena solo en esos
+candidatos, en lugar de recorrer y pasar a minúsculas todos los nombres.
+"""
+
+import unicodedata
+
+
+def normalizar(texto):
+    """
+    Convierte un texto a minúsculas y le quita las tildes y diéresis ("Cámara" -> "camara").
+    Parámetros:
+        texto (str): Texto original.
+    Retorno:
+        str: Texto normalizado.
+    """
+    texto = texto.casefold()
+    if texto.isascii():
+        return texto
+    descompuesto = unicodedata.normalize('NFD', texto)
+    return unicodedata.normalize('NFC', ''.join(c for c in descompuesto if not unicodedata.combining(c)))
+
+
+def trigramas(texto):
+    """
+    Retorno:
+        set: Todas las subcadenas de 3 caracteres de un texto ya normalizado.
+    """
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+class IndiceTrigramas:
+    """
+    Índice de búsqueda por subcadena, sin distinguir mayúsculas ni tildes.
+    Cada entrada asocia una clave (por ejemplo, el ID del producto) con el texto indexado y el
+    valor que se devuelve en las búsquedas (por ejemplo, el objeto Producto). Las búsquedas
+    devuelven los valores en el orden en que se añadieron las claves.
+    """
+
+    def __init__(self):
+        self._entradas = {}        # clave -> (número de orden, texto normalizado, valor)
+        self._publicaciones = {}   # trigrama -> conjunto de claves
+        self._contador = 0         # Número de orden de la próxima clave añadida
+
+    def __len__(self):
+        return len(self._entradas)
+
+    def __contains__(self, clave):
+        return clave in self._entradas
+
+    def agregar(self, clave, texto, valor):
+        """
+        Indexa `texto` bajo `clave`. Si la clave ya existía, se reemplaza y pasa al final.
+        """
+        if clave in self._entradas:
+            self.eliminar(clave)
+        normalizado = normalizar(texto)
+        self._entradas[clave] = (self._contador, normalizado, valor)
+        self._contador += 1
+        for trigrama in trigramas(normalizado):
+            conjunto = self._publicaciones.get(trigrama)
+            if conjunto is None:
+                self._publicaciones[trigrama] = {clave}
+            else:
+                conjunto.add(clave)
+
+    def eliminar(self, clave):
+        """
+        Quita la clave del índice. No hace nada si no estaba indexada.
+        """
+        entrada = self._entradas.pop(clave, None)
+        if entrada is None:
+            return
+        for trigrama in trigramas(entrada[1]):
+            conjunto = self._publicaciones[trigrama]
+            conjunto.discard(clave)
+            if not conjunto:
+                del self._publicaciones[trigrama]
+
+    def actualizar(self, clave, texto, valor):
+        """
+        Actualiza el texto y el valor de una clave. Si el texto no cambió, los trigramas
+        no se tocan y la clave conserva su posición.
+        """
+        entrada = self._entradas.get(clave)
+        if entrada is not None and entrada[1] == normalizar(texto):
+            self._entradas[clave] = (entrada[0], entrada[1], valor)
+        else:
+            self.agregar(clave, texto, valor)
+
+    def buscar(self, consulta):
+        """
+        Busca los textos que contienen `consulta` como subcadena.
+        Parámetros:
+            consulta (str): Texto a buscar; se normaliza igual que los textos indexados.
+        Retorno:
+            list: Valores de las entradas que coinciden, en orden de inserción.
+        """
+        consulta = normalizar(consulta)
+        if len(consulta) < 3:
+            # Sin trigramas que intersectar: se revisan los textos ya normalizados
+            return [valor for _, texto, valor in self._entradas.values() if consulta in texto]
+
+        conjuntos = []
+        for trigrama in trigramas(consulta):
+            conjunto = self._publicaciones.get(trigrama)
+            if conjunto is None:
+                return []
+            conjuntos.append(conjunto)
+        conjuntos.sort(key=len)
+        candidatos = conjuntos[0].intersection(*conjuntos[1:])
+
+        # Verificación: los trigramas pueden coincidir sin que la consulta aparezca seguida
+        coincidencias = []
+        for clave in candidatos:
+            entrada = self._entradas[clave]
+            if consulta in entrada[1]:
+                coincidencias.append(entrada)
+        coincidencias.sort(key=lambda entrada: entrada[0])
+        return [entrada[2] for entrada in coincidencias]
@@ -0,0 +1,112 @@
+"""
+Migración de los datos guardados en archivos al almacenamiento SQLite (almacenamiento_sqlite.py)
+
+Lee los archivos con el propio código de cada semana, para que se interpreten exactamente igual
+que al usarlos, y escribe el resultado en una base nueva en una sola transacción. Los archivos
+originales no se modifican.
+
+Uso:
+    python migrar_a_sqlite.py inventario-texto inventario.txt           # Semana 10 (con su diario)
+    python migrar_a_sqlite.py inventario-json inventario.json           # Semana 11 (.json o .bin)
+    python migrar_a_sqlite.py biblioteca biblioteca.json usuarios.json  # Semana 12
+Por defecto la base se crea junto al archivo de origen con extensión .db (el nombre que usa cada
+semana con el almacenamiento 'sqlite'); se puede indicar otra con --destino.
+"""
+
+import argparse
+import glob
+import importlib.util
+import os
+import sys
+
+from almacenamiento_sqlite import AlmacenBiblioteca, AlmacenProductos
+
+
+def cargar_tarea(semana):
+    """Importa el script de la tarea de una semana (su nombre contiene espacios)."""
+    carpeta = os.path.dirname(os.path.abspath(__file__))
+    ruta = glob.glob(os.path.join(carpeta, f"Semana {semana}*", "Tarea*.py"))[0]
+    spec = importlib.util.spec_from_file_location(f"tarea_semana{semana}", ruta)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+def destino_por_defecto(origen):
+    return os.path.splitext(origen)[0] + '.db'
+
+
+def comprobar_destino(destino):
+    """La migración no mezcla datos con una base existente."""
+    if os.path.exists(destino):
+        raise SystemExit(f"{destino} ya existe; bórrelo o indique otro con --destino.")
+
+
+def migrar_inventario_texto(origen, destino):
+    """inventario.txt de la Semana 10, con los cambios de su diario aplicados."""
+    tarea = cargar_tarea(10)
+    inventario = tarea.Inventario(origen, modo_diario=True)
+    for error in inventario.errores_carga:
+        print(f"Aviso: {error}")
+    filas = [(p.id, p.nombre, p.cantidad, p.precio) for p in inventario.productos.values()]
+    almacen = AlmacenProductos(destino)
+    almacen.reemplazar(filas)
+    almacen.cerrar()
+    return f"{len(filas)} productos"
+
+
+def migrar_inventario_json(origen, destino):
+    """Inventario de la Semana 11, en formato JSON o binario según la extensión."""
+    tarea = cargar_tarea(11)
+    formato = 'binario' if origen.endswith('.bin') else 'json'
+    inventario = tarea.Inventario(origen, formato=formato)
+    filas = [(p.id, p.nombre, p.cantidad, p.precio) for p in inventario.productos.values()]
+    almacen = AlmacenProductos(destino)
+    almacen.reemplazar(filas)
+    almacen.cerrar()
+    return f"{len(filas)} productos"
+
+
+def migrar_biblioteca(origen, usuarios, destino):
+    """biblioteca.json y usuarios.json de la Semana 12 (el historial de préstamos no cambia de archivo)."""
+    tarea = cargar_tarea(12)
+    libros = [(datos['isbn'], datos['titulo'], datos['autor'], datos['categoria'], datos['prestado'])
+              for datos in tarea.cargar_json(origen, {}).values()]
+    tarea.Usuario.archivo_json = usuarios
+    registrados = [(u.id_usuario, u.nombre, u.libros_prestados) for u in tarea.cargar_usuarios().values()]
+    almacen = AlmacenBiblioteca(destino)
+    almacen.reemplazar(libros, registrados)
+    almacen.cerrar()
+    return f"{len(libros)} libros y {len(registrados)} usuarios"
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Migra los inventarios y la biblioteca a SQLite.")
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+    texto = subparsers.add_parser("inventario-texto", help="inventario.txt de la Semana 10")
+    texto.add_argument("origen")
+    json_ = subparsers.add_parser("inventario-json", help="inventario.json o .bin de la Semana 11")
+    json_.add_argument("origen")
+    biblioteca = subparsers.add_parser("biblioteca", help="biblioteca.json y usuarios.json de la Semana 12")
+    biblioteca.add_argument("origen")
+    biblioteca.add_argument("usuarios", nargs="?", default="usuarios.json")
+    for subparser in (texto, json_, biblioteca):
+        subparser.add_argument("--destino", help="Base de datos a crear (por defecto, el origen con extensión .db).")
+    opciones = parser.parse_args(argumentos)
+
+    if not os.path.exists(opciones.origen):
+        raise SystemExit(f"No existe {opciones.origen}.")
+    destino = opciones.destino or destino_por_defecto(opciones.origen)
+    comprobar_destino(destino)
+    if opciones.comando == "inventario-texto":
+        resumen = migrar_inventario_texto(opciones.origen, destino)
+    elif opciones.comando == "inventario-json":
+        resumen = migrar_inventario_json(opciones.origen, destino)
+    else:
+        resumen = migrar_biblioteca(opciones.origen, opciones.usuarios, destino)
+    print(f"Migrados {resumen} a {destino}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+"""
+Listados por páginas para los inventarios (Semanas 10 y 11) y la biblioteca (Semana 12).
+
+Mostrar un inventario o un catálogo grande con un `print` por elemento bloquea la terminal
+varios segundos. Aquí los listados son generadores, y la salida se escribe por bloques y
+página a página:
+
+    - `recorrer`: genera los elementos ordenados por una clave con paginación por clave
+      (keyset). Cada tramo toma, con heapq.nsmallest, los siguientes elementos cuya clave es
+      mayor que la del último entregado, sin ordenar antes toda la colección: la primera página
+      cuesta una sola pasada y el cursor sigue siendo válido aunque la colección cambie entre
+      una página y otra. Solo los dos primeros tramos (64 y 256 elementos, unas 15 páginas del
+      menú) se eligen así; si se sigue recorriendo, lo que falta se ordena de una vez, y un
+      recorrido completo cuesta dos pasadas más que un `sorted`.
+    - `EscritorSalida`: acumula las líneas y las escribe en sys.stdout en bloques de ~64 KB.
+    - `mostrar_paginas`: lo que usan los menús; muestra una página y pregunta si seguir.
+
+Las claves deben ser únicas (por eso las de texto terminan en el ID del elemento) y comparables
+entre sí; el cursor de una página es la clave de su último elemento.
+"""
+
+import heapq
+import json
+import sys
+from itertools import islice
+from operator import itemgetter
+
+TRAMOS = (64, 256)  # Tramos que se eligen con heapq antes de ordenar todo lo que falta
+
+
+def recorrer(elementos, clave, despues_de=None, descendente=False):
+    """
+    Genera los elementos ordenados por `clave`, empezando después del cursor `despues_de`.
+    Parámetros:
+        elementos: Colección con len() que se puede recorrer varias veces (por ejemplo
+            dict.values()), o función que devuelve los elementos actuales; se llama una vez por
+            tramo, y sirve para tomar una copia con el cerrojo de quien comparte la colección.
+        clave (callable): Función que devuelve la clave (única) de cada elemento.
+        despues_de: Clave del último elemento ya entregado, o None para empezar desde el principio.
+        descendente (bool): Orden de mayor a menor.
+    """
+    seleccionar = heapq.nlargest if descendente else heapq.nsmallest
+    obtener = elementos if callable(elementos) else lambda: elementos
+    cursor = despues_de
+    for tramo in TRAMOS + (None,):
+        elementos = obtener()
+        # Pares (clave, elemento): la clave se calcula una vez y, como es única, los elementos
+        # nunca se comparan entre sí
+        pares = ((clave(elemento), elemento) for elemento in elementos)
+        if cursor is not None and descendente:
+            pares = (par for par in pares if par[0] < cursor)
+        elif cursor is not None:
+            pares = (par for par in pares if par[0] > cursor)
+        # Se elige el tramo completo antes de entregar nada: quien recorre puede modificar la
+        # colección. Si el tramo se acerca al tamaño de la colección, ordenar todo es más barato.
+        if tramo is None or tramo * 4 >= len(elementos):
+            yield from [elemento for _, elemento in sorted(pares, key=itemgetter(0), reverse=descendente)]
+            return
+        siguientes = seleccionar(tramo, pares)
+        yield from [elemento for _, elemento in siguientes]
+        if len(siguientes) < tramo:
+            return
+        cursor = siguientes[-1][0]
+
+
+def pagina(elementos, clave, despues_de=None, limite=100, descendente=False):
+    """
+    Una página de `recorrer`.
+    Retorno:
+        tuple: (lista de elementos, cursor de la página siguiente o None si no hay más).
+    """
+    resultado = list(islice(recorrer(elementos, clave, despues_de, descendente), limite + 1))
+    if len(resultado) <= limite:
+        return resultado, None
+    return resultado[:limite], clave(resultado[limite - 1])
+
+
+def cursor_a_texto(cursor):
+    """Cursor (clave) como texto, para devolverlo por HTTP o guardarlo."""
+    return json.dumps(cursor, ensure_ascii=False)
+
+
+def texto_a_cursor(texto):
+    """Inverso de `cursor_a_texto` (las tuplas vuelven como tuplas). Lanza ValueError si no es válido."""
+    cursor = json.loads(texto)
+    return tuple(cursor) if isinstance(cursor, list) else cursor
+
+
+class EscritorSalida:
+    """
+    Acumula líneas y las escribe en la salida en bloques, en lugar de una llamada por línea.
+    Uso:
+        with EscritorSalida() as salida:
+            for producto in productos:
+                salida.escribir(str(producto))
+    Parámetros:
+        destino (archivo de texto, opcional): Por defecto, el sys.stdout actual (también el de
+            contextlib.redirect_stdout).
+        tamaño (int): Caracteres acumulados a partir de los cuales se escribe el bloque.
+    """
+
+    def __init__(self, destino=None, tamaño=64 * 1024):
+        self.destino = destino if destino is not None else sys.stdout
+        self.tamaño = tamaño
+        self._lineas = []
+        self._acumulado = 0
+
+    def escribir(self, linea):
+        self._lineas.append(linea)
+        self._acumulado += len(linea) + 1
+        if self._acumulado >= self.tamaño:
+            self.vaciar()
+
+    def vaciar(self):
+        """Escribe las líneas acumuladas."""
+        if self._lineas:
+            self.destino.write('\n'.join(self._lineas) + '\n')
+            self._lineas = []
+            self._acumulado = 0
+        self.destino.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *error):
+        self.vaciar()
+
+
+def mostrar_paginas(elementos, formatear=str, por_pagina=20, preguntar=None):
+    """
+    Muestra `elementos` de `por_pagina` en `por_pagina`. Tras cada página, si quedan más,
+    pregunta si seguir (Enter) o volver (q) con `preguntar` (por defecto, input). Solo se
+    generan los elementos que se muestran.
+    Retorno:
+        int: Cantidad de elementos mostrados.
+    """
+    preguntar = preguntar or input
+    iterador = iter(elementos)
+    siguiente = list(islice(iterador, por_pagina + 1))
+    mostrados = 0
+    while siguiente:
+        actual, siguiente = siguiente[:por_pagina], siguiente[por_pagina:]
+        with EscritorSalida() as salida:
+            for elemento in actual:
+                salida.escribir(formatear(elemento))
+        mostrados += len(actual)
+        if not siguiente:
+            break
+        if preguntar(f"-- {mostrados} mostrados. Enter: siguiente página, q: volver al menú -- ").strip().lower() == 'q':
+            break
+        siguiente += list(islice(iterador, por_pagina))
+    return mostrados
@@ -0,0 +1,261 @@
+"""
+Guardado seguro de archivos para los inventarios y la biblioteca.
+
+Lo usan las Semanas 10, 11 y 12. En lugar de abrir el archivo real con 'w' (lo que lo deja vacío
+o a medias si el programa se interrumpe mientras escribe), se escribe en un archivo temporal de la
+misma carpeta, se fuerza su contenido al disco con fsync y se renombra sobre el original con
+os.replace, que es atómico: quien lea el archivo ve la versión anterior completa o la nueva completa.
+
+El nivel de durabilidad permite elegir entre seguridad y latencia:
+    'siempre'  -> cada guardado escribe y hace fsync antes de volver (lo más seguro, lo más lento).
+    'grupo'    -> los guardados se acumulan y un hilo escribe solo el último cada `intervalo_ms`;
+                  un fallo puede perder como mucho los cambios de ese intervalo.
+    'ninguna'  -> se escribe y se renombra sin fsync; el sistema operativo decide cuándo llega al
+                  disco. Un corte de luz puede perder cambios recientes, pero nunca deja el archivo a medias.
+
+Para varios procesos que trabajan sobre los mismos archivos está `bloquear_archivo`, un cerrojo
+exclusivo entre procesos.
+"""
+
+import atexit
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl  # Cerrojos entre procesos en Linux y macOS
+except ImportError:
+    fcntl = None
+    import msvcrt  # Equivalente en Windows
+
+DURABILIDADES = ('siempre', 'grupo', 'ninguna')
+
+
+def sincronizar_carpeta(carpeta):
+    """
+    Hace fsync de una carpeta para que el renombrado quede registrado en disco.
+    En sistemas que no lo permiten (Windows) no hace nada.
+    """
+    if not hasattr(os, 'O_DIRECTORY'):
+        return
+    try:
+        descriptor = os.open(carpeta or '.', os.O_RDONLY | os.O_DIRECTORY)
+    except OSError:
+        return
+    try:
+        os.fsync(descriptor)
+    except OSError:
+        pass
+    finally:
+        os.close(descriptor)
+
+
+@contextmanager
+def archivo_atomico(ruta, modo='w', sincronizar=True, encoding='utf-8', newline=None):
+    """
+    Abre un archivo temporal junto a `ruta` para escribir en él; al salir del bloque sin errores
+    lo sincroniza (si `sincronizar` es True) y lo renombra sobre `ruta`. Si ocurre una excepción,
+    el temporal se borra y el archivo original queda intacto.
+    Uso:
+        with archivo_atomico('inventario.txt') as archivo:
+            archivo.write(...)
+    Parámetros:
+        ruta (str): Archivo de destino.
+        modo (str): 'w' para texto o 'wb' para bytes.
+        sincronizar (bool): Si se hace fsync del archivo y de la carpeta.
+    """
+    carpeta = os.path.dirname(os.path.abspath(ruta))
+    descriptor, temporal = tempfile.mkstemp(dir=carpeta, prefix=os.path.basename(ruta) + '.', suffix='.tmp')
+    try:
+        # mkstemp crea el temporal con permisos 0600: se conservan los del archivo original
+        try:
+            os.chmod(temporal, os.stat(ruta).st_mode & 0o777)
+        except FileNotFoundError:
+            os.chmod(temporal, 0o644)
+        if 'b' in modo:
+            archivo = os.fdopen(descriptor, modo)
+        else:
+            archivo = os.fdopen(descriptor, modo, encoding=encoding, newline=newline)
+        with archivo:
+            yield archivo
+            archivo.flush()
+            if sincronizar:
+                os.fsync(archivo.fileno())
+        os.replace(temporal, ruta)
+    except BaseException:
+        try:
+            os.remove(temporal)
+        except OSError:
+            pass
+        raise
+    if sincronizar:
+        sincronizar_carpeta(carpeta)
+
+
+def escribir_atomico(ruta, datos, sincronizar=True):
+    """
+    Reemplaza el contenido de `ruta` por `datos` (bytes) de forma atómica.
+    """
+    with archivo_atomico(ruta, 'wb', sincronizar) as archivo:
+        archivo.write(datos)
+
+
+@contextmanager
+def bloquear_archivo(ruta):
+    """
+    Cerrojo exclusivo entre procesos (y entre hilos) asociado a `ruta`, mientras dure el bloque.
+    Se bloquea un archivo auxiliar '<ruta>.lock' y no el archivo de datos, porque cada guardado
+    atómico reemplaza el archivo de datos por otro nuevo y el cerrojo quedaría en el anterior.
+    Quien quiera tomar varios cerrojos debe hacerlo siempre en el mismo orden.
+    """
+    with open(ruta + '.lock', 'a+b') as archivo:
+        if fcntl is not None:
+            fcntl.flock(archivo.fileno(), fcntl.LOCK_EX)
+        else:
+            archivo.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(archivo.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    pass  # LK_LOCK se rinde tras 10 s de espera: se vuelve a intentar
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(archivo.fileno(), fcntl.LOCK_UN)
+            else:
+                archivo.seek(0)
+                msvcrt.locking(archivo.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def serializar_json(datos, ensure_ascii=True):
+    """
+    Convierte datos a JSON (bytes UTF-8) para guardarlos. Se escribe compacto, en una sola línea:
+    con `indent`, json.dumps no puede usar su codificador de C y es unas diez veces más lento con
+    miles de elementos, lo que pesa cuando se guarda tras cada operación.
+    """
+    return json.dumps(datos, ensure_ascii=ensure_ascii).encode('utf-8')
+
+
+def respaldar_corrupto(ruta):
+    """
+    Renombra un archivo que no se pudo leer para conservarlo en lugar de sobrescribirlo.
+    Retorno:
+        str: Nueva ruta del archivo ('<ruta>.<fecha>.corrupto'), o None si no se pudo renombrar.
+    """
+    respaldo = f"{ruta}.{time.strftime('%Y%m%d-%H%M%S')}.corrupto"
+    try:
+        os.replace(ruta, respaldo)
+    except OSError:
+        return None
+    return respaldo
+
+
+def cargar_json(ruta, por_defecto=None):
+    """
+    Lee un archivo JSON. Si no existe devuelve `por_defecto`; si está dañado lo respalda con
+    `respaldar_corrupto`, avisa y devuelve `por_defecto`, de modo que el próximo guardado no
+    destruya los datos originales.
+    """
+    try:
+        with open(ruta, 'r', encoding='utf-8') as archivo:
+            return json.load(archivo)
+    except FileNotFoundError:
+        return por_defecto
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        respaldo = respaldar_corrupto(ruta)
+        if respaldo:
+            print(f"\nAdvertencia: {ruta} está dañado; se guardó una copia en {respaldo} y se empieza vacío.")
+        else:
+            print(f"\nAdvertencia: {ruta} está dañado y no se pudo respaldar.")
+        return por_defecto
+
+
+class ArchivoDurable:
+    """
+    Guarda el contenido completo de un archivo (en bytes) con el nivel de durabilidad elegido.
+    Parámetros:
+        ruta (str): Archivo de destino.
+        durabilidad (str): 'siempre', 'grupo' o 'ninguna' (ver el comentario del módulo).
+        intervalo_ms (int): Solo en modo 'grupo', cada cuánto se escribe el último contenido pendiente.
+    En modo 'grupo' el contenido pendiente se escribe también al llamar a `vaciar()` y al
+    terminar el programa.
+    """
+
+    def __init__(self, ruta, durabilidad='siempre', intervalo_ms=50):
+        if durabilidad not in DURABILIDADES:
+            raise ValueError(f"Durabilidad desconocida: {durabilidad}. Use una de {', '.join(DURABILIDADES)}.")
+        self.ruta = ruta
+        self.durabilidad = durabilidad
+        self.intervalo_ms = intervalo_ms
+        self.escrituras = 0            # Escrituras reales al disco (para medir la agrupación)
+        self.ultimo_error = None       # Último error del hilo de escritura en modo 'grupo'
+        self._pendiente = None         # (número de guardado, contenido) aún no escrito
+        self._guardados = 0            # Número del último guardado recibido
+        self._escrito = 0              # Número del último guardado escrito en disco
+        self._temporizador = None
+        self._cerrojo = threading.Lock()            # Protege _pendiente y _temporizador
+        self._cerrojo_escritura = threading.Lock()  # Evita dos escrituras a la vez
+        if durabilidad == 'grupo':
+            atexit.register(self.vaciar)
+
+    def guardar(self, datos):
+        """
+        Guarda `datos` (bytes) como nuevo contenido del archivo. En modo 'grupo' solo lo deja
+        pendiente y vuelve de inmediato; el contenido debe estar ya serializado, porque el hilo
+        de escritura no puede recorrer estructuras que el programa sigue modificando.
+        """
+        with self._cerrojo:
+            self._guardados += 1
+            numero = self._guardados
+            if self.durabilidad == 'grupo':
+                self._pendiente = (numero, datos)
+        if self.durabilidad != 'grupo':
+            self._escribir(numero, datos)
+            return
+        with self._cerrojo:
+            if self._pendiente is not None and self._temporizador is None:
+                self._temporizador = threading.Timer(self.intervalo_ms / 1000, self._vaciar_temporizado)
+                self._temporizador.daemon = True
+                self._temporizador.start()
+
+    def vaciar(self):
+        """
+        Escribe ahora el contenido pendiente, si lo hay. Las excepciones se propagan.
+        """
+        with self._cerrojo:
+            pendiente, self._pendiente = self._pendiente, None
+            if self._temporizador is not None:
+                self._temporizador.cancel()
+                self._temporizador = None
+        if pendiente is not None:
+            self._escribir(*pendiente)
+
+    def _vaciar_temporizado(self):
+        """Función del hilo del temporizador: escribe el último contenido pendiente."""
+        with self._cerrojo:
+            pendiente, self._pendiente = self._pendiente, None
+            self._temporizador = None
+        if pendiente is None:
+            return
+        try:
+            self._escribir(*pendiente)
+        except OSError as e:
+            self.ultimo_error = e
+            print(f"\nError al guardar {self.ruta}: {e}")
+
+    def _escribir(self, numero, datos):
+        """
+        Escribe el contenido del guardado `numero`, salvo que ya se haya escrito uno posterior
+        (puede pasar si `vaciar()` se adelanta al hilo del temporizador).
+        """
+        with self._cerrojo_escritura:
+            if numero <= self._escrito:
+                return
+            escribir_atomico(self.ruta, datos, sincronizar=self.durabilidad != 'ninguna')
+            self._escrito = numero
+            self.escrituras += 1
@@ -0,0 +1,488 @@
+"""
+Servicio HTTP/JSON para la biblioteca (Semana 12) y el inventario (Semana 11 o Semana 10)
+
+Expone por red las mismas operaciones que los menús: altas, bajas y búsquedas de libros y
+productos, préstamos y devoluciones. Solo usa la biblioteca estándar (asyncio).
+
+    - Conexiones persistentes (keep-alive): un cliente puede enviar muchas peticiones por la
+      misma conexión; se cierra tras `Connection: close` o TIEMPO_INACTIVIDAD sin peticiones.
+    - Un solo escritor: las peticiones que modifican datos se ponen en una cola y una única tarea
+      las aplica en orden. Cada vez toma todas las que se acumularon mientras aplicaba las
+      anteriores y las ejecuta juntas dentro de `Inventario.transaccion()` y `Biblioteca.lote()`,
+      de modo que el grupo se guarda en disco una sola vez (escritura agrupada).
+    - Las operaciones sobre los datos (lecturas y escrituras) se ejecutan en un único hilo
+      auxiliar, así el bucle de eventos sigue atendiendo conexiones mientras se guarda.
+    - POST /lote recibe una lista de operaciones y las ejecuta en orden como un solo grupo.
+
+Rutas:
+    GET    /estado
+    GET    /libros?titulo=&autor=&categoria=     POST   /libros
+    GET    /libros?orden=titulo&limite=100&despues_de=<siguiente>   (listado por páginas)
+    GET    /libros/relevantes?q=&k=               GET    /libros/<isbn>     DELETE /libros/<isbn>
+    GET    /libros/<isbn>/poseedor
+    POST   /usuarios                              DELETE /usuarios/<id>
+    (DELETE de un libro prestado o de un usuario con préstamos: 409; con ?forzar=1 se dan por devueltos)
+    POST   /prestamos      POST /devoluciones     GET    /prestamos/vencidos
+    GET    /productos?nombre=                     POST   /productos
+    GET    /productos?orden=nombre&limite=100&despues_de=<siguiente>
+    GET    /productos/<id>  PATCH /productos/<id>  DELETE /productos/<id>
+    POST   /lote    [{"metodo": "POST", "ruta": "/prestamos", "cuerpo": {...}}, ...]
+
+Los archivos de datos se leen y escriben en la carpeta actual.
+
+Uso:
+    python servicio_http.py                          # http://127.0.0.1:8080, inventario de la Semana 11
+    python servicio_http.py --puerto 9000 --inventario 10 --durabilidad ninguna
+    python servicio_http.py --sqlite                 # biblioteca e inventario en bases SQLite
+"""
+
+import argparse
+import asyncio
+import contextlib
+import glob
+import importlib.util
+import io
+import json
+import os
+import re
+import signal
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from paginacion import cursor_a_texto, pagina, texto_a_cursor
+from persistencia import DURABILIDADES
+
+TIEMPO_INACTIVIDAD = 30        # Segundos que una conexión persistente puede quedar sin peticiones
+MAXIMO_CUERPO = 8 * 1024 * 1024
+MAXIMO_GRUPO = 512             # Peticiones de escritura como máximo en una escritura agrupada
+MAXIMO_PAGINA = 1000           # Elementos como máximo por página de los listados
+MOTIVOS = {200: 'OK', 201: 'Created', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           409: 'Conflict', 413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+
+def cargar_tarea(semana):
+    """Importa el script de la tarea de una semana (su nombre contiene espacios)."""
+    carpeta = os.path.dirname(os.path.abspath(__file__))
+    ruta = glob.glob(os.path.join(carpeta, f"Semana {semana}*", "Tarea*.py"))[0]
+    spec = importlib.util.spec_from_file_location(f"tarea_semana{semana}", ruta)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+class ErrorPeticion(Exception):
+    """Petición que no se puede atender; `estado` es el código HTTP de la respuesta."""
+    def __init__(self, estado, mensaje):
+        super().__init__(mensaje)
+        self.estado = estado
+
+
+def _campo(datos, nombre, tipo=str, opcional=False):
+    """Lee un campo del cuerpo JSON comprobando su tipo; ErrorPeticion(400) si falta o no sirve."""
+    if not isinstance(datos, dict):
+        raise ErrorPeticion(400, "El cuerpo debe ser un objeto JSON.")
+    valor = datos.get(nombre)
+    if valor is None:
+        if opcional:
+            return None
+        raise ErrorPeticion(400, f"Falta el campo '{nombre}'.")
+    if tipo is float and isinstance(valor, int) and not isinstance(valor, bool):
+        valor = float(valor)
+    if not isinstance(valor, tipo) or isinstance(valor, bool):
+        raise ErrorPeticion(400, f"El campo '{nombre}' debe ser de tipo {tipo.__name__}.")
+    return valor
+
+
+def _entero(texto, nombre):
+    try:
+        return int(texto)
+    except ValueError:
+        raise ErrorPeticion(400, f"'{nombre}' debe ser un número entero.") from None
+
+
+def producto_a_diccionario(producto):
+    return {'id': producto.id, 'nombre': producto.nombre, 'cantidad': producto.cantidad, 'precio': producto.precio}
+
+
+def prestamo_a_diccionario(prestamo):
+    return {'isbn': prestamo.isbn, 'id_usuario': prestamo.id_usuario, 'fecha_prestamo': prestamo.fecha_prestamo,
+            'fecha_vencimiento': prestamo.fecha_vencimiento, 'fecha_devolucion': prestamo.fecha_devolucion}
+
+
+class Servicio:
+    """
+    Atiende las peticiones HTTP sobre una Biblioteca y un Inventario ya creados.
+    Args:
+        biblioteca: Biblioteca de la Semana 12.
+        inventario: Inventario de la Semana 10 u 11 (ambos tienen `transaccion()`).
+        tareas (dict): Módulos de las tareas, para crear Libro y Producto.
+    """
+    def __init__(self, biblioteca, inventario, tareas):
+        self.biblioteca = biblioteca
+        self.inventario = inventario
+        self.tareas = tareas
+        self.peticiones = 0
+        self.grupos = 0               # Escrituras agrupadas aplicadas
+        self.escrituras = 0           # Operaciones de escritura aplicadas
+        self._ejecutor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='datos')
+        self._cola = None
+        # (método, patrón de la ruta, manejador, si modifica datos)
+        self._rutas = [
+            ('GET', r'/estado', self._estado, False),
+            ('GET', r'/libros', self._buscar_libros, False),
+            ('POST', r'/libros', self._añadir_libro, True),
+            ('GET', r'/libros/relevantes', self._libros_relevantes, False),
+            ('GET', r'/libros/([^/]+)', self._obtener_libro, False),
+            ('GET', r'/libros/([^/]+)/poseedor', self._poseedor, False),
+            ('DELETE', r'/libros/([^/]+)', self._quitar_libro, True),
+            ('POST', r'/usuarios', self._registrar_usuario, True),
+            ('DELETE', r'/usuarios/([^/]+)', self._eliminar_usuario, True),
+            ('POST', r'/prestamos', self._prestar, True),
+            ('POST', r'/devoluciones', self._devolver, True),
+            ('GET', r'/prestamos/vencidos', self._vencidos, False),
+            ('GET', r'/productos', self._buscar_productos, False),
+            ('POST', r'/productos', self._añadir_producto, True),
+            ('GET', r'/productos/([^/]+)', self._obtener_producto, False),
+            ('PATCH', r'/productos/([^/]+)', self._actualizar_producto, True),
+            ('DELETE', r'/productos/([^/]+)', self._eliminar_producto, True),
+        ]
+        self._rutas = [(metodo, re.compile(patron + '$'), manejador, escritura)
+                       for metodo, patron, manejador, escritura in self._rutas]
+
+    # --- Operaciones (se ejecutan en el hilo de datos) -------------------------------------
+
+    def _estado(self, parametros, datos):
+        return 200, {'libros': len(self.biblioteca.libros), 'productos': len(self.inventario.productos),
+                     'peticiones': self.peticiones, 'escrituras': self.escrituras, 'grupos': self.grupos}
+
+    def _paginar(self, parametros, elementos, ordenes, orden_por_defecto, a_diccionario, nombre):
+        """
+        Una página de un listado (ver paginacion.pagina). La respuesta incluye en 'siguiente' el
+        cursor que se pasa como `despues_de` para pedir la página siguiente (null en la última).
+        """
+        orden = parametros.get('orden', orden_por_defecto)
+        if orden not in ordenes:
+            raise ErrorPeticion(400, f"Orden desconocido: {orden}. Use uno de {', '.join(ordenes)}.")
+        limite = _entero(parametros.get('limite', '100'), 'limite')
+        if not 1 <= limite <= MAXIMO_PAGINA:
+            raise ErrorPeticion(400, f"'limite' debe estar entre 1 y {MAXIMO_PAGINA}.")
+        try:
+            despues_de = texto_a_cursor(parametros['despues_de']) if 'despues_de' in parametros else None
+            elementos, siguiente = pagina(elementos, ordenes[orden], despues_de, limite,
+                                          parametros.get('descendente') in ('1', 'true'))
+        except (ValueError, TypeError):
+            raise ErrorPeticion(400, "El cursor 'despues_de' no corresponde a este listado.") from None
+        return 200, {nombre: [a_diccionario(elemento) for elemento in elementos],
+                     'siguiente': None if siguiente is None else cursor_a_texto(siguiente)}
+
+    def _buscar_libros(self, parametros, datos):
+        titulo, autor, categoria = (parametros.get(campo) for campo in ('titulo', 'autor', 'categoria'))
+        if 'orden' in parametros or 'limite' in parametros:
+            return self._paginar(parametros, self.biblioteca.libros.values(), self.tareas[12].ORDENES_LIBROS,
+                                 'isbn', self.tareas[12].Libro.to_dict, 'libros')
+        if titulo or autor or categoria:
+            libros = self.biblioteca.buscar(titulo, autor, categoria)
+        else:
+            libros = list(self.biblioteca.libros.values())
+        return 200, {'libros': [libro.to_dict() for libro in libros]}
+
+    def _libros_relevantes(self, parametros, datos):
+        k = _entero(parametros.get('k', '10'), 'k')
+        libros = self.biblioteca.buscar_relevantes(parametros.get('q', ''), k)
+        return 200, {'libros': [libro.to_dict() for libro in libros]}
+
+    def _obtener_libro(self, parametros, datos, isbn):
+        libro = self.biblioteca.libros.get(isbn)
+        if libro is None:
+            raise ErrorPeticion(404, f"No existe el libro con ISBN {isbn}.")
+        return 200, libro.to_dict()
+
+    def _añadir_libro(self, parametros, datos):
+        libro = self.tareas[12].Libro(_campo(datos, 'isbn'), _campo(datos, 'titulo'), _campo(datos, 'autor'),
+                                      _campo(datos, 'categoria'))
+        self.biblioteca.añadir_libro(libro)
+        return 201, libro.to_dict()
+
+    def _quitar_libro(self, parametros, datos, isbn):
+        if isbn not in self.biblioteca.libros:
+            raise ErrorPeticion(404, f"No existe el libro con ISBN {isbn}.")
+        if not self.biblioteca.quitar_libros(isbn, forzar=parametros.get('forzar') in ('1', 'true')):
+            raise ErrorPeticion(409, "El libro está prestado; con ?forzar=1 se da por devuelto y se quita.")
+        return 200, {}
+
+    def _poseedor(self, parametros, datos, isbn):
+        if isbn not in self.biblioteca.libros:
+            raise ErrorPeticion(404, f"No existe el libro con ISBN {isbn}.")
+        usuario = self.biblioteca.poseedor(isbn)
+        return 200, {'isbn': isbn, 'usuario': usuario.to_dict() if usuario is not None else None}
+
+    def _registrar_usuario(self, parametros, datos):
+        nuevo = self.biblioteca.registrar_usuario(_campo(datos, 'id_usuario'), _campo(datos, 'nombre'))
+        return (201 if nuevo else 200), {}
+
+    def _eliminar_usuario(self, parametros, datos, id_usuario):
+        if self.biblioteca.obtener_usuario(id_usuario) is None:
+            raise ErrorPeticion(404, f"No existe el usuario {id_usuario}.")
+        if not self.biblioteca.eliminar_usuario(id_usuario, forzar=parametros.get('forzar') in ('1', 'true')):
+            raise ErrorPeticion(409, "El usuario tiene libros prestados; con ?forzar=1 se dan por devueltos y se elimina.")
+        return 200, {}
+
+    def _prestar(self, parametros, datos):
+        isbn, id_usuario = _campo(datos, 'isbn'), _campo(datos, 'id_usuario')
+        if not self.biblioteca.prestar_libro(isbn, id_usuario):
+            return 409, {}
+        return 201, prestamo_a_diccionario(self.biblioteca.prestamos.activo(isbn))
+
+    def _devolver(self, parametros, datos):
+        return (200, {}) if self.biblioteca.devolver_libro(_campo(datos, 'isbn'), _campo(datos, 'id_usuario')) else (409, {})
+
+    def _vencidos(self, parametros, datos):
+        return 200, {'prestamos': [prestamo_a_diccionario(p) for p in self.biblioteca.prestamos.vencidos()]}
+
+    def _buscar_productos(self, parametros, datos):
+        nombre = parametros.get('nombre')
+        if 'orden' in parametros or 'limite' in parametros:
+            return self._paginar(parametros, self.inventario.productos.values(),
+                                 self.tareas['inventario'].ORDENES_PRODUCTOS, 'id', producto_a_diccionario, 'productos')
+        productos = self.inventario.buscar_por_nombre(nombre) if nombre else self.inventario.productos.values()
+        return 200, {'productos': [producto_a_diccionario(p) for p in productos]}
+
+    def _obtener_producto(self, parametros, datos, id):
+        producto = self.inventario.productos.get(_entero(id, 'id'))
+        if producto is None:
+            raise ErrorPeticion(404, f"No existe el producto con ID {id}.")
+        return 200, producto_a_diccionario(producto)
+
+    def _añadir_producto(self, parametros, datos):
+        producto = self.tareas['inventario'].Producto(_campo(datos, 'id', int), _campo(datos, 'nombre'),
+                                                      _campo(datos, 'cantidad', int), _campo(datos, 'precio', float))
+        if not self.inventario.añadir_producto(producto):
+            return 409, {}
+        return 201, producto_a_diccionario(producto)
+
+    def _actualizar_producto(self, parametros, datos, id):
+        id = _entero(id, 'id')
+        cantidad, precio = _campo(datos, 'cantidad', int, True), _campo(datos, 'precio', float, True)
+        if id not in self.inventario.productos:
+            raise ErrorPeticion(404, f"No existe el producto con ID {id}.")
+        self.inventario.actualizar_producto(id, cantidad, precio)
+        return 200, producto_a_diccionario(self.inventario.productos[id])
+
+    def _eliminar_producto(self, parametros, datos, id):
+        return (200, {}) if self.inventario.eliminar_producto(_entero(id, 'id')) else (404, {})
+
+    def _ejecutar(self, operacion):
+        """
+        Ejecuta una operación (manejador, argumentos) y devuelve (estado, cuerpo). Lo que la
+        operación imprime (los mensajes de los menús) se devuelve en el campo 'mensaje'.
+        """
+        manejador, argumentos = operacion
+        salida = io.StringIO()
+        try:
+            with contextlib.redirect_stdout(salida):
+                estado, cuerpo = manejador(*argumentos)
+        except ErrorPeticion as e:
+            return e.estado, {'error': str(e)}
+        except Exception as e:
+            return 500, {'error': f"{type(e).__name__}: {e}"}
+        mensaje = salida.getvalue().strip()
+        if mensaje:
+            cuerpo.setdefault('mensaje', mensaje)
+        return estado, cuerpo
+
+    def _aplicar_grupo(self, grupo):
+        """
+        Aplica en orden las operaciones de varias peticiones dentro de una transacción del
+        inventario y un lote de la biblioteca: todas se guardan con una sola escritura.
+        """
+        with contextlib.redirect_stdout(io.StringIO()), self.inventario.transaccion(), self.biblioteca.lote():
+            return [[self._ejecutar(operacion) for operacion in operaciones] for operaciones in grupo]
+
+    # --- Cola de escritura ----------------------------------------------------------------
+
+    async def _escritor(self):
+        """Única tarea que modifica los datos: aplica juntas todas las peticiones acumuladas."""
+        bucle = asyncio.get_running_loop()
+        while True:
+            pendientes = [await self._cola.get()]
+            while len(pendientes) < MAXIMO_GRUPO and not self._cola.empty():
+                pendientes.append(self._cola.get_nowait())
+            grupo = [operaciones for operaciones, _ in pendientes]
+            try:
+                resultados = await bucle.run_in_executor(self._ejecutor, self._aplicar_grupo, grupo)
+            except Exception as e:
+                error = (500, {'error': f"No se pudo guardar: {type(e).__name__}: {e}"})
+                resultados = [[error] * len(operaciones) for operaciones in grupo]
+            self.grupos += 1
+            self.escrituras += sum(len(operaciones) for operaciones in grupo)
+            for (_, futuro), resultado in zip(pendientes, resultados):
+                if not futuro.done():
+                    futuro.set_result(resultado)
+
+    async def _encolar(self, operaciones):
+        """Pone operaciones en la cola del escritor y espera sus resultados."""
+        futuro = asyncio.get_running_loop().create_future()
+        await self._cola.put((operaciones, futuro))
+        return await futuro
+
+    # --- Enrutado --------------------------------------------------------------------------
+
+    def _resolver(self, metodo, objetivo, datos):
+        """
+        Busca la ruta de una petición.
+        Returns:
+            tuple: ((manejador, argumentos), si modifica datos).
+        """
+        url = urlsplit(objetivo)
+        ruta = url.path.rstrip('/') or '/'
+        parametros = dict(parse_qsl(url.query))
+        ruta_existe = False
+        for metodo_ruta, patron, manejador, escritura in self._rutas:
+            coincidencia = patron.match(ruta)
+            if coincidencia is None:
+                continue
+            ruta_existe = True
+            if metodo_ruta == metodo:
+                argumentos = (parametros, datos) + tuple(unquote(g) for g in coincidencia.groups())
+                return (manejador, argumentos), escritura
+        if ruta_existe:
+            raise ErrorPeticion(405, f"Método {metodo} no permitido en {ruta}.")
+        raise ErrorPeticion(404, f"No existe la ruta {ruta}.")
+
+    async def procesar(self, metodo, objetivo, datos):
+        """Atiende una petición ya decodificada y devuelve (estado, cuerpo)."""
+        self.peticiones += 1
+        try:
+            if urlsplit(objetivo).path.rstrip('/') == '/lote':
+                if metodo != 'POST':
+                    raise ErrorPeticion(405, "Use POST para /lote.")
+                return await self._lote(datos)
+            operacion, escritura = self._resolver(metodo, objetivo, datos)
+        except ErrorPeticion as e:
+            return e.estado, {'error': str(e)}
+        if escritura:
+            return (await self._encolar([operacion]))[0]
+        return await asyncio.get_running_loop().run_in_executor(self._ejecutor, self._ejecutar, operacion)
+
+    async def _lote(self, datos):
+        """POST /lote: ejecuta una lista de operaciones, en orden, en una sola escritura agrupada."""
+        if not isinstance(datos, list):
+            raise ErrorPeticion(400, "El cuerpo de /lote debe ser una lista de operaciones.")
+        operaciones = []
+        for elemento in datos:
+            metodo = _campo(elemento, 'metodo').upper()
+            ruta = _campo(elemento, 'ruta')
+            if urlsplit(ruta).path.rstrip('/') == '/lote':
+                raise ErrorPeticion(400, "Un lote no puede contener otro lote.")
+            operaciones.append(self._resolver(metodo, ruta, elemento.get('cuerpo'))[0])
+        resultados = await self._encolar(operaciones)
+        return 200, {'resultados': [{'estado': estado, 'cuerpo': cuerpo} for estado, cuerpo in resultados]}
+
+    # --- HTTP -------------------------------------------------------------------------------
+
+    async def atender(self, lector, escritor):
+        """Atiende una conexión: lee peticiones HTTP/1.1 una tras otra mientras siga abierta."""
+        try:
+            while True:
+                try:
+                    cabecera = await asyncio.wait_for(lector.readuntil(b'\r\n\r\n'), TIEMPO_INACTIVIDAD)
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    await self._responder(escritor, 413, {'error': "Cabeceras demasiado largas."}, False)
+                    break
+                try:
+                    linea, *lineas = cabecera.decode('latin-1').rstrip('\r\n').split('\r\n')
+                    metodo, objetivo, version = linea.split(' ')
+                    cabeceras = {}
+                    for texto in lineas:
+                        nombre, valor = texto.split(':', 1)
+                        cabeceras[nombre.strip().lower()] = valor.strip()
+                    longitud = int(cabeceras.get('content-length', 0))
+                except ValueError:
+                    await self._responder(escritor, 400, {'error': "Petición HTTP mal formada."}, False)
+                    break
+                if longitud > MAXIMO_CUERPO:
+                    await self._responder(escritor, 413, {'error': "Cuerpo demasiado grande."}, False)
+                    break
+                try:
+                    cuerpo = await lector.readexactly(longitud) if longitud else b''
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                conexion = cabeceras.get('connection', '').lower()
+                mantener = conexion == 'keep-alive' if version == 'HTTP/1.0' else conexion != 'close'
+                try:
+                    datos = json.loads(cuerpo) if cuerpo else None
+                except ValueError:
+                    estado, respuesta = 400, {'error': "El cuerpo no es JSON válido."}
+                else:
+                    estado, respuesta = await self.procesar(metodo.upper(), objetivo, datos)
+                await self._responder(escritor, estado, respuesta, mantener)
+                if not mantener:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            escritor.close()
+
+    async def _responder(self, escritor, estado, cuerpo, mantener):
+        contenido = json.dumps(cuerpo, ensure_ascii=False).encode('utf-8')
+        cabecera = (f"HTTP/1.1 {estado} {MOTIVOS.get(estado, '')}\r\n"
+                    f"Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(contenido)}\r\n"
+                    f"Connection: {'keep-alive' if mantener else 'close'}\r\n\r\n")
+        escritor.write(cabecera.encode('latin-1') + contenido)
+        await escritor.drain()
+
+    async def ejecutar(self, host, puerto):
+        """Atiende conexiones hasta recibir Ctrl+C o SIGTERM; al terminar vacía los guardados pendientes."""
+        self._cola = asyncio.Queue()
+        escritor = asyncio.create_task(self._escritor())
+        servidor = await asyncio.start_server(self.atender, host, puerto)
+        detener = asyncio.Event()
+        with contextlib.suppress(NotImplementedError):  # Windows no admite add_signal_handler
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, detener.set)
+        print(f"Servicio escuchando en http://{host}:{puerto}")
+        try:
+            async with servidor:
+                await detener.wait()
+        finally:
+            escritor.cancel()
+            with contextlib.redirect_stdout(io.StringIO()):
+                self.biblioteca.vaciar()
+                if hasattr(self.inventario, 'vaciar'):
+                    self.inventario.vaciar()
+            self._ejecutor.shutdown()
+            print(f"Servicio detenido ({self.peticiones} peticiones, {self.escrituras} escrituras en {self.grupos} grupos).")
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Servicio HTTP/JSON de la biblioteca y el inventario.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--puerto', type=int, default=8080)
+    parser.add_argument('--inventario', type=int, choices=(10, 11), default=11,
+                        help="Semana cuyo inventario se sirve (por defecto, 11).")
+    parser.add_argument('--durabilidad', choices=DURABILIDADES, default='siempre',
+                        help="Durabilidad de los guardados (la Semana 10 siempre hace fsync).")
+    parser.add_argument('--sqlite', action='store_true',
+                        help="Guarda la biblioteca y el inventario en SQLite (ver almacenamiento_sqlite.py).")
+    opciones = parser.parse_args(argumentos)
+
+    tareas = {12: cargar_tarea(12), 'inventario': cargar_tarea(opciones.inventario)}
+    with contextlib.redirect_stdout(io.StringIO()):
+        biblioteca = tareas[12].Biblioteca(durabilidad=opciones.durabilidad,
+                                           almacenamiento='sqlite' if opciones.sqlite else 'json')
+        if opciones.inventario == 11:
+            inventario = tareas['inventario'].Inventario(durabilidad=opciones.durabilidad,
+                                                         formato='sqlite' if opciones.sqlite else 'json')
+        else:
+            inventario = tareas['inventario'].Inventario(almacenamiento='sqlite' if opciones.sqlite else 'texto')
+    servicio = Servicio(biblioteca, inventario, tareas)
+    try:
+        asyncio.run(servicio.ejecutar(opciones.host, opciones.puerto))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,27 @@
+import gc
+import os
+import sys
 from tkinter import Tk, Label, Entry, Frame, messagebox, Button
 from tkinter import ttk # Módulo de widgets mejorados de tkinte
 from tkcalendar import DateEntry # Widget especial para selección de fechas
-from datetime import datetime
+from datetime import date, datetime, timedelta
+
+# Módulos compartidos de la unidad (carpeta superior): agenda_eventos y trabajo_en_fondo
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from agenda_eventos import AgendaEventos
+from trabajo_en_fondo import EjecutorFondo
 
 # Configuración de la ventana principal
 agenda = Tk() # Crear la ventana raíz de la aplicación
 agenda.title("Agenda Personal") # Establecer el título de la ventana
-agenda.geometry("600x550")  # Dimensiones iniciales de la ventana (ancho x alto)
+agenda.geometry("600x600")  # Dimensiones iniciales de la ventana (ancho x alto)
 agenda.configure(bg="lightblue") # Color de fondo para la ventana
 
+# Eventos guardados en 'agenda.jsonl', ordenados por fecha y hora; se leen en un hilo de fondo
+eventos = AgendaEventos()
+fondo = EjecutorFondo(agenda)
+fecha_vista = date.today() # El TreeView muestra la semana (o el mes) de esta fecha
+
 def validar_hora(hora):
     """
     Valida que la hora tenga el formato correcto (HH:MM).
@@ -25,9 +38,72 @@ def validar_hora(hora):
         # Si hay un error al convertir, el formato es incorrecto
         return False
 
+def cargando():
+    """Indica (y avisa) si los eventos guardados aún se están cargando; mientras tanto no se modifican."""
+    if not eventos.cargado:
+        messagebox.showinfo("Cargando", "Espera a que terminen de cargarse los eventos.")
+    return not eventos.cargado
+
+def eventos_cargados():
+    """
+    Al terminar la carga: los eventos no forman ciclos, así que se sacan (una sola vez, con todo
+    ya cargado) del recolector de ciclos, que si no los recorre enteros en cada recolección
+    completa y detiene la ventana. Es una decisión de la aplicación, porque gc.freeze() afecta a
+    todos los objetos del proceso; después se muestra la semana actual.
+    """
+    gc.freeze()
+    mostrar_eventos()
+    if eventos.lineas_ignoradas:
+        messagebox.showwarning("Agenda", f"Se ignoraron {eventos.lineas_ignoradas} líneas de {eventos.ruta} "
+                                         "que no se pudieron leer.")
+
+def eventos_no_cargados(error):
+    """
+    Si la carga falla, la agenda empieza vacía (el archivo se aparta) en lugar de quedarse
+    cargando toda la sesión sin permitir agregar ni eliminar eventos.
+    """
+    apartado = eventos.abandonar_carga()
+    mostrar_eventos()
+    copia = f"Se guardó como {apartado}." if apartado else "No se pudo apartar el archivo."
+    messagebox.showerror("Error", f"No se pudo leer {eventos.ruta}: {error}\n"
+                                  f"Se empieza con la agenda vacía. {copia}")
+
+def cargar_eventos():
+    """Lee los eventos guardados en un hilo de fondo; al terminar se muestra la semana actual."""
+    fondo.enviar(lambda trabajo: eventos.cargar(), al_terminar=lambda _: eventos_cargados(),
+                 al_fallar=eventos_no_cargados)
+
+def mostrar_eventos(fecha=None):
+    """
+    Llena el TreeView solo con los eventos de la semana o el mes (según el selector) que
+    contiene `fecha` (por defecto, la que ya se estaba viendo). La agenda encuentra ese
+    intervalo con búsqueda binaria, así que no importa cuántos años de eventos tenga.
+    """
+    global fecha_vista
+    if fecha is not None:
+        fecha_vista = fecha
+    if not eventos.cargado:
+        return
+    desde, hasta = (AgendaEventos.mes_de if vista_combo.get() == "Mes" else AgendaEventos.semana_de)(fecha_vista)
+    eventos_tree.delete(*eventos_tree.get_children()) # Quitar las filas del intervalo anterior
+    en_vista = eventos.entre(desde, hasta)
+    for evento in en_vista:
+        hora = evento.momento.strftime("%H:%M:%S" if evento.momento.second else "%H:%M")
+        eventos_tree.insert("", "end", iid=evento.id,
+                            values=(evento.momento.strftime("%d/%m/%Y"), hora, evento.descripcion))
+    vista_label.config(text=f"{desde:%d/%m/%Y} - {hasta - timedelta(days=1):%d/%m/%Y}: "
+                            f"{len(en_vista)} evento(s) de {len(eventos)}")
+
+def mover_vista(sentido):
+    """Muestra el intervalo siguiente (sentido 1) o el anterior (sentido -1)."""
+    desde, hasta = (AgendaEventos.mes_de if vista_combo.get() == "Mes" else AgendaEventos.semana_de)(fecha_vista)
+    mostrar_eventos(hasta.date() if sentido > 0 else (desde - timedelta(days=1)).date())
+
 def agregar_evento():
-    """Agrega un nuevo evento a la lista (TreeView)."""
-    fecha = fecha_entry.get() # Obtener la fecha seleccionada
+    """Agrega un nuevo evento a la agenda y muestra la semana (o el mes) en que cae."""
+    if cargando():
+        return
+    fecha = fecha_entry.get_date() # Obtener la fecha seleccionada
     hora = hora_entry.get().strip() # Obtener la hora y eliminar espacios en blanco
     descripcion = descripcion_entry.get().strip() # Obtener la descripción y eliminar espacios
 
@@ -37,20 +113,28 @@ def agregar_evento():
 
     # Manejar el campo de hora
     if not hora: # Si el campo de hora está vacío, usar la hora actual
-        hora = datetime.now().strftime("%H:%M:%S")
+        hora = datetime.now().time().replace(microsecond=0)
     elif not validar_hora(hora): # Si la hora ingresada es incorrecta
         messagebox.showwarning("Formato incorrecto", "Por favor ingresa la hora en formato HH:MM")
         return
-
-    # Insertar el evento en el TreeView
-    eventos_tree.insert("", "end", values=(fecha, hora, descripcion))
+    else:
+        hora = datetime.strptime(hora, "%H:%M").time()
+
+    # Guardar el evento y mostrar el intervalo que lo contiene, con el evento seleccionado
+    id_evento = eventos.agregar(datetime.combine(fecha, hora), descripcion)
+    mostrar_eventos(fecha)
+    eventos_tree.selection_set(id_evento)
+    eventos_tree.see(id_evento)
     limpiar_campos() # Limpiar los campos después de agregar el evento
 
 def eliminar_evento():
-    """Elimina el evento seleccionado del TreeView."""
+    """Elimina el evento seleccionado de la agenda y del TreeView."""
+    if cargando():
+        return
     try:
-        seleccion = eventos_tree.selection()[0] # Obtener el ítem seleccionado
-        eventos_tree.delete(seleccion) # Eliminar el ítem seleccionado
+        seleccion = eventos_tree.selection()[0] # Obtener el ítem seleccionado (su iid es el ID del evento)
+        eventos.eliminar(int(seleccion)) # Eliminarlo de la agenda (y anotarlo en el archivo)
+        mostrar_eventos()
     except IndexError:
         # Si no hay ningún elemento seleccionado, mostrar advertencia
         messagebox.showwarning("Sin Selección", "Por favor selecciona un evento para eliminar.")
@@ -58,6 +142,8 @@ def eliminar_evento():
 def salir():
     """Cierra la aplicación con confirmación."""
     if messagebox.askyesno("Salir", "¿Seguro que deseas salir de la aplicación?"):
+        fondo.cerrar() # Cancelar la carga si aún no terminó
+        eventos.cerrar() # Forzar al disco los cambios anotados
         agenda.destroy() # Cerrar la ventana y terminar la aplicación
 
 def limpiar_campos():
@@ -68,6 +154,19 @@ def limpiar_campos():
 
 # ----- SECCIÓN DE INTERFAZ GRÁFICA -----
 
+# Frame para elegir qué intervalo de fechas se muestra
+vista_frame = Frame(agenda, bg="lightblue")
+vista_frame.pack(pady=(10, 0), fill="x", padx=10)
+Button(vista_frame, text="◀", command=lambda: mover_vista(-1), width=3).pack(side="left")
+Button(vista_frame, text="Hoy", command=lambda: mostrar_eventos(date.today())).pack(side="left", padx=5)
+Button(vista_frame, text="▶", command=lambda: mover_vista(1), width=3).pack(side="left")
+vista_combo = ttk.Combobox(vista_frame, values=("Semana", "Mes"), state="readonly", width=8)
+vista_combo.set("Semana")
+vista_combo.bind("<<ComboboxSelected>>", lambda event: mostrar_eventos())
+vista_combo.pack(side="left", padx=10)
+vista_label = Label(vista_frame, text="Cargando eventos...", bg="lightblue", font=("Aptos", 10, "italic"))
+vista_label.pack(side="left", padx=5)
+
 # Frame para el TreeView (lista de eventos)
 tree_frame = Frame(agenda)
 tree_frame.pack(pady=10, fill="both", expand=True, padx=10)
@@ -127,10 +226,14 @@ estilo_botones = {'font': ('Aptos', 10, 'bold'), 'bg': '#4CAF50', 'fg': 'white',
 # Botones de acción
 Button(button_frame, text="Agregar Evento", command=agregar_evento,**estilo_botones).grid(row=0, column=0, padx=10)
 Button(button_frame, text="Eliminar Evento", command=eliminar_evento,**estilo_botones).grid(row=0, column=1, padx=10)
+Button(button_frame, text="Ver Fecha", command=lambda: mostrar_eventos(fecha_entry.get_date()),**estilo_botones).grid(row=0, column=2, padx=10)
 Button(button_frame, text="Salir", command=salir, bg='#f44336', fg='white', font=('Arial', 10, 'bold'), width=15).grid(row=0, column=3, padx=10) # Color rojo para el botón de salir
 
 # ----- INICIO DE LA APLICACIÓN -----
 
+# Los eventos guardados se cargan cuando el bucle principal ya está en marcha
+agenda.after_idle(cargar_eventos)
+
 # Bucle principal de la aplicación con manejo de excepciones
 try:
     agenda.mainloop() # Iniciar el bucle de eventos de la aplicación
@@ -5,18 +5,30 @@ Este programa permite gestionar una lista de tareas con las siguientes funcional
 - Añadir nuevas tareas
 - Marcar tareas como completadas/pendientes
 - Eliminar tareas
+- Operaciones en bloque sobre varias tareas seleccionadas (Ctrl+clic, Mayús+clic, Ctrl+A),
+  eliminar las completadas y pegar muchas tareas a la vez (una por línea)
 - Interfaz intuitiva con botones y atajos de teclado
 
+Las tareas se guardan en un ModeloTareas y la tabla es una ListaVirtual, que solo crea en Tk
+las filas visibles: la lista sigue respondiendo con decenas de miles de tareas.
+
 Módulos utilizados:
 - tkinter: Para la interfaz gráfica
 - ttk: Para widgets temáticos
 - messagebox: Para mostrar mensajes al usuario
+- lista_virtual: Modelo de tareas y tabla con desplazamiento virtual (carpeta de la unidad)
 """
 
+import os
+import sys
 import tkinter as tk
 from tkinter import ttk
 from tkinter import messagebox
 
+# Módulos compartidos de la unidad (carpeta superior): lista_virtual
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from lista_virtual import COMPLETADA, PENDIENTE, ListaVirtual, ModeloTareas
+
 # ==============================================
 # FUNCIONES PRINCIPALES DE LA APLICACIÓN
 # ==============================================
@@ -31,8 +43,9 @@ def agregar_tarea(event=None):
     tarea = entrada_entry.get().strip()
 
     if tarea:
-        # Añadir a la tabla con estado inicial "Pendiente"
-        treeview.insert('', tk.END, values=(tarea,"Pendiente"), tags=('Pendiente',))
+        # Añadir al modelo con estado inicial "Pendiente" y mostrar la nueva fila
+        tareas.agregar(tarea)
+        treeview.ver(len(tareas) - 1)
 
         # Limpiar el campo de entrada
         entrada_entry.delete(0, tk.END)
@@ -42,35 +55,64 @@ def agregar_tarea(event=None):
     # Devolver el foco al campo de entrada
     entrada_entry.focus()
 
-def Cambiar_Estado():
-    """Marca la tarea seleccionada como completada"""
-    seleccion = treeview.selection()
+def pegar_tareas(event=None):
+    """
+    Agrega una tarea por cada línea del portapapeles, todas en una sola operación.
 
-    if seleccion:
-        item = seleccion[0]
-        valores = treeview.item(item, "values")
-        tarea = valores[0]
+    Parámetros:
+    event: Objeto de evento (opcional, para el enlace de teclas)
+    """
+    try:
+        texto = aplicacion.clipboard_get()
+    except tk.TclError:  # Portapapeles vacío o sin texto
+        texto = ""
+    lineas = [linea.strip() for linea in texto.splitlines() if linea.strip()]
+
+    if lineas:
+        tareas.agregar_varias(lineas)
+        treeview.ver(len(tareas) - 1)
+    else:
+        messagebox.showinfo("Información", "El portapapeles no tiene texto para agregar.")
+    return "break"
 
-        # Alternar entre estados
-        nuevo_estado = "Completada" if valores[1] == "Pendiente" else "Pendiente"
+def Cambiar_Estado():
+    """
+    Cambia el estado de las tareas seleccionadas: con una, al estado opuesto; con varias,
+    si alguna está pendiente todas pasan a completadas y si no, todas vuelven a pendientes.
+    """
+    seleccion = treeview.seleccion()
 
-        # Actualizar el Treeview
-        treeview.item(item, values=(tarea, nuevo_estado), tags=(nuevo_estado,))
+    if seleccion:
+        # Un solo cambio en el modelo; la tabla se redibuja una vez
+        hay_pendientes = any(tareas.obtener(id_tarea).estado == PENDIENTE for id_tarea in seleccion)
+        tareas.marcar(seleccion, COMPLETADA if hay_pendientes else PENDIENTE)
+        treeview.refrescar()
 
     else:
         messagebox.showinfo("Información", "Por favor selecciona una tarea.")
 
 def eliminar_tarea():
-    """Elimina la tarea seleccionada"""
-    seleccion = treeview.selection()
+    """Elimina las tareas seleccionadas, solo si se confirma"""
+    seleccion = treeview.seleccion()
 
     if seleccion:
-        confirmar= messagebox.askyesno("Confirmar", "¿Eliminar la tarea seleccionada?")
-        for item in seleccion:
-            treeview.delete(item)
+        confirmar= messagebox.askyesno("Confirmar", f"¿Eliminar {len(seleccion)} tarea(s) seleccionada(s)?")
+        if confirmar:
+            tareas.eliminar(seleccion)
+            treeview.deseleccionar(seleccion)
     else:
         messagebox.showinfo("Información", "Por favor selecciona una tarea.")
 
+def eliminar_completadas():
+    """Elimina todas las tareas completadas, solo si se confirma"""
+    completadas = tareas.ids_con_estado(COMPLETADA)
+
+    if not completadas:
+        messagebox.showinfo("Información", "No hay tareas completadas.")
+    elif messagebox.askyesno("Confirmar", f"¿Eliminar las {len(completadas)} tarea(s) completada(s)?"):
+        tareas.eliminar(completadas)
+        treeview.deseleccionar(completadas)
+
 def doble_clic_tarea(event):
     """Maneja el evento de doble clic en una tarea"""
     Cambiar_Estado()
@@ -109,8 +151,9 @@ entrada_entry = tk.Entry(marco_entrada, font=('Arial',11),width=40, relief="soli
 entrada_entry.pack(side="left", padx=10,fill="x", expand=True)
 entrada_entry.focus()
 
-# Tabla para mostrar las tareas
-treeview = ttk.Treeview(aplicacion, columns=('tarea', 'estado'), show='headings', style="Treeview")
+# Tabla para mostrar las tareas (solo las visibles; los datos están en el modelo)
+tareas = ModeloTareas()
+treeview = ListaVirtual(aplicacion, tareas, columnas=('tarea', 'estado'), style="Treeview")
 treeview.tag_configure("Pendiente", background="#fff3cd", foreground="#856404")
 treeview.tag_configure("Completada", background="#d4edda", foreground="#155724")
 
@@ -120,7 +163,7 @@ treeview.heading('estado', text='Estado')
 treeview.column('tarea', width=500)
 treeview.column('estado', width=100, anchor='center')
 
-# Posicionar la tabla y la barra de desplazamiento
+# Posicionar la tabla (trae su propia barra de desplazamiento)
 treeview.pack(pady=10, padx=20, fill=tk.BOTH, expand=True)
 
 # ==============================================
@@ -142,22 +185,27 @@ boton_completar.pack(side=tk.LEFT, padx=5)
 boton_eliminar = tk.Button(marco_botones, text="x Eliminar", bg="#f44336", fg='white', command=eliminar_tarea, font=("Arial", 10, "bold"), relief="flat", padx=15,)
 boton_eliminar.pack(side=tk.LEFT, padx=5)
 
+boton_completadas = tk.Button(marco_botones, text="🧹 Eliminar Completadas", bg="#FF9800", fg='white', command=eliminar_completadas, font=("Arial", 10, "bold"), relief="flat", padx=15,)
+boton_completadas.pack(side=tk.LEFT, padx=5)
+
+boton_pegar = tk.Button(marco_botones, text="📋 Pegar Tareas", bg="#9C27B0", fg='white', command=pegar_tareas, font=("Arial", 10, "bold"), relief="flat", padx=15,)
+boton_pegar.pack(side=tk.LEFT, padx=5)
+
 # ==============================================
 # CONFIGURACIÓN FINAL
 # ==============================================
 
-# Barra de desplazamiento
-scrollbar = ttk.Scrollbar(treeview, orient=tk.VERTICAL, command=treeview.yview)
-scrollbar.pack(side=tk.RIGHT, fill="y")
+# Evento de doble clic para marcar como completada (sobre las filas de la tabla)
+treeview.arbol.bind('<Double-1>', doble_clic_tarea)
 
-# Evento de doble clic para marcar como completada
-treeview.bind('<Double-1>', doble_clic_tarea)
+# Ctrl+V sobre la tabla: una tarea por cada línea del portapapeles
+treeview.arbol.bind('<Control-v>', pegar_tareas)
 
 # Vincular la tecla Enter al campo entrada
 entrada_entry.bind('<Return>', agregar_tarea)
 
 # Etiqueta de Instrucciones
-instruciones = tk.Label(aplicacion,text="Presiona Enter para añadir tareas o doble clic para cambiar estado.",font=("Arial", 9, "italic"),bg='#f0f0f0')
+instruciones = tk.Label(aplicacion,text="Presiona Enter para añadir tareas o doble clic para cambiar estado. Ctrl+clic o Mayús+clic para elegir varias.",font=("Arial", 9, "italic"),bg='#f0f0f0')
 instruciones.pack(pady=5)
 
 # Iniciar el bucle principal de la aplicación
@@ -5,17 +5,86 @@ Una aplicación GUI simple para gestionar tareas con las siguientes característ
 - Agregar nuevas tareas mediante un campo de texto
 - Marcar tareas como pendientes o completadas con indicadores visuales
 - Eliminar tareas seleccionadas
+- Operaciones en bloque: cambiar el estado o eliminar muchas tareas seleccionadas a la vez
+  (Ctrl+clic, Mayús+clic, Ctrl+A), eliminar las completadas y pegar una tarea por línea
 - Atajos de teclado para operaciones comunes
-Esta aplicación utiliza tkinter para la interfaz gráfica de usuario.
+- Las tareas se guardan en 'tareas.jsonl' y se recuperan al volver a abrir la aplicación
+  (el archivo se lee y se compacta en un hilo de fondo, con trabajo_en_fondo.py)
+Esta aplicación utiliza tkinter para la interfaz gráfica de usuario. Las tareas están en un
+AlmacenTareas (el modelo) y la tabla es una ListaVirtual (las dos en lista_virtual.py, en la
+carpeta de la unidad), que solo crea en Tk las filas visibles: los manejadores cambian el modelo y piden
+a la tabla que se redibuje, sin leer nunca los datos del widget.
 """
 
+import gc
+import os
+import sys
 import tkinter as tk
 from tkinter import ttk, messagebox
 
+# Módulos compartidos de la unidad (carpeta superior): lista_virtual y trabajo_en_fondo
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from lista_virtual import COMPLETADA, PENDIENTE, AlmacenTareas, ListaVirtual
+from trabajo_en_fondo import EjecutorFondo
+
 # ==============================================
 # FUNCIONES PRINCIPALES DE LA APLICACIÓN
 # ==============================================
 
+def cargando():
+    """Indica (y avisa) si las tareas guardadas aún se están cargando; mientras tanto no se modifican."""
+    if not tareas.cargado:
+        messagebox.showinfo("Información", "Espera a que terminen de cargarse las tareas.")
+    return not tareas.cargado
+
+def actualizar_resumen():
+    """Redibuja la tabla y muestra cuántas tareas hay en cada estado."""
+    lista_tareas.refrescar()
+    resumen.config(text=f"Pendientes: {tareas.contadores[PENDIENTE]:,}   "
+                        f"Completadas: {tareas.contadores[COMPLETADA]:,}")
+
+def cargar_tareas():
+    """
+    Carga las tareas guardadas sin congelar la ventana: el archivo se lee en un hilo de fondo y
+    cada bloque leído se aplica al modelo en el hilo de Tk, con la tabla redibujada después.
+    """
+    lineas = 0
+
+    def aplicar_bloque(eventos):
+        nonlocal lineas
+        tareas.aplicar_eventos(eventos)
+        lineas += len(eventos)
+        actualizar_resumen()
+        resumen.config(text=f"Cargando tareas... ({lineas:,} líneas leídas)")
+
+    def terminar(validos):
+        if tareas.terminar_carga(validos):
+            compactar_tareas()
+        actualizar_resumen()
+        # Decisión de la aplicación, una sola vez y con todo cargado: las tareas no forman ciclos,
+        # así que se sacan del recolector de ciclos, que si no las recorre enteras en cada
+        # recolección completa (~100 ms con 200.000, con la ventana parada). Afecta a todos los
+        # objetos que existen en este momento, por eso no lo hace el AlmacenTareas.
+        gc.freeze()
+
+    def fallar(error):
+        # Sin esto la aplicación quedaría sin poder modificarse, con solo parte de las tareas
+        apartado = tareas.abandonar_carga()
+        lista_tareas.deseleccionar()
+        actualizar_resumen()
+        copia = f"Se guardó como {apartado}." if apartado else "No se pudo apartar el archivo."
+        messagebox.showerror("Error", f"No se pudo leer {tareas.ruta}: {error}\n"
+                                      f"Se empieza con la lista vacía. {copia}")
+
+    fondo.enviar(lambda trabajo: tareas.leer_archivo(trabajo.progreso),
+                 al_progresar=aplicar_bloque, al_terminar=terminar, al_fallar=fallar)
+
+def compactar_tareas():
+    """Reescribe el archivo de tareas sin los cambios ya superados; la escritura va en un hilo de fondo."""
+    fondo.enviar(lambda trabajo, ruta, instantanea: AlmacenTareas.escribir_compactado(ruta, instantanea),
+                 tareas.ruta, tareas.iniciar_compactado(),
+                 al_terminar=tareas.instalar_compactado, al_fallar=lambda error: tareas.descartar_compactado())
+
 def agregar_tarea(event=None):
     """
     Agrega una nueva tarea a la lista de tareas.
@@ -25,37 +94,61 @@ def agregar_tarea(event=None):
     Parámetros:
         event: Parámetro opcional de evento para admitir enlaces a eventos de teclado
     """
+    if cargando():
+        return
     tarea = entrada.get().strip()  # Obtiene y limpia el texto del campo de entrada
 
     if tarea:  # Comprueba si el texto de la tarea no está vacío
 
-        # Agrega la tarea a la lista con estado 'Pendiente'
-        lista_tareas.insert('', 'end', values=(tarea, "Pendiente"), tags=('Pendiente',))
+        # Agrega la tarea al modelo con estado 'Pendiente' y desplaza la tabla hasta ella
+        tareas.agregar(tarea)
+        lista_tareas.ver(len(tareas) - 1)
+        actualizar_resumen()
         entrada.delete(0, tk.END)  # Limpia el campo de entrada después de agregar
     else:
         # Muestra una advertencia si se intenta agregar una tarea vacía
         messagebox.showwarning("Advertencia", "No puedes agregar una tarea vacía.")
 
+def pegar_tareas(event=None):
+    """
+    Agrega como tareas nuevas las líneas del portapapeles (las vacías se ignoran).
+    Todas se añaden al modelo en una sola operación y la tabla se redibuja una vez.
+    Parámetros:
+        event: Parámetro opcional de evento para admitir enlaces a eventos de teclado
+    """
+    if cargando():
+        return "break"
+    try:
+        texto = app.clipboard_get()
+    except tk.TclError:  # Portapapeles vacío o con algo que no es texto
+        texto = ""
+    lineas = [linea.strip() for linea in texto.splitlines() if linea.strip()]
+
+    if lineas:
+        tareas.agregar_varias(lineas)
+        lista_tareas.ver(len(tareas) - 1)
+        actualizar_resumen()
+    else:
+        messagebox.showinfo("Información", "El portapapeles no tiene texto para agregar.")
+    return "break"  # Ctrl+V en la lista: no sigue a otros manejadores
+
 def cambiar_estado(event=None):
     """
-    Alterna el estado de la tarea seleccionada entre 'Pendiente' y 'Completada'.
-    Esta función identifica la tarea seleccionada en la lista, obtiene su
-    estado actual y lo cambia al estado opuesto. La apariencia visual
-    cambia según la etiqueta asignada a la fila de la tarea.
+    Alterna el estado de las tareas seleccionadas entre 'Pendiente' y 'Completada'.
+    Con una sola tarea, la cambia al estado opuesto. Con varias, si alguna está pendiente
+    todas pasan a 'Completada'; si no, todas vuelven a 'Pendiente'. El cambio se aplica al
+    modelo de una vez y la tabla se redibuja una sola vez, con la etiqueta visual de cada fila.
     Parámetros:
         event: Parámetro opcional de evento para admitir enlaces a eventos de teclado
     """
-    seleccion = lista_tareas.selection()  # Obtiene los elementos seleccionados
+    if cargando():
+        return
+    seleccion = lista_tareas.seleccion()  # IDs de las tareas seleccionadas
 
     if seleccion:  # Comprueba si hay algún elemento seleccionado
-        item = seleccion[0]  # Obtiene el primer elemento seleccionado
-        tarea, estado = lista_tareas.item(item, "values")  # Obtiene los valores actuales
-
-        # Alterna el estado entre 'Pendiente' y 'Completada'
-        nuevo_estado = "Completada" if estado == "Pendiente" else "Pendiente"
-
-        # Actualiza el elemento con el nuevo estado y la etiqueta visual correspondiente
-        lista_tareas.item(item, values=(tarea, nuevo_estado), tags=(nuevo_estado,))
+        hay_pendientes = any(tareas.obtener(id_tarea).estado == PENDIENTE for id_tarea in seleccion)
+        tareas.marcar(seleccion, COMPLETADA if hay_pendientes else PENDIENTE)
+        actualizar_resumen()
     else:
         # Informa al usuario si no se ha seleccionado ninguna tarea
         messagebox.showinfo("Información", "Selecciona una tarea.")
@@ -68,23 +161,46 @@ def eliminar_tarea(event=None):
     Parámetros:
         event: Parámetro opcional de evento para admitir enlaces a eventos de teclado
     """
-    seleccion = lista_tareas.selection()  # Obtiene los elementos seleccionados
+    if cargando():
+        return
+    seleccion = lista_tareas.seleccion()  # IDs de las tareas seleccionadas
 
-    # Confirma la eliminación con un diálogo y procede si se confirma
-    if seleccion and messagebox.askyesno("Confirmación", "¿Eliminar tarea seleccionada?"):
-        for item in seleccion:
-            lista_tareas.delete(item)  # Elimina cada elemento seleccionado
-    else:
+    if not seleccion:
         messagebox.showinfo("Información", "Por favor selecciona una tarea.")
+    # Confirma la eliminación con un diálogo y procede si se confirma
+    elif messagebox.askyesno("Confirmación", f"¿Eliminar {len(seleccion):,} tarea(s) seleccionada(s)?"):
+        tareas.eliminar(seleccion)  # Elimina todas las seleccionadas en una sola pasada
+        lista_tareas.deseleccionar(seleccion)
+        actualizar_resumen()
+
+def eliminar_completadas(event=None):
+    """
+    Elimina, después de la confirmación, todas las tareas completadas en una sola operación.
+    Parámetros:
+        event: Parámetro opcional de evento para admitir enlaces a eventos de teclado
+    """
+    if cargando():
+        return
+    completadas = tareas.ids_con_estado(COMPLETADA)
+
+    if not completadas:
+        messagebox.showinfo("Información", "No hay tareas completadas.")
+    elif messagebox.askyesno("Confirmación", f"¿Eliminar las {len(completadas):,} tarea(s) completada(s)?"):
+        tareas.eliminar(completadas)
+        lista_tareas.deseleccionar(completadas)
+        actualizar_resumen()
 
 
 def salir(event=None):
     """
     Sale de la aplicación.
-    Esta función termina la aplicación llamando al metodo quit.
+    Esta función cancela los trabajos de fondo, cierra el archivo de tareas (los cambios ya
+    están escritos) y termina la aplicación llamando al metodo quit.
     Parámetros:
         event: Parámetro opcional de evento para admitir enlaces a eventos de teclado
     """
+    fondo.cerrar()
+    tareas.cerrar()
     app.quit()  # Cierra la aplicación
 
 # ==============================================
@@ -94,7 +210,8 @@ def salir(event=None):
 # Inicializa la ventana principal de la aplicación
 app = tk.Tk()
 app.title("Aplicación GUI")  # Establece el título de la ventana
-app.geometry("600x600")  # Define el tamaño inicial de la ventana
+app.geometry("800x600")  # Define el tamaño inicial de la ventana (cabe la fila de botones)
+fondo = EjecutorFondo(app)  # Hilos para leer y compactar el archivo de tareas
 
 # Configura atajos de teclado para funciones comunes
 app.bind("<Return>", agregar_tarea)  # Atajo: Enter para agregar tarea
@@ -123,9 +240,10 @@ entrada.focus()  # Coloca el cursor en el campo de entrada al iniciar
 tk.Button(app, text="➕ Agregar", command=agregar_tarea,
           bg="#4CAF50", fg="white", font=("Arial", 12)).pack(pady=10, padx=10)
 
-# Tabla para mostrar las tareas con columnas definidas
+# Tabla para mostrar las tareas con columnas definidas (solo las filas visibles)
 columnas = ("Tarea", "Estado")
-lista_tareas = ttk.Treeview(app, columns=columnas, show='headings', height=15)
+tareas = AlmacenTareas()  # Modelo con las tareas; el archivo se lee después, con cargar_tareas
+lista_tareas = ListaVirtual(app, tareas, columnas, filas_visibles=15)
 lista_tareas.heading("Tarea", text="Tarea")  # Título de la columna Tarea
 lista_tareas.heading("Estado", text="Estado")  # Título de la columna Estado
 
@@ -153,6 +271,12 @@ tk.Button(botones, text="Cambiar Estado (C)", command=cambiar_estado,
 tk.Button(botones, text="Eliminar (D)", command=eliminar_tarea,
           bg="#f44336", fg='white', font=("Arial", 10, "bold"), relief="flat", padx=15).pack(side=tk.LEFT, padx=5)
 
+# Botones para las operaciones en bloque
+tk.Button(botones, text="Eliminar Completadas", command=eliminar_completadas,
+          bg="#FF9800", fg='white', font=("Arial", 10, "bold"), relief="flat", padx=15).pack(side=tk.LEFT, padx=5)
+tk.Button(botones, text="Pegar Tareas", command=pegar_tareas,
+          bg="#9C27B0", fg='white', font=("Arial", 10, "bold"), relief="flat", padx=15).pack(side=tk.LEFT, padx=5)
+
 # Botón para salir de la aplicación
 tk.Button(botones, text="Salir (Esc)", command=salir,
           bg="#E0E0E0", font=("Arial", 10, "bold"), relief="flat", padx=15).pack(side=tk.LEFT, padx=5)
@@ -160,15 +284,23 @@ tk.Button(botones, text="Salir (Esc)", command=salir,
 # Coloca el marco de botones en la interfaz
 botones.pack(pady=10)
 
-# Barra de desplazamiento vertical para la lista de tareas
-scrollbar = ttk.Scrollbar(lista_tareas, orient=tk.VERTICAL, command=lista_tareas.yview)
-scrollbar.pack(side=tk.RIGHT, fill="y")
+# Resumen con la cantidad de tareas en cada estado (los contadores del AlmacenTareas)
+resumen = tk.Label(app, font=("Arial", 10, "italic"))
+resumen.pack(pady=5)
+
+# Configuración de eventos para interactuar con la lista de tareas (la barra de desplazamiento
+# ya viene con la ListaVirtual)
+lista_tareas.arbol.bind("<Double-1>", cambiar_estado)  # Doble clic para cambiar el estado
+lista_tareas.arbol.bind("<Control-v>", pegar_tareas)  # Ctrl+V en la lista: una tarea por línea
+app.protocol("WM_DELETE_WINDOW", salir)  # Cerrar la ventana también cierra el archivo de tareas
 
-# Configuración de eventos para interactuar con la lista de tareas
-lista_tareas.bind("<Double-1>", cambiar_estado)  # Doble clic para cambiar el estado
+# Las tareas guardadas se cargan cuando el bucle principal ya está en marcha
+app.after_idle(cargar_tareas)
 
 # Inicia el bucle principal de la aplicación
 try:
     app.mainloop()  # Mantiene la aplicación en ejecución hasta que se cierre
 except KeyboardInterrupt:
+    fondo.cerrar()
+    tareas.cerrar()
     print("La aplicación se cerró manualmente mediante Ctrl+C.")  # Manejo de cierre con Ctrl+C
\ No newline at end of file
@@ -0,0 +1,207 @@
+"""
+Eventos de la Agenda Personal (Semana 14), ordenados por fecha y guardados en un archivo
+
+La agenda ponía los eventos directamente en el Treeview como textos (fecha 'dd/mm/yyyy', hora,
+descripción): no se guardaban y no se podían ordenar ni buscar por fecha. Aquí cada evento tiene
+su momento como datetime y la agenda los mantiene en una lista de claves (momento, id) ordenada
+con bisect, así que:
+
+    - `entre(desde, hasta)` encuentra con dos búsquedas binarias (O(log n)) el tramo de eventos
+      de cualquier intervalo, y solo recorre los que devuelve; `semana` y `mes` lo usan para los
+      intervalos habituales. La ventana muestra solo los eventos de la semana o el mes elegido.
+    - `agregar` y `eliminar` encuentran la posición con bisect (la inserción en la lista mueve
+      las claves posteriores, un memmove que con cientos de miles de eventos sigue siendo de
+      microsegundos).
+
+El archivo es JSON Lines y solo se le añaden líneas: {"evento": "alta", "id", "momento",
+"descripcion"} y {"evento": "baja", "id"}. `cargar()` lo lee entero y ordena las claves una sola
+vez; no toca widgets, así que la aplicación lo ejecuta en un hilo de fondo (trabajo_en_fondo.py)
+y la ventana aparece enseguida aunque la agenda tenga años de eventos.
+"""
+
+import json
+import os
+import time
+from bisect import bisect_left, insort
+from datetime import datetime, timedelta
+from operator import itemgetter
+
+ARCHIVO_EVENTOS = "agenda.jsonl"
+
+
+class Evento:
+    """Un evento de la agenda."""
+    __slots__ = ('id', 'momento', 'descripcion')
+
+    def __init__(self, id_evento, momento, descripcion):
+        self.id = id_evento
+        self.momento = momento
+        self.descripcion = descripcion
+
+
+class AgendaEventos:
+    """
+    Eventos por ID y ordenados por momento, con su archivo.
+    Parámetros:
+        ruta (str): Archivo de los eventos.
+    """
+    def __init__(self, ruta=ARCHIVO_EVENTOS):
+        self.ruta = ruta
+        self.cargado = False
+        self.lineas_ignoradas = 0  # Líneas completas del archivo que no se pudieron leer
+        self._eventos = {}    # ID -> Evento
+        self._claves = []     # (momento, ID), ordenadas
+        self._siguiente_id = 1
+        self._lineas = 0      # Líneas del archivo (para decidir si compactarlo)
+        self._archivo = None  # Abierto para añadir, desde el primer cambio
+
+    def __len__(self):
+        return len(self._claves)
+
+    def __contains__(self, id_evento):
+        return id_evento in self._eventos
+
+    def obtener(self, id_evento):
+        """El Evento con ese ID, o None si no existe."""
+        return self._eventos.get(id_evento)
+
+    def entre(self, desde, hasta):
+        """Eventos con desde <= momento < hasta, en orden cronológico."""
+        inicio = bisect_left(self._claves, (desde,))
+        fin = bisect_left(self._claves, (hasta,), inicio)
+        return [self._eventos[id_evento] for _, id_evento in self._claves[inicio:fin]]
+
+    @staticmethod
+    def semana_de(fecha):
+        """Intervalo (lunes 00:00, lunes siguiente 00:00) de la semana de `fecha` (date o datetime)."""
+        lunes = datetime(fecha.year, fecha.month, fecha.day) - timedelta(days=fecha.weekday())
+        return lunes, lunes + timedelta(days=7)
+
+    @staticmethod
+    def mes_de(fecha):
+        """Intervalo (día 1 00:00, día 1 del mes siguiente 00:00) del mes de `fecha`."""
+        primero = datetime(fecha.year, fecha.month, 1)
+        return primero, (primero + timedelta(days=32)).replace(day=1)
+
+    def semana(self, fecha):
+        """Eventos de la semana (de lunes a domingo) de `fecha`."""
+        return self.entre(*self.semana_de(fecha))
+
+    def mes(self, fecha):
+        """Eventos del mes de `fecha`."""
+        return self.entre(*self.mes_de(fecha))
+
+    def _anotar(self, evento):
+        """Añade un cambio al final del archivo."""
+        if self._archivo is None:
+            self._archivo = open(self.ruta, 'a', encoding='utf-8')
+        self._archivo.write(json.dumps(evento, ensure_ascii=False) + '\n')
+        self._archivo.flush()
+        self._lineas += 1
+
+    def agregar(self, momento, descripcion):
+        """Añade un evento y devuelve su ID."""
+        evento = Evento(self._siguiente_id, momento, descripcion)
+        self._siguiente_id += 1
+        self._anotar({'evento': 'alta', 'id': evento.id, 'momento': momento.isoformat(),
+                      'descripcion': descripcion})
+        self._eventos[evento.id] = evento
+        insort(self._claves, (momento, evento.id))
+        return evento.id
+
+    def eliminar(self, id_evento):
+        """Elimina el evento con ese ID. Devuelve False si no existía."""
+        evento = self._eventos.get(id_evento)
+        if evento is None:
+            return False
+        self._anotar({'evento': 'baja', 'id': id_evento})
+        del self._eventos[id_evento]
+        del self._claves[bisect_left(self._claves, (evento.momento, id_evento))]
+        return True
+
+    def cargar(self):
+        """
+        Lee el archivo y arma los índices (las claves se ordenan una sola vez, al final). Una última
+        línea incompleta (el programa se cerró mientras la escribía) se descarta del archivo; las
+        líneas completas que no se entienden (por ejemplo, editadas a mano) se saltan y se cuentan
+        en `lineas_ignoradas`. Si el archivo tiene muchas más líneas que eventos, se reescribe
+        solo con las altas actuales.
+        Mientras `cargado` sea False nadie más debe usar la agenda, así que se puede ejecutar en
+        un hilo de fondo.
+        """
+        eventos = {}
+        leidos = lineas = ignoradas = 0
+        try:
+            with open(self.ruta, 'rb') as archivo:
+                for linea in archivo:
+                    if not linea.endswith(b'\n'):
+                        break  # Solo la última línea puede no terminar en salto de línea
+                    leidos += len(linea)
+                    lineas += 1
+                    try:
+                        dato = json.loads(linea)
+                        if dato['evento'] == 'alta':
+                            if not isinstance(dato['id'], int):
+                                raise ValueError(f"ID no válido: {dato['id']!r}")
+                            eventos[dato['id']] = Evento(dato['id'], datetime.fromisoformat(dato['momento']),
+                                                         dato['descripcion'])
+                        elif dato['evento'] == 'baja':
+                            eventos.pop(dato['id'], None)
+                    except (ValueError, KeyError, TypeError):
+                        ignoradas += 1
+            if leidos < os.path.getsize(self.ruta):
+                os.truncate(self.ruta, leidos)
+        except FileNotFoundError:
+            pass
+        self._eventos = eventos
+        # Los IDs crecen con cada alta, así que en el diccionario ya están en orden: basta ordenar
+        # (de forma estable) por momento, sin comparar tuplas, y tarda menos de la mitad
+        self._claves = sorted(((evento.momento, evento.id) for evento in eventos.values()), key=itemgetter(0))
+        self._siguiente_id = max(eventos, default=0) + 1
+        self._lineas = lineas
+        self.lineas_ignoradas = ignoradas
+        if self._lineas > 2 * len(self) + 1000:
+            self.compactar()
+        self.cargado = True
+
+    def abandonar_carga(self):
+        """
+        Tras un error al leer el archivo: empieza con la agenda vacía y permite los cambios. El
+        archivo que no se pudo leer se aparta como '<ruta>.<fecha>.ilegible', para no añadirle
+        eventos con IDs que ya usa ni perderlo.
+        Retorno:
+            str: Nueva ruta del archivo apartado, o None si no existía o no se pudo renombrar.
+        """
+        self.cerrar()
+        self._eventos = {}
+        self._claves = []
+        self._siguiente_id = 1
+        self._lineas = 0
+        self.cargado = True
+        apartado = f"{self.ruta}.{time.strftime('%Y%m%d-%H%M%S')}.ilegible"
+        try:
+            os.replace(self.ruta, apartado)
+        except OSError:
+            return None
+        return apartado
+
+    def compactar(self):
+        """Reescribe el archivo con un alta por cada evento actual, en orden cronológico (de forma atómica)."""
+        self.cerrar()
+        temporal = self.ruta + '.tmp'
+        with open(temporal, 'w', encoding='utf-8') as archivo:
+            for momento, id_evento in self._claves:
+                archivo.write(json.dumps({'evento': 'alta', 'id': id_evento, 'momento': momento.isoformat(),
+                                          'descripcion': self._eventos[id_evento].descripcion},
+                                         ensure_ascii=False) + '\n')
+            archivo.flush()
+            os.fsync(archivo.fileno())
+        os.replace(temporal, self.ruta)
+        self._lineas = len(self)
+
+    def cerrar(self):
+        """Fuerza al disco los cambios anotados y cierra el archivo."""
+        if self._archivo is not None:
+            os.fsync(self._archivo.fileno())
+            self._archivo.close()
+            self._archivo = None
@@ -0,0 +1,85 @@
+"""
+Benchmark de los eventos de la agenda (agenda_eventos.py)
+
+Genera una agenda con 200.000 eventos repartidos en diez años y mide:
+    - cargar: leer el archivo y armar los índices (lo que la Semana 14 hace en un hilo de fondo),
+    - semana: los eventos de 1.000 semanas al azar, con AgendaEventos.entre (búsqueda binaria)
+      y recorriendo todos los eventos y ordenando los de la semana, como haría falta con una
+      lista sin orden,
+    - agregar y eliminar: 1.000 eventos en momentos al azar, con el archivo incluido.
+
+Uso:
+    python benchmark_agenda.py            # 200.000 eventos
+    python benchmark_agenda.py 50000      # otra cantidad
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from agenda_eventos import AgendaEventos
+
+OPERACIONES = 1_000
+INICIO = datetime(2020, 1, 1)
+DIAS = 3650
+
+
+def medir(funcion):
+    """Segundos que tarda `funcion()`."""
+    inicio = time.perf_counter()
+    funcion()
+    return time.perf_counter() - inicio
+
+
+def main():
+    cantidad = next((int(arg) for arg in sys.argv[1:] if arg.isdigit()), 200_000)
+    azar = random.Random(14)
+    momentos = [INICIO + timedelta(minutes=azar.randrange(DIAS * 24 * 60)) for _ in range(cantidad)]
+    fechas = [(INICIO + timedelta(days=azar.randrange(DIAS))).date() for _ in range(OPERACIONES)]
+    nuevos = [INICIO + timedelta(minutes=azar.randrange(DIAS * 24 * 60)) for _ in range(OPERACIONES)]
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta = os.path.join(carpeta, "agenda.jsonl")
+        agenda = AgendaEventos(ruta)
+        agenda.cargar()
+        for numero, momento in enumerate(momentos):
+            agenda.agregar(momento, f"Evento {numero}")
+        agenda.cerrar()
+
+        agenda = AgendaEventos(ruta)
+        t_cargar = medir(agenda.cargar)
+        todos = list(agenda._eventos.values())
+
+        def por_indice():
+            for fecha in fechas:
+                agenda.semana(fecha)
+
+        def recorriendo():
+            for fecha in fechas:
+                desde, hasta = AgendaEventos.semana_de(fecha)
+                sorted((evento for evento in todos if desde <= evento.momento < hasta),
+                       key=lambda evento: evento.momento)
+
+        ids = []
+        t_indice, t_recorrer = medir(por_indice), medir(recorriendo)
+        t_agregar = medir(lambda: ids.extend(agenda.agregar(momento, "Nuevo") for momento in nuevos))
+        t_eliminar = medir(lambda: [agenda.eliminar(id_evento) for id_evento in ids])
+        tamaño = os.path.getsize(ruta)
+        agenda.cerrar()
+
+    print(f"{cantidad:,} eventos en {DIAS // 365} años ({tamaño / 1e6:.1f} MB)")
+    print(f"{'Operación':<28} | {'Total (s)':>9} | {'por operación (µs)':>18}")
+    print("-" * 62)
+    for nombre, segundos, veces in (("cargar", t_cargar, 1),
+                                    (f"semana, índice ({OPERACIONES:,})", t_indice, OPERACIONES),
+                                    (f"semana, recorriendo ({OPERACIONES:,})", t_recorrer, OPERACIONES),
+                                    (f"agregar ({OPERACIONES:,})", t_agregar, OPERACIONES),
+                                    (f"eliminar ({OPERACIONES:,})", t_eliminar, OPERACIONES)):
+        print(f"{nombre:<28} | {segundos:>9.3f} | {segundos / veces * 1e6:>18.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+Benchmark de la lista de tareas con desplazamiento virtual (lista_virtual.py)
+
+Compara, con 100.000 tareas, la tabla de antes (un elemento del ttk.Treeview por tarea) con
+ModeloTareas + ListaVirtual en las operaciones de las listas de las Semanas 15 y 16:
+    - insertar: añadir todas las tareas y dibujar la tabla,
+    - alternar: cambiar el estado de 1.000 tareas al azar, redibujando después de cada una (el
+      Treeview lee el estado del propio widget, como hacían los manejadores),
+    - desplazar: 1.000 saltos a posiciones al azar, con el redibujado incluido,
+    - completar y eliminar en bloque: 10.000 tareas seleccionadas a la vez (el Treeview, como
+      hacían los manejadores, fila por fila; el modelo, en una operación y un solo redibujado).
+Para crear la ventana de Tk hace falta una pantalla; en un servidor se puede usar una virtual:
+`xvfb-run python benchmark_lista_virtual.py`. Si no hay ninguna se mide solo el modelo (la
+parte en Python de ListaVirtual): las mismas operaciones, y en cada salto se arman las filas
+visibles.
+
+Uso:
+    python benchmark_lista_virtual.py           # 100.000 tareas
+    python benchmark_lista_virtual.py 20000     # otra cantidad
+"""
+
+import random
+import sys
+import time
+import tkinter as tk
+from tkinter import ttk
+
+from lista_virtual import COMPLETADA, PENDIENTE, ListaVirtual, ModeloTareas
+
+FILAS = 25         # Filas visibles de la tabla
+OPERACIONES = 1_000
+EN_BLOQUE = 10_000  # Tareas seleccionadas para las operaciones en bloque
+
+
+def medir(funcion):
+    """Segundos que tarda `funcion()`."""
+    inicio = time.perf_counter()
+    funcion()
+    return time.perf_counter() - inicio
+
+
+def medir_treeview(raiz, cantidad, posiciones, fracciones, bloque):
+    """La tabla de antes: un elemento del Treeview por tarea."""
+    arbol = ttk.Treeview(raiz, columns=('tarea', 'estado'), show='headings', height=FILAS)
+    arbol.tag_configure(PENDIENTE, background="#fff3cd", foreground="#856404")
+    arbol.tag_configure(COMPLETADA, background="#d4edda", foreground="#155724")
+    arbol.pack(fill=tk.BOTH, expand=True)
+
+    def insertar():
+        for i in range(cantidad):
+            arbol.insert('', tk.END, values=(f"Tarea {i}", PENDIENTE), tags=(PENDIENTE,))
+        raiz.update_idletasks()
+
+    def alternar():
+        elementos = arbol.get_children()
+        for i in posiciones:
+            tarea, estado = arbol.item(elementos[i], "values")
+            nuevo_estado = COMPLETADA if estado == PENDIENTE else PENDIENTE
+            arbol.item(elementos[i], values=(tarea, nuevo_estado), tags=(nuevo_estado,))
+            raiz.update_idletasks()
+
+    def desplazar():
+        for fraccion in fracciones:
+            arbol.yview_moveto(fraccion)
+            raiz.update_idletasks()
+
+    def completar_bloque():
+        elementos = arbol.get_children()
+        for i in bloque:
+            tarea, _ = arbol.item(elementos[i], "values")
+            arbol.item(elementos[i], values=(tarea, COMPLETADA), tags=(COMPLETADA,))
+        raiz.update_idletasks()
+
+    def eliminar_bloque():
+        elementos = arbol.get_children()
+        for i in bloque:
+            arbol.delete(elementos[i])
+        raiz.update_idletasks()
+
+    tiempos = (medir(insertar), medir(alternar), medir(desplazar),
+               medir(completar_bloque), medir(eliminar_bloque))
+    arbol.destroy()
+    return tiempos
+
+
+def medir_lista_virtual(raiz, cantidad, posiciones, fracciones, bloque):
+    """ModeloTareas + ListaVirtual: el Treeview solo tiene las filas visibles."""
+    modelo = ModeloTareas()
+    lista = ListaVirtual(raiz, modelo, ('tarea', 'estado'), filas_visibles=FILAS)
+    lista.tag_configure(PENDIENTE, background="#fff3cd", foreground="#856404")
+    lista.tag_configure(COMPLETADA, background="#d4edda", foreground="#155724")
+    lista.pack(fill=tk.BOTH, expand=True)
+
+    def insertar():
+        for i in range(cantidad):
+            modelo.agregar(f"Tarea {i}")
+        lista.dibujar()
+        raiz.update_idletasks()
+
+    def alternar():
+        for i in posiciones:
+            modelo.alternar(modelo.fila(i)[0])
+            lista.dibujar()
+            raiz.update_idletasks()
+
+    def desplazar():
+        for fraccion in fracciones:
+            lista.yview('moveto', fraccion)
+            lista.dibujar()
+            raiz.update_idletasks()
+
+    ids = [modelo.fila(i)[0] for i in bloque]
+
+    def completar_bloque():
+        modelo.marcar(ids, COMPLETADA)
+        lista.dibujar()
+        raiz.update_idletasks()
+
+    def eliminar_bloque():
+        modelo.eliminar(ids)
+        lista.deseleccionar(ids)
+        lista.dibujar()
+        raiz.update_idletasks()
+
+    tiempos = (medir(insertar), medir(alternar), medir(desplazar),
+               medir(completar_bloque), medir(eliminar_bloque))
+    lista.destroy()
+    return tiempos
+
+
+def medir_modelo(cantidad, posiciones, fracciones, bloque):
+    """Sin Tk: el trabajo en Python de cada operación de ListaVirtual."""
+    modelo = ModeloTareas()
+
+    def insertar():
+        for i in range(cantidad):
+            modelo.agregar(f"Tarea {i}")
+
+    def alternar():
+        for i in posiciones:
+            modelo.alternar(modelo.fila(i)[0])
+
+    def desplazar():
+        for fraccion in fracciones:
+            primero = min(int(fraccion * len(modelo)), len(modelo) - FILAS)
+            [modelo.fila(i) for i in range(primero, primero + FILAS)]
+
+    def completar_bloque():
+        modelo.marcar([modelo.fila(i)[0] for i in bloque], COMPLETADA)
+
+    def eliminar_bloque():
+        modelo.eliminar(modelo.ids_con_estado(COMPLETADA))
+
+    return (medir(insertar), medir(alternar), medir(desplazar),
+            medir(completar_bloque), medir(eliminar_bloque))
+
+
+def main():
+    cantidad = next((int(arg) for arg in sys.argv[1:] if arg.isdigit()), 100_000)
+    azar = random.Random(13)
+    posiciones = [azar.randrange(cantidad) for _ in range(OPERACIONES)]
+    fracciones = [azar.random() for _ in range(OPERACIONES)]
+    # Posiciones distintas, de mayor a menor: al eliminar fila por fila no cambian las que faltan
+    bloque = sorted(azar.sample(range(cantidad), min(EN_BLOQUE, cantidad)), reverse=True)
+    operaciones = ("insertar", f"alternar ({OPERACIONES:,})", f"desplazar ({OPERACIONES:,})",
+                   f"completar ({len(bloque):,})", f"eliminar ({len(bloque):,})")
+
+    try:
+        raiz = tk.Tk()
+    except tk.TclError:
+        print(f"{cantidad:,} tareas. No hay pantalla: se mide solo el modelo "
+              f"(con Tk: xvfb-run python benchmark_lista_virtual.py)")
+        print(f"{'Operación':<20} | {'Modelo (s)':>10} | {'por tarea (µs)':>14}")
+        print("-" * 51)
+        for nombre, segundos, veces in zip(operaciones, medir_modelo(cantidad, posiciones, fracciones, bloque),
+                                           (cantidad, OPERACIONES, OPERACIONES, len(bloque), len(bloque))):
+            print(f"{nombre:<20} | {segundos:>10.3f} | {segundos / veces * 1e6:>14.1f}")
+        return
+
+    raiz.geometry("600x600")
+    ttk.Style(raiz).theme_use("clam")
+    raiz.update()
+    print(f"{cantidad:,} tareas, {FILAS} filas visibles")
+    print(f"{'Operación':<20} | {'Treeview (s)':>12} | {'ListaVirtual (s)':>16} | {'Mejora':>7}")
+    print("-" * 65)
+    antes = medir_treeview(raiz, cantidad, posiciones, fracciones, bloque)
+    ahora = medir_lista_virtual(raiz, cantidad, posiciones, fracciones, bloque)
+    for nombre, t_antes, t_ahora in zip(operaciones, antes, ahora):
+        print(f"{nombre:<20} | {t_antes:>12.3f} | {t_ahora:>16.3f} | {t_antes / t_ahora:>6.1f}x")
+    raiz.destroy()
+
+
+if __name__ == "__main__":
+    main()
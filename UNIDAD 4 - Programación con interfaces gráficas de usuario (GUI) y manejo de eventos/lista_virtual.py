@@ -0,0 +1,565 @@
+"""
+Lista con desplazamiento virtual para las listas de tareas de las Semanas 15 y 16
+
+Un ttk.Treeview crea un elemento de Tcl por cada fila insertada. Con decenas de miles de tareas,
+insertar, cambiar un estado o desplazarse se vuelve lento. Aquí las tareas viven en un modelo de
+Python y el Treeview solo tiene las filas que caben en pantalla: al desplazarse se reutilizan
+esas mismas filas con los valores de las tareas visibles.
+
+    - ModeloTareas: las tareas en orden de alta, con acceso por posición y por ID.
+    - AlmacenTareas: el ModeloTareas de la Semana 16, con contadores por estado y guardado en
+      un archivo JSON Lines al que solo se añaden líneas. Está aquí y no en la tarea para que
+      medir_latencia_ui.py mida la misma carga que usa la aplicación.
+    - ListaVirtual: el Treeview con su barra de desplazamiento. Muestra cualquier modelo que
+      tenga len() y fila(indice) -> (clave, valores, etiquetas). Las etiquetas se configuran
+      igual que en un Treeview (tag_configure), así que los colores por estado se mantienen.
+      La selección se guarda por clave, de modo que sobrevive al desplazamiento.
+
+Después de cambiar el modelo se llama a `refrescar()`: todos los cambios hechos antes de que
+Tk vuelva a estar inactivo se dibujan de una sola vez.
+"""
+
+import json
+import os
+import time
+import tkinter as tk
+from tkinter import ttk
+
+PENDIENTE = "Pendiente"
+COMPLETADA = "Completada"
+ARCHIVO_TAREAS = "tareas.jsonl"
+LINEAS_POR_BLOQUE = 1_000  # Líneas del archivo que se aplican juntas en el hilo de Tk al cargar (~8 ms)
+
+
+class Tarea:
+    """Una tarea de la lista."""
+    __slots__ = ('id', 'texto', 'estado')
+
+    def __init__(self, id_tarea, texto, estado=PENDIENTE):
+        self.id = id_tarea
+        self.texto = texto
+        self.estado = estado
+
+
+class ModeloTareas:
+    """
+    Tareas en orden de alta: un diccionario por ID y una lista de IDs para llegar a la fila
+    de cualquier posición sin recorrer las anteriores.
+    """
+    def __init__(self):
+        self._tareas = {}   # ID -> Tarea
+        self._orden = []    # IDs en orden de alta
+        self._siguiente_id = 1
+
+    def __len__(self):
+        return len(self._orden)
+
+    def __contains__(self, id_tarea):
+        return id_tarea in self._tareas
+
+    def agregar(self, texto, estado=PENDIENTE, id_tarea=None):
+        """Añade una tarea al final y devuelve su ID (el siguiente libre, si no se indica uno)."""
+        tarea = Tarea(self._siguiente_id if id_tarea is None else id_tarea, texto, estado)
+        self._siguiente_id = max(self._siguiente_id, tarea.id + 1)
+        self._tareas[tarea.id] = tarea
+        self._orden.append(tarea.id)
+        return tarea.id
+
+    def agregar_varias(self, textos, estado=PENDIENTE):
+        """Añade varias tareas al final, en ese orden, y devuelve sus IDs."""
+        return [self.agregar(texto, estado) for texto in textos]
+
+    def obtener(self, id_tarea):
+        """Devuelve la tarea con ese ID, o None."""
+        return self._tareas.get(id_tarea)
+
+    def alternar(self, id_tarea):
+        """Cambia la tarea de Pendiente a Completada o al revés y devuelve el nuevo estado."""
+        tarea = self._tareas[id_tarea]
+        tarea.estado = COMPLETADA if tarea.estado == PENDIENTE else PENDIENTE
+        return tarea.estado
+
+    def marcar(self, ids, estado):
+        """Pone en `estado` las tareas con esos IDs y devuelve cuántas cambiaron."""
+        cambiadas = [tarea for tarea in map(self._tareas.get, ids) if tarea is not None and tarea.estado != estado]
+        for tarea in cambiadas:
+            tarea.estado = estado
+        return len(cambiadas)
+
+    def ids_con_estado(self, estado):
+        """IDs de las tareas en `estado`, en orden de alta."""
+        return [id_tarea for id_tarea in self._orden if self._tareas[id_tarea].estado == estado]
+
+    def instantanea(self):
+        """
+        Las tareas en orden (los mismos objetos Tarea), copiadas sin recorrerlas en Python, para
+        guardarlas desde un hilo de fondo. El texto de una tarea no cambia; su estado puede cambiar
+        después de la copia.
+        """
+        return list(map(self._tareas.__getitem__, self._orden))
+
+    def eliminar(self, ids):
+        """Elimina las tareas con esos IDs (los que no existan se ignoran) y devuelve cuántas eran."""
+        quitados = {id_tarea for id_tarea in ids if self._tareas.pop(id_tarea, None) is not None}
+        if len(quitados) == 1:
+            self._orden.remove(next(iter(quitados)))
+        elif quitados:
+            # Una sola pasada por la lista, cualquiera sea la cantidad de tareas eliminadas
+            self._orden = [id_tarea for id_tarea in self._orden if id_tarea not in quitados]
+        return len(quitados)
+
+    def fila(self, indice):
+        """(ID, valores, etiquetas) de la tarea en la posición `indice`, como los muestra ListaVirtual."""
+        tarea = self._tareas[self._orden[indice]]
+        return tarea.id, (tarea.texto, tarea.estado), (tarea.estado,)
+
+
+class AlmacenTareas(ModeloTareas):
+    """
+    Tareas de la aplicación con su archivo. Al ModeloTareas (búsqueda por ID y acceso por
+    posición) le añade:
+        - contadores: cantidad de tareas en cada estado, sin recorrer la lista,
+        - un archivo JSON Lines al que solo se añaden líneas: una por alta ({"evento": "alta",
+          "id", "texto", "estado"}) y una por cambio de estado ({"evento": "estado", "id" o
+          "ids", "estado"}) o baja ({"evento": "baja", "ids"}), aunque afecte a muchas tareas.
+          Las operaciones en bloque escriben sus líneas de una vez.
+    El archivo no se lee al crear el almacén. La aplicación lo lee en un hilo de fondo
+    (`leer_archivo`) y aplica los bloques leídos en el hilo de Tk (`aplicar_eventos`), para que la
+    ventana aparezca enseguida y siga respondiendo; `cargar()` hace todo de una vez. Si al terminar
+    el archivo tiene muchas más líneas que tareas, se reescribe solo con las altas de las tareas
+    actuales, también en un hilo de fondo (iniciar_compactado, escribir_compactado e
+    instalar_compactado) o de una vez con `compactar()`.
+    Parámetros:
+        ruta (str): Archivo de las tareas.
+    """
+    def __init__(self, ruta=ARCHIVO_TAREAS):
+        super().__init__()
+        self.ruta = ruta
+        self.contadores = {PENDIENTE: 0, COMPLETADA: 0}
+        self.cargado = False
+        self._lineas = 0      # Líneas del archivo (para decidir si compactarlo)
+        self._archivo = None  # Abierto para añadir, desde el primer cambio
+        self._compactando = None  # Mientras se compacta: líneas anotadas después de la copia
+        self._compactadas = 0     # Tareas copiadas en el archivo compactado
+
+    def _aplicar(self, evento):
+        """
+        Incorpora un evento a memoria (al cargar el archivo o al hacer un cambio). El evento se
+        valida antes de cambiar nada: uno con un formato o un estado desconocido lanza ValueError,
+        KeyError o TypeError y deja las tareas y los contadores como estaban.
+        """
+        if evento['evento'] == 'alta':
+            id_tarea, texto, estado = evento['id'], evento['texto'], evento['estado']
+            if estado not in self.contadores:
+                raise ValueError(f"Estado desconocido: {estado!r}")
+            if not isinstance(id_tarea, int) or not isinstance(texto, str) or id_tarea in self:
+                raise ValueError(f"Alta no válida: {evento!r}")
+            ModeloTareas.agregar(self, texto, estado, id_tarea)
+            self.contadores[estado] += 1
+        elif evento['evento'] == 'estado':
+            estado = evento['estado']
+            if estado not in self.contadores:
+                raise ValueError(f"Estado desconocido: {estado!r}")
+            for id_tarea in evento['ids'] if 'ids' in evento else [evento['id']]:
+                tarea = self.obtener(id_tarea)
+                if tarea is not None:
+                    self.contadores[tarea.estado] -= 1
+                    tarea.estado = estado
+                    self.contadores[estado] += 1
+        elif evento['evento'] == 'baja':
+            ids = [id_tarea for id_tarea in evento['ids'] if id_tarea in self]
+            for id_tarea in ids:
+                self.contadores[self.obtener(id_tarea).estado] -= 1
+            ModeloTareas.eliminar(self, ids)
+
+    def _anotar(self, *eventos):
+        """Aplica uno o varios cambios y los añade al final del archivo con una sola escritura."""
+        for evento in eventos:
+            self._aplicar(evento)
+        if self._archivo is None:
+            self._archivo = open(self.ruta, 'a', encoding='utf-8')
+        lineas = ''.join(json.dumps(evento, ensure_ascii=False) + '\n' for evento in eventos)
+        self._archivo.write(lineas)
+        self._archivo.flush()
+        self._lineas += len(eventos)
+        if self._compactando is not None:  # El archivo compactado aún no tiene estos cambios
+            self._compactando.append((lineas, len(eventos)))
+
+    def bloques_del_archivo(self, bloque=LINEAS_POR_BLOQUE):
+        """
+        Genera los eventos del archivo en listas de hasta `bloque`, cada una con los bytes válidos
+        leídos hasta ella: (eventos, validos). No toca el modelo. Una última línea sin salto de
+        línea (el programa se cerró mientras la escribía) queda fuera de `validos`; las líneas
+        completas que no son JSON (o UTF-8) se saltan, como `aplicar_eventos` salta los eventos
+        sin el formato.
+        """
+        leidos = entregados = 0
+        eventos = []
+        try:
+            with open(self.ruta, 'rb') as archivo:
+                for linea in archivo:
+                    if not linea.endswith(b'\n'):
+                        break  # Solo la última línea puede no terminar en salto de línea
+                    leidos += len(linea)
+                    try:
+                        eventos.append(json.loads(linea))
+                    except ValueError:  # También UnicodeDecodeError
+                        continue
+                    if len(eventos) == bloque:
+                        yield eventos, leidos
+                        eventos = []
+                        entregados = leidos
+        except FileNotFoundError:
+            pass
+        if eventos or leidos > entregados:  # Aunque sea vacía: las líneas saltadas al final son válidas
+            yield eventos, leidos
+
+    def leer_archivo(self, entregar, bloque=LINEAS_POR_BLOQUE):
+        """
+        Lee el archivo y pasa sus eventos a `entregar` en listas de hasta `bloque`. No toca el
+        modelo, así que se puede ejecutar en un hilo de fondo; los eventos se incorporan después
+        con `aplicar_eventos`.
+        Retorno:
+            int: Bytes válidos del archivo, para `terminar_carga`.
+        """
+        validos = 0
+        for eventos, validos in self.bloques_del_archivo(bloque):
+            entregar(eventos)
+        return validos
+
+    def aplicar_eventos(self, eventos):
+        """Incorpora a memoria eventos leídos del archivo (los que no tienen el formato se ignoran)."""
+        for evento in eventos:
+            try:
+                self._aplicar(evento)
+            except (ValueError, KeyError, TypeError):
+                pass
+        self._lineas += len(eventos)
+
+    def terminar_carga(self, validos):
+        """
+        Descarta del archivo lo que sigue a los `validos` bytes leídos y permite los cambios.
+        Retorno:
+            bool: Si conviene compactar el archivo (tiene muchas más líneas que tareas).
+        """
+        if os.path.exists(self.ruta) and validos < os.path.getsize(self.ruta):
+            os.truncate(self.ruta, validos)
+        self.cargado = True
+        return self._lineas > 2 * len(self) + 1000
+
+    def abandonar_carga(self):
+        """
+        Tras un error al leer el archivo: descarta las tareas que se llegaron a aplicar, empieza
+        con la lista vacía y permite los cambios. El archivo que no se pudo leer se aparta como
+        '<ruta>.<fecha>.ilegible', para no añadirle tareas con IDs que ya usa ni perderlo.
+        Retorno:
+            str: Nueva ruta del archivo apartado, o None si no existía o no se pudo renombrar.
+        """
+        self.cerrar()
+        ModeloTareas.__init__(self)
+        self.contadores = {PENDIENTE: 0, COMPLETADA: 0}
+        self._lineas = 0
+        self.cargado = True
+        apartado = f"{self.ruta}.{time.strftime('%Y%m%d-%H%M%S')}.ilegible"
+        try:
+            os.replace(self.ruta, apartado)
+        except OSError:
+            return None
+        return apartado
+
+    def cargar(self):
+        """Carga todo el archivo de una vez (sin ventana, por ejemplo desde otro script)."""
+        if self.terminar_carga(self.leer_archivo(self.aplicar_eventos)):
+            self.compactar()
+
+    def iniciar_compactado(self):
+        """
+        Primer paso de la compactación, en el hilo de Tk: devuelve la instantánea de las tareas y
+        desde ahora guarda aparte lo que se anote, hasta `instalar_compactado`. Si una tarea cambia
+        de estado o se elimina antes de que se escriba, el evento anotado se añade igual al final:
+        los eventos dan el estado final, no un cambio relativo.
+        """
+        self._compactando = []
+        self._compactadas = len(self)
+        return self.instantanea()
+
+    @staticmethod
+    def escribir_compactado(ruta, instantanea):
+        """
+        Segundo paso (se puede ejecutar en un hilo de fondo): escribe en un archivo temporal un
+        alta por cada tarea de `instantanea` y devuelve su ruta.
+        """
+        temporal = ruta + '.tmp'
+        with open(temporal, 'w', encoding='utf-8') as archivo:
+            for tarea in instantanea:
+                archivo.write(json.dumps({'evento': 'alta', 'id': tarea.id, 'texto': tarea.texto,
+                                          'estado': tarea.estado}, ensure_ascii=False) + '\n')
+            archivo.flush()
+            os.fsync(archivo.fileno())
+        return temporal
+
+    def instalar_compactado(self, temporal):
+        """
+        Último paso, en el hilo de Tk: añade al temporal los cambios anotados mientras se escribía
+        y lo pone en lugar del archivo (de forma atómica).
+        """
+        pendientes, self._compactando = self._compactando or [], None
+        with open(temporal, 'a', encoding='utf-8') as archivo:
+            archivo.write(''.join(lineas for lineas, _ in pendientes))
+            archivo.flush()
+            os.fsync(archivo.fileno())
+        self.cerrar()
+        os.replace(temporal, self.ruta)
+        self._lineas = self._compactadas + sum(cantidad for _, cantidad in pendientes)
+
+    def descartar_compactado(self):
+        """Abandona una compactación que falló; el archivo actual sigue completo."""
+        self._compactando = None
+
+    def compactar(self):
+        """Reescribe el archivo con un alta por cada tarea actual, sin hilos."""
+        self.instalar_compactado(self.escribir_compactado(self.ruta, self.iniciar_compactado()))
+
+    def cerrar(self):
+        """Fuerza al disco los cambios anotados y cierra el archivo."""
+        if self._archivo is not None:
+            os.fsync(self._archivo.fileno())
+            self._archivo.close()
+            self._archivo = None
+
+    def agregar(self, texto, estado=PENDIENTE):
+        """Añade una tarea al final y devuelve su ID."""
+        id_tarea = self._siguiente_id
+        self._anotar({'evento': 'alta', 'id': id_tarea, 'texto': texto, 'estado': estado})
+        return id_tarea
+
+    def agregar_varias(self, textos, estado=PENDIENTE):
+        """Añade varias tareas al final, en ese orden, y devuelve sus IDs."""
+        eventos = [{'evento': 'alta', 'id': self._siguiente_id + numero, 'texto': texto, 'estado': estado}
+                   for numero, texto in enumerate(textos)]
+        if eventos:
+            self._anotar(*eventos)
+        return [evento['id'] for evento in eventos]
+
+    def alternar(self, id_tarea):
+        """Cambia la tarea de Pendiente a Completada o al revés y devuelve el nuevo estado."""
+        nuevo_estado = COMPLETADA if self.obtener(id_tarea).estado == PENDIENTE else PENDIENTE
+        self._anotar({'evento': 'estado', 'id': id_tarea, 'estado': nuevo_estado})
+        return nuevo_estado
+
+    def marcar(self, ids, estado):
+        """Pone en `estado` las tareas con esos IDs en un solo cambio y devuelve cuántas cambiaron."""
+        ids = [id_tarea for id_tarea in ids if id_tarea in self and self.obtener(id_tarea).estado != estado]
+        if ids:
+            self._anotar({'evento': 'estado', 'ids': ids, 'estado': estado})
+        return len(ids)
+
+    def eliminar(self, ids):
+        """Elimina las tareas con esos IDs en un solo cambio y devuelve cuántas eran."""
+        ids = [id_tarea for id_tarea in ids if id_tarea in self]
+        if ids:
+            self._anotar({'evento': 'baja', 'ids': ids})
+        return len(ids)
+
+
+class ListaVirtual(ttk.Frame):
+    """
+    Treeview que solo contiene las filas visibles de un modelo, con su barra de desplazamiento.
+    Se usa como un Treeview para las columnas y las etiquetas (heading, column, tag_configure);
+    los eventos de las filas (por ejemplo <Double-1>) se enlazan en `lista.arbol`.
+    Selección: clic, Ctrl+clic (añadir o quitar), Mayús+clic (rango), Ctrl+A (todas), y las
+    flechas, Re Pág, Av Pág, Inicio y Fin (con Mayús para extender). Al cambiar se genera
+    <<ListaVirtualSelect>>.
+    Parámetros:
+        padre: Contenedor de la lista.
+        modelo: Objeto con len() y fila(indice) -> (clave, valores, etiquetas).
+        columnas (tuple): Columnas del Treeview.
+        filas_visibles (int): Filas iniciales; después se ajustan al alto del widget.
+    """
+    def __init__(self, padre, modelo, columnas, filas_visibles=15, **opciones):
+        super().__init__(padre)
+        self.modelo = modelo
+        self.arbol = ttk.Treeview(self, columns=columnas, show='headings', height=filas_visibles,
+                                  selectmode='none', **opciones)
+        self.barra = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.yview)
+        self.barra.pack(side=tk.RIGHT, fill=tk.Y)
+        self.arbol.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.primero = 0         # Posición en el modelo de la primera fila visible
+        self._filas = []         # Elementos del Treeview, uno por fila visible
+        self._posiciones = {}    # Elemento del Treeview -> posición entre las visibles
+        self._mostrado = []      # (clave, valores, etiquetas) que muestra cada fila, o None
+        self._seleccion = set()  # Claves seleccionadas
+        self._ancla = None       # Posición desde la que se extiende la selección con Mayús
+        self._activo = None      # Posición de la fila con el foco del teclado
+        self._pendiente = None   # Redibujado programado con after_idle
+        self._ajustar_filas(filas_visibles)
+
+        self.arbol.bind('<Configure>', self._al_redimensionar)
+        self.arbol.bind('<Button-1>', self._al_pulsar)
+        self.arbol.bind('<Control-Button-1>', lambda e: self._al_pulsar(e, 'alternar'))
+        self.arbol.bind('<Shift-Button-1>', lambda e: self._al_pulsar(e, 'extender'))
+        self.arbol.bind('<Control-a>', lambda e: self.seleccionar_todo() or 'break')
+        for evento in ('<MouseWheel>', '<Button-4>', '<Button-5>'):
+            self.arbol.bind(evento, self._al_girar_rueda)
+        for tecla, paso in (('Up', -1), ('Down', 1), ('Prior', 'pagina-'), ('Next', 'pagina+'),
+                            ('Home', 'inicio'), ('End', 'fin')):
+            self.arbol.bind(f'<{tecla}>', lambda e, paso=paso: self._mover(paso, False))
+            self.arbol.bind(f'<Shift-{tecla}>', lambda e, paso=paso: self._mover(paso, True))
+
+    # --- Lo que se usa como en un Treeview ---
+
+    def heading(self, *args, **opciones):
+        return self.arbol.heading(*args, **opciones)
+
+    def column(self, *args, **opciones):
+        return self.arbol.column(*args, **opciones)
+
+    def tag_configure(self, *args, **opciones):
+        return self.arbol.tag_configure(*args, **opciones)
+
+    def yview(self, *args):
+        """Comando de la barra de desplazamiento ('moveto', fracción) o ('scroll', n, 'units'|'pages')."""
+        if args[0] == 'moveto':
+            self.primero = int(float(args[1]) * len(self.modelo))
+        elif args[0] == 'scroll':
+            paso = max(1, len(self._filas) - 1) if args[2] == 'pages' else 1
+            self.primero += int(args[1]) * paso
+        self.refrescar()
+
+    # --- Redibujado ---
+
+    def refrescar(self):
+        """Programa un redibujado; las llamadas hasta que Tk esté inactivo se agrupan en uno."""
+        if self._pendiente is None:
+            self._pendiente = self.after_idle(self.dibujar)
+
+    def dibujar(self):
+        """Vuelve a llenar las filas visibles con el modelo. Solo cambia las que muestran otra cosa."""
+        if self._pendiente is not None:
+            self.after_cancel(self._pendiente)
+            self._pendiente = None
+        total = len(self.modelo)
+        self.primero = max(0, min(self.primero, total - len(self._filas)))
+        seleccionadas = []
+        for posicion, elemento in enumerate(self._filas):
+            indice = self.primero + posicion
+            fila = self.modelo.fila(indice) if indice < total else None
+            if fila != self._mostrado[posicion]:
+                if fila is None:
+                    self.arbol.item(elemento, values=(), tags=())
+                else:
+                    self.arbol.item(elemento, values=fila[1], tags=fila[2])
+                self._mostrado[posicion] = fila
+            if fila is not None and fila[0] in self._seleccion:
+                seleccionadas.append(elemento)
+        self.arbol.selection_set(seleccionadas)
+        if self._activo is not None and 0 <= self._activo - self.primero < len(self._filas):
+            self.arbol.focus(self._filas[self._activo - self.primero])
+        if total:
+            self.barra.set(self.primero / total, min(1.0, (self.primero + len(self._filas)) / total))
+        else:
+            self.barra.set(0.0, 1.0)
+
+    def ver(self, indice):
+        """Desplaza la lista lo justo para que se vea la fila de la posición `indice`."""
+        if indice < self.primero:
+            self.primero = indice
+        elif indice >= self.primero + len(self._filas):
+            self.primero = indice - len(self._filas) + 1
+        self.refrescar()
+
+    def _ajustar_filas(self, cantidad):
+        while len(self._filas) < cantidad:
+            elemento = self.arbol.insert('', tk.END)
+            self._posiciones[elemento] = len(self._filas)
+            self._filas.append(elemento)
+            self._mostrado.append(None)
+        while len(self._filas) > cantidad:
+            elemento = self._filas.pop()
+            del self._posiciones[elemento]
+            self._mostrado.pop()
+            self.arbol.delete(elemento)
+
+    def _al_redimensionar(self, event):
+        """Crea o quita filas para llenar el alto del Treeview."""
+        caja = self.arbol.bbox(self._filas[0]) if self._filas else ''
+        if caja:
+            _, cabecera, _, alto_fila = caja
+        else:
+            # Todavía no se dibujó ninguna fila: alto de fila del estilo, y otro tanto para la cabecera
+            alto_fila = int(ttk.Style(self).lookup('Treeview', 'rowheight') or 20)
+            cabecera = alto_fila
+        cantidad = max(1, (event.height - cabecera) // alto_fila)
+        if cantidad != len(self._filas):
+            self._ajustar_filas(cantidad)
+            self.refrescar()
+
+    # --- Selección ---
+
+    def seleccion(self):
+        """Claves de las filas seleccionadas."""
+        return list(self._seleccion)
+
+    def seleccionar_todo(self):
+        """Selecciona todas las filas del modelo."""
+        self._seleccion = {self.modelo.fila(indice)[0] for indice in range(len(self.modelo))}
+        self.refrescar()
+        self.event_generate('<<ListaVirtualSelect>>')
+
+    def deseleccionar(self, claves=None):
+        """Quita esas claves de la selección (todas si no se indican), por ejemplo tras eliminarlas."""
+        if claves is None:
+            self._seleccion.clear()
+        else:
+            self._seleccion.difference_update(claves)
+        self.refrescar()
+
+    def _elegir(self, indice, modo=None):
+        clave = self.modelo.fila(indice)[0]
+        if modo == 'alternar':
+            self._seleccion ^= {clave}
+            self._ancla = indice
+        elif modo == 'extender' and self._ancla is not None:
+            inicio, fin = sorted((min(self._ancla, len(self.modelo) - 1), indice))
+            self._seleccion = {self.modelo.fila(i)[0] for i in range(inicio, fin + 1)}
+        else:
+            self._seleccion = {clave}
+            self._ancla = indice
+        self._activo = indice
+        self.ver(indice)
+        self.event_generate('<<ListaVirtualSelect>>')
+
+    def _al_pulsar(self, event, modo=None):
+        if self.arbol.identify_region(event.x, event.y) != 'cell':
+            return None  # Cabeceras y separadores: lo que hace siempre el Treeview
+        self.arbol.focus_set()
+        posicion = self._posiciones.get(self.arbol.identify_row(event.y))
+        if posicion is not None and self.primero + posicion < len(self.modelo):
+            self._elegir(self.primero + posicion, modo)
+        return 'break'
+
+    def _mover(self, paso, extender):
+        total = len(self.modelo)
+        if not total:
+            return 'break'
+        actual = self._activo if self._activo is not None else self.primero
+        pagina = max(1, len(self._filas) - 1)
+        if paso == 'inicio':
+            destino = 0
+        elif paso == 'fin':
+            destino = total - 1
+        elif paso == 'pagina-':
+            destino = actual - pagina
+        elif paso == 'pagina+':
+            destino = actual + pagina
+        else:
+            destino = actual + paso
+        self._elegir(max(0, min(destino, total - 1)), 'extender' if extender else None)
+        return 'break'
+
+    def _al_girar_rueda(self, event):
+        if event.num == 4 or event.delta > 0:
+            self.yview('scroll', -3, 'units')
+        else:
+            self.yview('scroll', 3, 'units')
+        return 'break'
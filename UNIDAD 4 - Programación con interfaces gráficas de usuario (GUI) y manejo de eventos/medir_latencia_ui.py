@@ -0,0 +1,143 @@
+"""
+Medición de las pausas de la ventana al cargar y guardar archivos grandes (trabajo_en_fondo.py)
+
+Genera un archivo de tareas JSON Lines (como el de la Semana 16) en una carpeta temporal y,
+con una SondaLatencia en marcha, lo carga y lo guarda con el AlmacenTareas de la aplicación
+(lista_virtual.py) de tres maneras:
+    - de una vez: todo en un solo manejador de eventos, como hacían las aplicaciones al principio,
+    - por bloques con after: en el hilo de Tk, un bloque de líneas por cada llamada programada,
+    - en un hilo de fondo: el archivo se lee (o escribe) con EjecutorFondo y en el hilo de Tk
+      solo se aplican los bloques leídos (o se toma la instantánea de las tareas a guardar).
+Para cada una muestra el tiempo total y el retraso del bucle de eventos: el máximo es la pausa
+más larga que notaría quien usa la ventana.
+
+Sin pantalla se usa el intérprete de Tcl sin ventana (tkinter.Tcl()), que tiene el mismo bucle
+de eventos y el mismo `after`.
+
+Uso:
+    python medir_latencia_ui.py           # 200.000 tareas
+    python medir_latencia_ui.py 50000     # otra cantidad
+"""
+
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tkinter as tk
+
+from lista_virtual import COMPLETADA, PENDIENTE, AlmacenTareas
+from trabajo_en_fondo import EjecutorFondo, SondaLatencia
+
+BLOQUE_AFTER = 5_000  # Líneas por llamada en la carga por bloques (como la Semana 16 antes)
+BLOQUE_FONDO = 1_000  # Líneas por bloque que el hilo de fondo entrega al hilo de Tk
+
+
+def crear_archivo(ruta, cantidad):
+    """Escribe `cantidad` altas y un cambio de estado por cada tercera tarea."""
+    with open(ruta, 'w', encoding='utf-8') as archivo:
+        for i in range(cantidad):
+            archivo.write(json.dumps({'evento': 'alta', 'id': i, 'texto': f"Tarea número {i}",
+                                      'estado': PENDIENTE}, ensure_ascii=False) + '\n')
+        for i in range(0, cantidad, 3):
+            archivo.write(json.dumps({'evento': 'estado', 'id': i, 'estado': COMPLETADA}) + '\n')
+
+
+# Cada estrategia recibe (raiz, fondo, ruta, modelo, terminar) y llama a terminar() al acabar.
+# Las de carga usan el AlmacenTareas de la aplicación: leer_archivo (o bloques_del_archivo),
+# aplicar_eventos y terminar_carga; las de guardado, su escribir_compactado.
+
+def terminar_carga(modelo, validos, terminar):
+    """Como la Semana 16 al terminar de cargar: terminar_carga y después gc.freeze() (ver allí)."""
+    modelo.terminar_carga(validos)
+    gc.freeze()
+    terminar()
+
+
+def cargar_de_una_vez(raiz, fondo, ruta, modelo, terminar):
+    terminar_carga(modelo, modelo.leer_archivo(modelo.aplicar_eventos, 1 << 30), terminar)
+
+
+def cargar_por_bloques(raiz, fondo, ruta, modelo, terminar):
+    pasos = modelo.bloques_del_archivo(BLOQUE_AFTER)
+    validos = 0
+
+    def paso():
+        nonlocal validos
+        siguiente = next(pasos, None)
+        if siguiente is None:
+            terminar_carga(modelo, validos, terminar)
+        else:
+            eventos, validos = siguiente
+            modelo.aplicar_eventos(eventos)
+            raiz.after(1, paso)
+    paso()
+
+
+def cargar_en_fondo(raiz, fondo, ruta, modelo, terminar):
+    fondo.enviar(lambda trabajo: modelo.leer_archivo(trabajo.progreso, BLOQUE_FONDO),
+                 al_progresar=modelo.aplicar_eventos, al_terminar=lambda validos: terminar_carga(modelo, validos, terminar))
+
+
+def guardar_de_una_vez(raiz, fondo, ruta, modelo, terminar):
+    AlmacenTareas.escribir_compactado(ruta, modelo.instantanea())
+    terminar()
+
+
+def guardar_en_fondo(raiz, fondo, ruta, modelo, terminar):
+    fondo.enviar(lambda trabajo, tareas: AlmacenTareas.escribir_compactado(ruta, tareas), modelo.instantanea(),
+                 al_terminar=lambda _: terminar())
+
+
+def medir(raiz, fondo, estrategia, ruta, modelo):
+    """Ejecuta la estrategia dentro del bucle de eventos. Devuelve (segundos, resumen de la sonda)."""
+    fin = []
+    sonda = SondaLatencia(raiz)
+    sonda.iniciar()
+    inicio = time.perf_counter()
+    raiz.after(20, estrategia, raiz, fondo, ruta, modelo, lambda: fin.append(time.perf_counter()))
+    while not fin:
+        raiz.tk.dooneevent(0)  # Como mainloop(), pero hasta que la estrategia termine
+    # Una muestra más: si la estrategia bloqueó el bucle, su retraso se anota en la siguiente
+    muestras = len(sonda.retrasos)
+    while len(sonda.retrasos) == muestras:
+        raiz.tk.dooneevent(0)
+    return fin[0] - inicio - 0.020, sonda.detener()
+
+
+def main():
+    cantidad = next((int(arg) for arg in sys.argv[1:] if arg.isdigit()), 200_000)
+    try:
+        raiz = tk.Tk()
+        raiz.withdraw()
+    except tk.TclError:
+        raiz = None
+    ventana = raiz is not None
+    raiz = raiz or tk.Tcl()  # Sin pantalla: el mismo bucle de eventos, sin ventanas
+    fondo = EjecutorFondo(raiz)
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta = os.path.join(carpeta, "tareas.jsonl")
+        crear_archivo(ruta, cantidad)
+        print(f"{cantidad:,} tareas ({os.path.getsize(ruta) / 1e6:.1f} MB), sonda cada 10 ms")
+        print(f"{'Operación':<28} | {'Total (s)':>9} | {'Retraso medio (ms)':>18} | {'p99 (ms)':>8} | {'Máximo (ms)':>11}")
+        print("-" * 87)
+        modelo = None
+        for nombre, estrategia in (("cargar de una vez", cargar_de_una_vez),
+                                   ("cargar por bloques (after)", cargar_por_bloques),
+                                   ("cargar en hilo de fondo", cargar_en_fondo),
+                                   ("guardar de una vez", guardar_de_una_vez),
+                                   ("guardar en hilo de fondo", guardar_en_fondo)):
+            if nombre.startswith("cargar"):
+                modelo = AlmacenTareas(ruta)
+            destino = ruta if nombre.startswith("cargar") else os.path.join(carpeta, "copia.jsonl")
+            segundos, sonda = medir(raiz, fondo, estrategia, destino, modelo)
+            print(f"{nombre:<28} | {segundos:>9.2f} | {sonda['media']:>18.1f} | {sonda['p99']:>8.1f} | {sonda['maximo']:>11.1f}")
+    fondo.cerrar()
+    if ventana:
+        raiz.destroy()
+
+
+if __name__ == "__main__":
+    main()
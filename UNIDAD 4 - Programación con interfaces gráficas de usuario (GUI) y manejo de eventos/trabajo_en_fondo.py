@@ -0,0 +1,217 @@
+"""
+Trabajos en segundo plano para las aplicaciones de Tkinter (Semanas 13 a 16)
+
+Todo lo que se ejecuta en un manejador de eventos detiene el bucle de Tk: mientras se lee o se
+guarda un archivo grande, la ventana no se redibuja ni responde. Con este módulo el trabajo
+lento se ejecuta en un grupo de hilos y lo que produce vuelve al hilo de Tk, que es el único que
+puede tocar los widgets (y los modelos que estos muestran):
+
+    - EjecutorFondo: `enviar(funcion, ...)` ejecuta la función en un hilo. Los avisos de progreso,
+      el resultado y los errores se ponen en una cola que el hilo de Tk revisa con `after()`; los
+      callbacks (al_progresar, al_terminar, al_fallar, al_cancelar) se llaman desde ese hilo.
+      La revisión solo está programada mientras hay trabajos, y en cada vuelta atiende mensajes
+      durante un tiempo máximo, para no convertirse ella misma en una pausa.
+    - Trabajo: lo que devuelve `enviar`. `cancelar()` lo cancela: si no empezó, no se ejecuta;
+      si está en marcha, su próximo `progreso()` (o `comprobar()`) lanza TrabajoCancelado.
+    - SondaLatencia: mide cuánto se retrasa el bucle de eventos. Programa una llamada cada
+      pocos milisegundos y anota la diferencia entre el momento previsto y el real.
+
+Uso:
+    fondo = EjecutorFondo(ventana)
+
+    def leer(trabajo, ruta):
+        for bloque in bloques_del_archivo(ruta):
+            trabajo.progreso(bloque)      # Se entrega en orden al hilo de Tk
+        return "listo"
+
+    fondo.enviar(leer, "tareas.jsonl", al_progresar=aplicar_bloque, al_terminar=mostrar_fin)
+"""
+
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+class TrabajoCancelado(Exception):
+    """Se lanza dentro de un trabajo cancelado, en su siguiente `progreso()` o `comprobar()`."""
+
+
+class Trabajo:
+    """
+    Un trabajo enviado a un EjecutorFondo. La función del trabajo lo recibe como primer
+    argumento, para informar el progreso y enterarse de si se canceló.
+    """
+    def __init__(self, ejecutor, al_terminar, al_fallar, al_progresar, al_cancelar):
+        self._ejecutor = ejecutor
+        self._cancelado = threading.Event()
+        self._futuro = None
+        self.al_terminar = al_terminar
+        self.al_fallar = al_fallar
+        self.al_progresar = al_progresar
+        self.al_cancelar = al_cancelar
+        self.terminado = False  # Ya se entregó el resultado, el error o la cancelación
+
+    @property
+    def cancelado(self):
+        return self._cancelado.is_set()
+
+    def cancelar(self):
+        """Cancela el trabajo (desde el hilo de Tk). Lo que el trabajo envíe después se descarta."""
+        self._cancelado.set()
+        if self._futuro is not None and self._futuro.cancel():
+            # No llegó a empezar: nadie más va a avisar que terminó
+            self._ejecutor._cola.put(('cancelado', self, None))
+
+    def comprobar(self):
+        """Desde el hilo del trabajo: lanza TrabajoCancelado si se pidió cancelarlo."""
+        if self._cancelado.is_set():
+            raise TrabajoCancelado()
+
+    def progreso(self, valor):
+        """Desde el hilo del trabajo: entrega `valor` a al_progresar (todos, en orden)."""
+        self.comprobar()
+        if self.al_progresar is not None:
+            self._ejecutor._cola.put(('progreso', self, valor))
+
+
+class EjecutorFondo:
+    """
+    Grupo de hilos cuyos resultados se entregan en el hilo de Tk.
+    Parámetros:
+        raiz: Ventana (o intérprete) de Tk cuyo bucle de eventos atiende los resultados.
+        hilos (int): Hilos del grupo.
+        intervalo (int): Milisegundos entre revisiones de la cola mientras hay trabajos.
+        presupuesto (float): Segundos que puede durar como máximo cada revisión; lo que queda
+            se atiende en la siguiente, después de que Tk procese sus propios eventos.
+    """
+    def __init__(self, raiz, hilos=2, intervalo=15, presupuesto=0.010):
+        self.raiz = raiz
+        self.intervalo = intervalo
+        self.presupuesto = presupuesto
+        self._grupo = ThreadPoolExecutor(max_workers=hilos, thread_name_prefix='fondo')
+        self._cola = queue.SimpleQueue()  # Mensajes de los hilos: (tipo, trabajo, valor)
+        self._recibidos = deque()         # Mensajes sacados de la cola y aún sin atender
+        self._activos = set()             # Trabajos sin resultado entregado
+        self._revision = None             # Revisión programada con after
+
+    def enviar(self, funcion, *args, al_terminar=None, al_fallar=None, al_progresar=None, al_cancelar=None):
+        """
+        Ejecuta `funcion(trabajo, *args)` en un hilo del grupo y devuelve el Trabajo. La función
+        no debe tocar widgets. Si no se indica al_fallar, el error se informa como cualquier
+        error de un callback de Tk.
+        """
+        trabajo = Trabajo(self, al_terminar, al_fallar, al_progresar, al_cancelar)
+        self._activos.add(trabajo)
+        trabajo._futuro = self._grupo.submit(self._ejecutar, trabajo, funcion, args)
+        self._programar()
+        return trabajo
+
+    def _ejecutar(self, trabajo, funcion, args):
+        """En el hilo del grupo: ejecuta el trabajo y encola su resultado o su error."""
+        try:
+            resultado = funcion(trabajo, *args)
+        except TrabajoCancelado:
+            self._cola.put(('cancelado', trabajo, None))
+        except Exception as error:
+            self._cola.put(('error', trabajo, error))
+        else:
+            self._cola.put(('fin', trabajo, resultado))
+
+    def pendientes(self):
+        """Cantidad de trabajos cuyo resultado aún no se entregó."""
+        return len(self._activos)
+
+    def _programar(self, espera=None):
+        if self._revision is None:
+            self._revision = self.raiz.after(self.intervalo if espera is None else espera, self._atender)
+
+    def _atender(self):
+        """En el hilo de Tk: entrega los mensajes recibidos hasta agotar el presupuesto de tiempo."""
+        self._revision = None
+        limite = time.perf_counter() + self.presupuesto
+        try:
+            while time.perf_counter() < limite:
+                if not self._recibidos:
+                    try:
+                        self._recibidos.append(self._cola.get_nowait())
+                    except queue.Empty:
+                        break
+                self._entregar(*self._recibidos.popleft())
+        finally:
+            if self._recibidos or not self._cola.empty():
+                self._programar(1)  # Queda trabajo: seguir en cuanto Tk atienda sus eventos
+            elif self._activos:
+                self._programar()
+
+    def _entregar(self, tipo, trabajo, valor):
+        if trabajo.terminado:
+            return
+        if tipo == 'progreso':
+            if not trabajo.cancelado:
+                trabajo.al_progresar(valor)
+            return
+        trabajo.terminado = True
+        self._activos.discard(trabajo)
+        if trabajo.cancelado or tipo == 'cancelado':
+            if trabajo.al_cancelar is not None:
+                trabajo.al_cancelar()
+        elif tipo == 'error':
+            if trabajo.al_fallar is None:
+                raise valor
+            trabajo.al_fallar(valor)
+        elif trabajo.al_terminar is not None:
+            trabajo.al_terminar(valor)
+
+    def cerrar(self, esperar=False):
+        """Cancela los trabajos pendientes y cierra el grupo de hilos (al salir de la aplicación)."""
+        for trabajo in list(self._activos):
+            trabajo._cancelado.set()
+        self._grupo.shutdown(wait=esperar, cancel_futures=True)
+        if self._revision is not None:
+            self.raiz.after_cancel(self._revision)
+            self._revision = None
+
+
+class SondaLatencia:
+    """
+    Mide las pausas del bucle de eventos: programa una llamada cada `intervalo` ms y anota cuánto
+    más tarde de lo previsto se ejecutó. Un retraso de 100 ms es una ventana congelada 100 ms.
+    Uso:
+        sonda = SondaLatencia(ventana)
+        sonda.iniciar()
+        ...
+        print(sonda.detener())   # {'muestras', 'media', 'p99', 'maximo'} en milisegundos
+    """
+    def __init__(self, raiz, intervalo=10):
+        self.raiz = raiz
+        self.intervalo = intervalo
+        self.retrasos = []
+        self._previsto = None
+        self._programada = None
+
+    def iniciar(self):
+        self.retrasos = []
+        self._previsto = time.perf_counter() + self.intervalo / 1000
+        self._programada = self.raiz.after(self.intervalo, self._medir)
+
+    def _medir(self):
+        ahora = time.perf_counter()
+        self.retrasos.append(max(0.0, ahora - self._previsto) * 1000)
+        self._previsto = ahora + self.intervalo / 1000
+        self._programada = self.raiz.after(self.intervalo, self._medir)
+
+    def detener(self):
+        """Deja de medir y devuelve el resumen de los retrasos (ms)."""
+        if self._programada is not None:
+            self.raiz.after_cancel(self._programada)
+            self._programada = None
+        return self.resumen()
+
+    def resumen(self):
+        retrasos = sorted(self.retrasos)
+        if not retrasos:
+            return {'muestras': 0, 'media': 0.0, 'p99': 0.0, 'maximo': 0.0}
+        return {'muestras': len(retrasos), 'media': sum(retrasos) / len(retrasos),
+                'p99': retrasos[min(len(retrasos) - 1, int(len(retrasos) * 0.99))], 'maximo': retrasos[-1]}